@@ -1,13 +1,30 @@
 from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right, insort_right
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Iterator, Optional, Union
 
-import plotly
-import plotly.graph_objects
 from utils.logger import logger
-from utils.plotting import plot_metrics
+from utils.value_kinds import (
+    MISSING_DATE,
+    NO_UNIT,
+    VALUE_BOOL,
+    VALUE_FLOAT,
+    VALUE_GREATER_THAN,
+    VALUE_INT,
+    VALUE_LESS_THAN,
+    VALUE_STRING,
+    is_inequality_value_str,
+)
+
+if TYPE_CHECKING:
+    # Plotting is imported when a graph is built, as plotly is slow to import.
+    import plotly.graph_objects
+
+# The date codec and OoR engine are imported by the methods using them, so the core
+# types don't depend on the storage and data layers.
 
 
 class InequalityValue:
@@ -40,6 +57,8 @@ class MetricType(Enum):
 
 
 class Measurement:
+    __slots__ = ("value", "date", "unit")
+
     def __init__(
         self, value: AllowedMetricValueTypes, date: datetime, unit: Optional[str] = None
     ):
@@ -56,6 +75,8 @@ class Measurement:
 
 
 class InequalityMeasurement(Measurement):
+    __slots__ = ("inequality",)
+
     def __init__(
         self,
         bound: float,
@@ -74,13 +95,379 @@ class InequalityMeasurement(Measurement):
         return f"{operator}{self.value}"
 
 
+class MeasurementSeries:
+    """
+    Column-oriented store of a metric's measurements. Rather than holding a Measurement
+    object per point, each field is kept in a typed array:
+
+        dates: Seconds since the Unix epoch, or MISSING_DATE.
+        values: Numeric values as floats. For string values, the index into the
+            string table.
+        kinds: How each value should be read back (see the VALUE_* kinds).
+        unit_ids: Index + 1 into the unit table, or NO_UNIT.
+
+    Units and string values are interned, so each distinct one is only stored once.
+    Iterating, indexing or slicing the series builds Measurement objects on demand, so
+    code written against a list of measurements keeps working. Each is a new copy of
+    the stored entry, so changing one doesn't change the series.
+
+    Entries are kept in the order they were added, which isn't necessarily date
+    order. For date queries, the series keeps an index of entry positions sorted by
+    date, which is binary searched. Appending a single entry keeps the index up to
+    date, while bulk loads drop it to be rebuilt by the next query.
+    """
+
+    __slots__ = (
+        "dates",
+        "values",
+        "kinds",
+        "unit_ids",
+        "units",
+        "strings",
+        "_unit_lookup",
+        "_string_lookup",
+        "_date_order",
+    )
+
+    def __init__(self, measurements: Optional[list[Measurement]] = None):
+        self.dates = array("q")
+        self.values = array("d")
+        self.kinds = array("B")
+        self.unit_ids = array("H")
+        self.units: list[str] = []
+        self.strings: list[str] = []
+        self._unit_lookup: dict[str, int] = {}
+        self._string_lookup: dict[str, int] = {}
+        # Entry positions sorted by date (stable for equal dates), or None if stale.
+        self._date_order: Optional[array] = array("L")
+
+        for measurement in measurements or []:
+            self.append(measurement)
+
+    def _unit_id(self, unit: Optional[str]) -> int:
+        if not unit:
+            return NO_UNIT
+
+        if (unit_id := self._unit_lookup.get(unit)) is None:
+            self.units.append(unit)
+            unit_id = self._unit_lookup[unit] = len(self.units)
+
+        return unit_id
+
+    def _string_id(self, string: str) -> int:
+        if (string_id := self._string_lookup.get(string)) is None:
+            string_id = self._string_lookup[string] = len(self.strings)
+            self.strings.append(string)
+
+        return string_id
+
+    def _classify(
+        self, value: AllowedMetricValueTypes, inequality: Optional[InequalityType]
+    ) -> tuple[int, float]:
+        """
+        Returns the kind of a value, and the float it's stored as.
+        """
+        if inequality is not None:
+            if inequality == InequalityType.GreaterThan:
+                return VALUE_GREATER_THAN, float(value)
+            return VALUE_LESS_THAN, float(value)
+        elif isinstance(value, bool):
+            return VALUE_BOOL, float(value)
+        elif isinstance(value, int):
+            return VALUE_INT, float(value)
+        elif isinstance(value, float):
+            return VALUE_FLOAT, value
+        elif is_inequality_value_str(value):
+            kind = VALUE_LESS_THAN if value[0] == "<" else VALUE_GREATER_THAN
+            return kind, float(value[1:])
+
+        return VALUE_STRING, float(self._string_id(value))
+
+    def append(self, measurement: Measurement):
+        self.append_value(
+            measurement.value,
+            measurement.date,
+            measurement.unit,
+            getattr(measurement, "inequality", None),
+        )
+
+    def append_value(
+        self,
+        value: AllowedMetricValueTypes,
+        date: Union[datetime, str, None],
+        unit: Optional[str] = None,
+        inequality: Optional[InequalityType] = None,
+    ):
+        """
+        Append an entry from its fields, without building a Measurement.
+
+        Arguments:
+            value: The value, the bound of an inequality measurement, or an
+                inequality string such as "<5".
+            date: Date of the measurement, as a datetime or ISO format string.
+            unit: Unit of the measurement, if any.
+            inequality: The inequality type, for inequality measurements.
+        """
+        from file_tools.date_codec import date_to_epoch, decode_date_epoch
+
+        kind, stored_value = self._classify(value, inequality)
+
+        if isinstance(date, str):
+            self.dates.append(decode_date_epoch(date))
+        else:
+            self.dates.append(date_to_epoch(date) if date else MISSING_DATE)
+        self.values.append(stored_value)
+        self.kinds.append(kind)
+        self.unit_ids.append(self._unit_id(unit))
+
+        if self._date_order is not None:
+            # New entries are usually the latest, so can go on the end of the index.
+            date_order, new_index = self._date_order, len(self.dates) - 1
+            if not date_order or self.dates[date_order[-1]] <= self.dates[new_index]:
+                date_order.append(new_index)
+            else:
+                insort_right(date_order, new_index, key=self.dates.__getitem__)
+
+    def extend_from_json(
+        self, data_points: list[dict], default_unit: Optional[str] = None
+    ) -> list[int]:
+        """
+        Append the entries of a metric file's "data" list. This is the bulk form of
+        `append_value()` used when loading metrics, so keeps the common case of a
+        float value in a tight loop.
+
+        Arguments:
+            data_points: Entries from a metric file.
+            default_unit: Unit for entries that don't record their own.
+
+        Returns:
+            Indexes of the entries skipped for having no date.
+        """
+        from file_tools.date_codec import parse_date_epoch
+
+        append_date, append_value = self.dates.append, self.values.append
+        append_kind, append_unit = self.kinds.append, self.unit_ids.append
+        default_unit_id = self._unit_id(default_unit)
+        skipped = []
+        self._date_order = None
+
+        for entry_number, data_point in enumerate(data_points):
+            date = data_point["date"]
+            if not date:
+                skipped.append(entry_number)
+                continue
+
+            value = data_point["value"]
+            if type(value) is float:
+                kind = VALUE_FLOAT
+            else:
+                kind, value = self._classify(value, None)
+
+            unit = data_point.get("unit")
+            append_date(parse_date_epoch(date))
+            append_value(value)
+            append_kind(kind)
+            append_unit(self._unit_id(unit) if unit else default_unit_id)
+
+        return skipped
+
+    def extend_from_columns(
+        self,
+        dates,
+        values,
+        kinds,
+        unit_ids,
+        units: list[str],
+        strings: list[str],
+        default_unit: Optional[str] = None,
+    ) -> list[int]:
+        """
+        Append entries given as whole columns, such as the memory mapped columns of a
+        columnar metric file. Each column is copied in one go, rather than entry by
+        entry, and only ids that differ from this series' tables are remapped.
+
+        Arguments:
+            dates, values, kinds, unit_ids: Columns in the same layout as this
+                series' arrays, as any buffer (e.g. a memoryview).
+            units: Unit table that `unit_ids` refer to.
+            strings: String table that string values refer to.
+            default_unit: Unit for entries that don't record their own.
+
+        Returns:
+            Indexes of the entries skipped for having no date.
+        """
+        new_dates, new_values = array("q"), array("d")
+        new_kinds, new_unit_ids = array("B"), array("H")
+        for new_column, column in (
+            (new_dates, dates),
+            (new_values, values),
+            (new_kinds, kinds),
+            (new_unit_ids, unit_ids),
+        ):
+            # Copied as raw bytes, which needs a byte view of a typed buffer.
+            new_column.frombytes(memoryview(column).cast("B"))
+
+        unit_map = [self._unit_id(unit) for unit in units]
+        unit_map.insert(0, self._unit_id(default_unit))
+        if unit_map[1:] != list(range(1, len(unit_map))) or (
+            unit_map[0] != NO_UNIT and NO_UNIT in new_unit_ids
+        ):
+            new_unit_ids = array("H", [unit_map[unit_id] for unit_id in new_unit_ids])
+
+        string_map = [self._string_id(string) for string in strings]
+        if string_map != list(range(len(string_map))):
+            for index, kind in enumerate(new_kinds):
+                if kind == VALUE_STRING:
+                    new_values[index] = string_map[int(new_values[index])]
+
+        skipped = []
+        if MISSING_DATE in new_dates:
+            skipped = [
+                index for index, date in enumerate(new_dates) if date == MISSING_DATE
+            ]
+            kept = [
+                index for index, date in enumerate(new_dates) if date != MISSING_DATE
+            ]
+            new_dates, new_values, new_kinds, new_unit_ids = (
+                array(column.typecode, [column[index] for index in kept])
+                for column in (new_dates, new_values, new_kinds, new_unit_ids)
+            )
+
+        self._date_order = None
+        self.dates.extend(new_dates)
+        self.values.extend(new_values)
+        self.kinds.extend(new_kinds)
+        self.unit_ids.extend(new_unit_ids)
+        return skipped
+
+    def date_order(self) -> array:
+        """
+        Returns the positions of every entry, sorted by date. Entries without a date
+        sort first.
+        """
+        if self._date_order is None:
+            self._date_order = array(
+                "L", sorted(range(len(self.dates)), key=self.dates.__getitem__)
+            )
+
+        return self._date_order
+
+    def indices_between(
+        self, since_epoch: Optional[int] = None, until_epoch: Optional[int] = None
+    ) -> array:
+        """
+        Returns the positions of the entries dated within [since_epoch, until_epoch],
+        sorted by date, in O(log n). Either bound may be omitted. Entries without a
+        date are never included.
+        """
+        date_order, date_of = self.date_order(), self.dates.__getitem__
+        start = bisect_left(
+            date_order,
+            MISSING_DATE + 1 if since_epoch is None else since_epoch,
+            key=date_of,
+        )
+        end = (
+            len(date_order)
+            if until_epoch is None
+            else bisect_right(date_order, until_epoch, key=date_of)
+        )
+        return date_order[start:end]
+
+    def index_as_of(self, epoch_seconds: Optional[int] = None) -> Optional[int]:
+        """
+        Returns the position of the latest entry dated at or before `epoch_seconds`
+        (or the latest entry overall), or None if there isn't one.
+        """
+        date_order = self.date_order()
+        if epoch_seconds is None:
+            position = len(date_order) - 1
+        else:
+            position = bisect_right(
+                date_order, epoch_seconds, key=self.dates.__getitem__
+            ) - 1
+
+        if position < 0 or self.dates[date_order[position]] == MISSING_DATE:
+            return None
+        return date_order[position]
+
+    def date_at(self, index: int) -> Optional[datetime]:
+        from file_tools.date_codec import epoch_to_date
+
+        epoch_seconds = self.dates[index]
+        return None if epoch_seconds == MISSING_DATE else epoch_to_date(epoch_seconds)
+
+    def value_at(self, index: int) -> AllowedMetricValueTypes:
+        """
+        Returns the value of an entry, with inequality bounds returned as floats.
+        """
+        value, kind = self.values[index], self.kinds[index]
+        if kind == VALUE_BOOL:
+            return bool(value)
+        elif kind == VALUE_INT:
+            return int(value)
+        elif kind == VALUE_STRING:
+            return self.strings[int(value)]
+        return value
+
+    def unit_at(self, index: int) -> Optional[str]:
+        unit_id = self.unit_ids[index]
+        return None if unit_id == NO_UNIT else self.units[unit_id - 1]
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[Measurement, list[Measurement]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MeasurementSeries index out of range")
+
+        kind = self.kinds[index]
+        if kind in (VALUE_LESS_THAN, VALUE_GREATER_THAN):
+            inequality = (
+                InequalityType.GreaterThan
+                if kind == VALUE_GREATER_THAN
+                else InequalityType.LessThan
+            )
+            return InequalityMeasurement(
+                self.values[index],
+                inequality,
+                self.date_at(index),
+                unit=self.unit_at(index),
+            )
+
+        return Measurement(
+            self.value_at(index), self.date_at(index), unit=self.unit_at(index)
+        )
+
+    def __iter__(self) -> Iterator[Measurement]:
+        return (self[index] for index in range(len(self)))
+
+    def nbytes(self) -> int:
+        """
+        Returns the bytes used by the series' columns (excluding the unit and string tables).
+        """
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.dates, self.values, self.kinds, self.unit_ids)
+        )
+
+
 class HealthMetric:
     def __init__(self, metric_name: str, metric_type: MetricType = MetricType.Metric):
         self.metric_name: str = metric_name
-        self.entries: list[Measurement] = []
+        self.entries: MeasurementSeries = MeasurementSeries()
         self.metric_type: MetricType = metric_type
         self.unit = None
 
+        # Running Out of Range counters, kept up to date by `add_entry()`.
+        self.oor_count: int = 0
+        self.latest_oor_date: Optional[datetime] = None
+
     def assign_unit(self, unit: str):
         self.unit = unit
 
@@ -90,20 +477,90 @@ class HealthMetric:
     def add_entry(self, new_entry: Measurement):
         self.entries.append(new_entry)
 
-    def graph_metric(self):
-        return plot_metrics(self)
+        try:
+            is_out_of_range = self.value_is_out_of_range(new_entry)
+        except TypeError:
+            # Value can't be compared with the metric guide, so can't be out of range.
+            is_out_of_range = False
+
+        if is_out_of_range:
+            self.oor_count += 1
+            new_date = self.entries.date_at(-1)
+            if new_date and (not self.latest_oor_date or new_date > self.latest_oor_date):
+                self.latest_oor_date = new_date
+
+    def recount_oor(self):
+        """
+        Recount the Out of Range counters from every entry, e.g. after entries have
+        been loaded in bulk, or the metric guide has changed.
+        """
+        from data.oor_engine import oor_indices
+
+        oor_dates = [self.entries.date_at(index) for index in oor_indices(self)]
+        self.oor_count = len(oor_dates)
+        self.latest_oor_date = max(filter(None, oor_dates), default=None)
+
+    def graph_metric(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ):
+        from utils.plotting import plot_metrics
+
+        return plot_metrics(self, since=since, until=until)
 
     def add_to_existing_plot(self, plot):
+        from utils.plotting import plot_metrics
+
         return plot_metrics(plot, self)
 
     def get_all_OoR_values(self) -> list[Measurement]:
-        OoR_values = [
-            oor_measurement
-            for oor_measurement in self.entries
-            if self.value_is_out_of_range(oor_measurement)
+        """
+        Returns the Out of Range measurements, found by the OoR engine from the
+        series columns rather than by checking each measurement in turn.
+        """
+        from data.oor_engine import oor_indices
+
+        return [self.entries[index] for index in oor_indices(self)]
+
+    def between(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> list[Measurement]:
+        """
+        Returns the measurements dated within [since, until], oldest first. Either
+        bound may be omitted. Found by binary search over the series' date index, so
+        only the measurements returned are built.
+
+        Arguments:
+            since: Earliest date to include, or None for no lower bound.
+            until: Latest date to include, or None for no upper bound.
+
+        Returns:
+            List of measurements, sorted by date.
+        """
+        from file_tools.date_codec import date_to_epoch
+
+        return [
+            self.entries[index]
+            for index in self.entries.indices_between(
+                date_to_epoch(since) if since else None,
+                date_to_epoch(until) if until else None,
+            )
         ]
 
-        return OoR_values
+    def latest(self) -> Optional[Measurement]:
+        """
+        Returns the most recent measurement, or None if there are none.
+        """
+        return self.as_of(None)
+
+    def as_of(self, date: Optional[datetime]) -> Optional[Measurement]:
+        """
+        Returns the most recent measurement taken at or before `date`, or None if
+        there are none.
+        """
+        from file_tools.date_codec import date_to_epoch
+
+        index = self.entries.index_as_of(date_to_epoch(date) if date else None)
+        return None if index is None else self.entries[index]
 
     def __str__(self):
         return (
@@ -115,7 +572,10 @@ class HealthMetric:
         return "Generic Metric"
 
     def value_is_out_of_range(self, value: Measurement) -> bool:
-        """Must be implemented."""
+        """
+        Must be implemented. Inequality measurements should only be out of range
+        if every value they allow would be, matching `data.oor_engine`.
+        """
         pass
 
 
@@ -129,6 +589,11 @@ class RangedMetric(HealthMetric):
         return (self.range_minimum, self.range_maximum)
 
     def value_is_out_of_range(self, value: Measurement) -> bool:
+        if isinstance(value, InequalityMeasurement):
+            if value.inequality == InequalityType.LessThan:
+                return value.value <= self.range_minimum
+            return value.value >= self.range_maximum
+
         return not (self.range_minimum < value.value < self.range_maximum)
 
 
@@ -141,6 +606,11 @@ class GreaterThanMetric(HealthMetric):
         return self.bound
 
     def value_is_out_of_range(self, value: Measurement) -> bool:
+        if isinstance(value, InequalityMeasurement):
+            return (
+                value.inequality == InequalityType.LessThan and value.value <= self.bound
+            )
+
         return value.value < self.bound
 
 
@@ -153,6 +623,12 @@ class LessThanMetric(HealthMetric):
         return self.bound
 
     def value_is_out_of_range(self, value: Measurement) -> bool:
+        if isinstance(value, InequalityMeasurement):
+            return (
+                value.inequality == InequalityType.GreaterThan
+                and value.value >= self.bound
+            )
+
         return value.value > self.bound
 
 
@@ -175,17 +651,69 @@ class MetricGroup:
         unit: str = None,
         initial_metrics: list[HealthMetric] = None,
         group_name: str = None,
+        metric_sourcer: Optional[callable] = None,
     ):
         self.group_name: str = group_name
-        self.metric_dict = {}
-        self.count = 0
+        self._metric_dict: dict[str, HealthMetric] = {}
         self.enforce_units = unit is not None
         self.unit = unit
 
+        # Members registered by name, which are loaded with `metric_sourcer` the first
+        # time the group's metrics are needed (see `metric_dict`).
+        self._unloaded_names: list[str] = []
+        self.metric_sourcer = metric_sourcer
+
         # Case where group is instantiated with metrics.
         if initial_metrics:
             self.add_metrics(new_metrics=initial_metrics)
 
+    @property
+    def metric_dict(self) -> dict[str, HealthMetric]:
+        """
+        The metrics registered with this MetricGroup, by name. Any registered by name
+        are loaded now, if they haven't been already.
+        """
+        if self._unloaded_names:
+            unloaded_names, self._unloaded_names = self._unloaded_names, []
+            for metric_name in unloaded_names:
+                sourced_group = self.metric_sourcer(metric_input=[metric_name])
+                if sourced_group:
+                    for metric in sourced_group.as_list():
+                        self.add_metric(metric)
+
+        return self._metric_dict
+
+    @property
+    def count(self) -> int:
+        """
+        Number of metrics registered with this MetricGroup, loaded or not.
+        """
+        return len(self._metric_dict) + len(self._unloaded_names)
+
+    def member_names(self) -> list[str]:
+        """
+        Returns:
+            Names of the metrics registered with this MetricGroup, without loading
+            any of them.
+        """
+        return list(self._metric_dict) + self._unloaded_names
+
+    def add_metric_names(self, metric_names: list[str]):
+        """
+        Register metrics by name, without loading them. They're loaded with the
+        group's metric sourcer the first time the group's metrics are needed, and
+        have their units checked then.
+
+        Arguments:
+            metric_names: Names of the metrics to be registered.
+        """
+        if self.metric_sourcer is None:
+            raise ValueError("MetricGroup needs a metric sourcer to add metrics by name.")
+
+        for metric_name in metric_names:
+            if metric_name not in self.member_names():
+                self._unloaded_names.append(metric_name)
+
     def combine_groups(
         self,
         other_group: MetricGroup,
@@ -225,8 +753,47 @@ class MetricGroup:
         """
         return [metric for metric in self.metric_dict.values()]
 
+    def between(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> dict[str, list[Measurement]]:
+        """
+        Returns each metric's measurements dated within [since, until], oldest first.
+        Either bound may be omitted.
+
+        Returns:
+            Dict of metric name to list of measurements.
+        """
+        return {
+            metric_name: metric.between(since, until)
+            for metric_name, metric in self.metric_dict.items()
+        }
+
+    def latest(self) -> dict[str, Optional[Measurement]]:
+        """
+        Returns:
+            Dict of metric name to its most recent measurement.
+        """
+        return {
+            metric_name: metric.latest()
+            for metric_name, metric in self.metric_dict.items()
+        }
+
+    def as_of(self, date: Optional[datetime]) -> dict[str, Optional[Measurement]]:
+        """
+        Returns:
+            Dict of metric name to its most recent measurement at or before `date`.
+        """
+        return {
+            metric_name: metric.as_of(date)
+            for metric_name, metric in self.metric_dict.items()
+        }
+
     def graph_group(
-        self, show_bounds: bool = True, show_graph: bool = False
+        self,
+        show_bounds: bool = True,
+        show_graph: bool = False,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
     ) -> plotly.graph_objects.Figure:
         """
         Generate a stacked graph of the metrics within this group.
@@ -238,10 +805,18 @@ class MetricGroup:
             show_graph: A bool indicating whether the graph should be shown,
                 or just returned.
 
+            since: Earliest date to plot, or None for no lower bound.
+
+            until: Latest date to plot, or None for no upper bound.
+
         Returns:
             A graph of the metrics contained within this group.
         """
-        figure = plot_metrics(self.as_list(), show_bounds=show_bounds)
+        from utils.plotting import plot_metrics
+
+        figure = plot_metrics(
+            self.as_list(), show_bounds=show_bounds, since=since, until=until
+        )
 
         if show_graph:
             figure.show()
@@ -264,8 +839,9 @@ class MetricGroup:
             )
             return False
 
-        self.metric_dict[new_metric.metric_name] = new_metric
-        self.count += 1
+        if new_metric.metric_name in self._unloaded_names:
+            self._unloaded_names.remove(new_metric.metric_name)
+        self._metric_dict[new_metric.metric_name] = new_metric
         return True
 
     def add_metrics(self, new_metrics: list[HealthMetric]) -> list[bool]:
@@ -307,9 +883,11 @@ class MetricGroup:
             deregistered.
         """
         # Metric name is present, deregister correctly.
-        if metric_name in self.metric_dict.keys():
-            self.metric_dict.pop(metric_name)
-            self.count -= 1
+        if metric_name in self._unloaded_names:
+            self._unloaded_names.remove(metric_name)
+            return True
+        if metric_name in self._metric_dict:
+            self._metric_dict.pop(metric_name)
             return True
 
         # Metric name was not found.
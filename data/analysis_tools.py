@@ -1,36 +1,130 @@
-from classes import HealthMetric
+from classes import HealthMetric, InequalityMeasurement, Measurement
 import time
 
-from file_tools.metric_file_parsing import get_all_metric_files
+from data.oor_engine import oor_indices
+from file_tools.metric_file_parsing import (
+    generate_health_metric_from_file,
+    get_all_metric_files,
+    get_metric_catalog,
+    get_metric_names,
+    rebuild_catalog_entries,
+)
 
 
-def find_oor(_):
+def _oor_value(measurement: Measurement):
+    # Inequalities are kept as they're written, e.g. "<5.0", not as their bound.
+    if isinstance(measurement, InequalityMeasurement):
+        return str(measurement)
+    return measurement.value
+
+
+def collect_oor(
+    show_values: bool = False,
+) -> tuple[list[dict], dict[str, list], dict[str, float]]:
+    """
+    Collect every metric which is defined as "Out of Range". The summary is read from
+    the metric catalog's OoR counters, so no metric files are opened unless values are
+    requested, in which case the out of range metrics are loaded in parallel.
+
+    Arguments:
+        show_values: If true, also load each out of range metric for its OoR values.
+
+    Returns:
+        The catalog entries of the out of range metrics, their OoR values by metric
+        name (if requested), and the time taken by each phase.
+    """
+    # Catalog phase.
+    phase_start = time.perf_counter()
+    catalog = get_metric_catalog()
+    oor_entries = [
+        catalog.get(metric_name)
+        for metric_name in catalog.names()
+        if catalog.get(metric_name)["oor_count"]
+    ]
+    phase_times = {"catalog": time.perf_counter() - phase_start}
+
+    # Load and evaluate phases, only needed to list values.
+    oor_values = {}
+    if show_values:
+        phase_start = time.perf_counter()
+        metrics = get_all_metric_files(
+            [entry["metric_name"] for entry in oor_entries]
+        )
+        phase_times["load"] = time.perf_counter() - phase_start
+
+        phase_start = time.perf_counter()
+        for metric in metrics:
+            oor_values[metric.metric_name] = [
+                _oor_value(metric.entries[index]) for index in oor_indices(metric)
+            ]
+        phase_times["evaluate"] = time.perf_counter() - phase_start
+
+    return oor_entries, oor_values, phase_times
+
+
+def find_oor(arguments: list):
     """
-    Show all metrics which are defined as "Out of Range".
+    Show all metrics which are defined as "Out of Range". Timings are shown for each
+    phase.
+
+    Accepted arguments:
+        "values": Also load each out of range metric and list its OoR values.
     """
-    start_time = time.time()
-    metrics = find_all_oor_metrics()
-    num_metrics = len(metrics)
+    oor_entries, oor_values, phase_times = collect_oor(
+        show_values="values" in arguments
+    )
 
+    num_metrics = len(oor_entries)
     print(f"\nFound {num_metrics} Out of Range health metrics:")
-    for i, metric in enumerate(metrics):
-        oor_values = [measurement.value for measurement in metric.get_all_OoR_values()]
-        oor_measurement_count = len(oor_values)
+    for i, entry in enumerate(oor_entries):
+        oor_measurement_count = entry["oor_count"]
         plural = "s" if oor_measurement_count != 1 else ""
+        values_text = ""
+        if entry["metric_name"] in oor_values:
+            values_text = f": {oor_values[entry['metric_name']]}"
         print(
-            f" ({i+1}): {metric.metric_name} -> {oor_measurement_count} measurement{plural}: {oor_values}. Should be '{metric.metric_guide()}'"
+            f" ({i+1}): {entry['metric_name']} -> {oor_measurement_count} measurement{plural}{values_text}. Should be '{entry['metric_guide']}'"
+            f" (latest {entry['latest_oor_date']})"
         )
-    print(f"(time taken: {time.time() - start_time:.2f})")
+
+    timings = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in phase_times.items())
+    print(f"(time taken: {sum(phase_times.values()):.3f}s - {timings})")
 
 
 def find_all_oor_metrics() -> list[HealthMetric]:
     """
     Find a list of all metric files that contain at least one measurement that is defined
-    as Out of Range for that metric type.
+    as Out of Range for that metric type. Only metrics the catalog reports as having
+    OoR measurements are loaded.
 
     Returns:
         List of out of range containing HealthMetric objects.
 
     """
+    catalog = get_metric_catalog()
+
+    return [
+        generate_health_metric_from_file(metric_name)
+        for metric_name in catalog.names()
+        if catalog.get(metric_name)["oor_count"]
+    ]
+
+
+def rebuild_oor(arguments: list):
+    """
+    Recount the OoR counters held in the metric catalog, from each metric's stored
+    measurements. Use this after changing a metric's guide.
+
+    Accepted arguments:
+        Any number of metric names. If none are given, every metric is rebuilt.
+    """
+    known_names = set(get_metric_names())
+    for unknown_name in set(arguments) - known_names:
+        print(f"No metric named '{unknown_name}'.")
+
+    metric_names = [name for name in arguments if name in known_names]
+    if arguments and not metric_names:
+        return
 
-    return [metric for metric in get_all_metric_files() if metric.get_all_OoR_values()]
+    rebuilt_count = rebuild_catalog_entries(metric_names or None)
+    print(f"Rebuilt OoR counters for {rebuilt_count} metrics.")
@@ -0,0 +1,139 @@
+import csv
+import gzip
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+from data.bulk_import import IMPORT_COLUMNS
+from file_tools.metric_file_parsing import get_metric_names, iter_metric_entries
+from utils.logger import logger
+from utils.utils import parse_date_range_arguments
+
+EXPORT_FORMATS = ["csv", "jsonl"]
+
+
+def iter_export_rows(
+    metric_names: list[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[dict]:
+    """
+    Yield a row for every measurement in the given metrics, one metric at a time,
+    in the same columns read by the bulk importer.
+    """
+    for metric_name in metric_names:
+        for entry in iter_metric_entries(metric_name, since, until):
+            yield {
+                "metric": metric_name,
+                "value": entry["value"],
+                "date": entry["date"],
+                "unit": entry.get("unit"),
+            }
+
+
+def _open_export_file(file_path: Path, compress: bool) -> TextIO:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    if compress:
+        return gzip.open(file_path, "wt", newline="")
+
+    return open(file_path, "w", newline="")
+
+
+def export_measurements(
+    file_path: Path,
+    metric_names: Optional[list[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    export_format: Optional[str] = None,
+    compress: Optional[bool] = None,
+) -> dict[str, float]:
+    """
+    Stream measurements to a CSV or JSONL file. Rows are written as they're read,
+    and only one metric is held in memory at a time, so memory use doesn't grow with
+    the size of the store.
+
+    Arguments:
+        file_path: Path to write to.
+        metric_names: Metrics to export, or None for every metric.
+        since: Earliest date to export, or None for no lower bound.
+        until: Latest date to export, or None for no upper bound.
+        export_format: "csv" or "jsonl". Defaults to the file extension (ignoring
+            any ".gz"), then CSV.
+        compress: Whether to gzip the output. Defaults to whether the path ends ".gz".
+
+    Returns:
+        Dict of export statistics.
+    """
+    start_time = time.perf_counter()
+    suffixes = [suffix.lstrip(".").lower() for suffix in file_path.suffixes]
+    if compress is None:
+        compress = suffixes[-1:] == ["gz"]
+    if export_format is None:
+        export_format = next(
+            (suffix for suffix in suffixes if suffix in EXPORT_FORMATS), "csv"
+        )
+
+    metric_names = metric_names or get_metric_names()
+    row_count = 0
+
+    with _open_export_file(file_path, compress) as export_file:
+        if export_format == "csv":
+            writer = csv.DictWriter(export_file, fieldnames=IMPORT_COLUMNS)
+            writer.writeheader()
+            write_row = writer.writerow
+        else:
+
+            def write_row(row: dict):
+                export_file.write(json.dumps(row) + "\n")
+
+        for row in iter_export_rows(metric_names, since, until):
+            write_row(row)
+            row_count += 1
+
+    seconds = time.perf_counter() - start_time
+    return {
+        "rows": row_count,
+        "metrics": len(metric_names),
+        "seconds": seconds,
+        "rows_per_second": row_count / seconds if seconds else 0,
+    }
+
+
+def bulk_export(arguments: list):
+    """
+    Export measurements to a CSV or JSONL file (gzipped if the path ends ".gz"), in
+    the format read by `write import`.
+
+    Accepted arguments:
+        Position 1: Path to the export file.
+        Any further positions: Names of metrics to export, otherwise all are exported.
+        "--since DATE" / "--until DATE": Only export measurements within these dates.
+    """
+    try:
+        arguments, since, until = parse_date_range_arguments(arguments)
+    except ValueError as e:
+        print(e)
+        return
+
+    if not arguments:
+        print("Usage: export <file.csv|file.jsonl[.gz]> [metric names] [--since DATE] [--until DATE]")
+        return
+
+    known_names = set(get_metric_names())
+    metric_names = [name for name in arguments[1:] if name in known_names]
+    for unknown_name in set(arguments[1:]) - known_names:
+        print(f"No metric named '{unknown_name}', skipping.")
+    if arguments[1:] and not metric_names:
+        return
+
+    file_path = Path(arguments[0])
+    stats = export_measurements(file_path, metric_names, since, until)
+
+    logger.add(
+        "action",
+        f"Exported {stats['rows']} measurements from {stats['metrics']} metrics to "
+        f"'{file_path}' in {stats['seconds']:.2f}s, {stats['rows_per_second']:.0f} rows/s.",
+        cli_out=True,
+    )
@@ -0,0 +1,256 @@
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+from classes import HealthMetric, Measurement
+from data.data_entry import build_measurement, parse_date_str, parse_value_str
+from file_tools.metric_file_parsing import (
+    fold_journal,
+    generate_metric_file,
+    get_metric_registry,
+    journal_measurements,
+    using_sqlite_store,
+)
+from file_tools.metric_journal import journal_size
+from utils.logger import logger
+from utils.utils import is_verbatim
+
+# Rows are grouped by metric and journalled once this many have been read, so
+# memory use is bounded however large the import file is.
+IMPORT_CHUNK_ROWS = 50_000
+
+IMPORT_COLUMNS = ["metric", "value", "date", "unit"]
+
+# A parsed import row: (metric name, measurement), or None if the row is unusable.
+ImportRow_T = Optional[tuple[str, Measurement]]
+
+
+def _parse_row(row: dict) -> ImportRow_T:
+    try:
+        metric_name = str(row["metric"]).strip().lower()
+        if not metric_name:
+            raise ValueError("no metric name")
+
+        value = row["value"]
+        if isinstance(value, str):
+            value = parse_value_str(value.strip())
+
+        measurement = build_measurement(
+            value,
+            parse_date_str(str(row["date"]).strip()),
+            str(row.get("unit") or "").strip() or None,
+        )
+        return metric_name, measurement
+    except (KeyError, TypeError, ValueError) as e:
+        logger.add("WARNING", f"Skipping unreadable import row {row}: {e}")
+        return None
+
+
+def _iter_csv_rows(file_path: Path) -> Iterator[dict]:
+    """
+    Yield the rows of a CSV file as dicts. A header row naming the columns is
+    optional, without one the columns are taken as metric, value, date and unit.
+    """
+    with open(file_path, "r", newline="") as import_file:
+        reader = csv.reader(import_file)
+        columns = IMPORT_COLUMNS
+
+        for line_number, fields in enumerate(reader):
+            if line_number == 0 and "metric" in [field.strip().lower() for field in fields]:
+                columns = [field.strip().lower() for field in fields]
+                continue
+            if fields:
+                yield dict(zip(columns, fields))
+
+
+def _iter_jsonl_rows(file_path: Path) -> Iterator[dict]:
+    with open(file_path, "r") as import_file:
+        for line_number, line in enumerate(import_file):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.add("WARNING", f"Skipping unreadable import line {line_number}.")
+
+
+def _iter_entry_rows(file_path: Path) -> Iterator[dict]:
+    """
+    Yield the lines of a text file written as data entry input, i.e.
+    "metric value DDMMYYYY [unit]". Blank lines and lines starting with "#" are
+    ignored. Data entry wildcards aren't supported.
+    """
+    with open(file_path, "r") as import_file:
+        for line in import_file:
+            if line.strip() and not line.lstrip().startswith("#"):
+                yield dict(zip(IMPORT_COLUMNS, line.split()))
+
+
+def iter_import_rows(file_path: Path) -> Iterator[ImportRow_T]:
+    """
+    Stream the rows of a CSV, JSONL or text import file, one parsed row at a time.
+
+    Arguments:
+        file_path: Path to a .csv, .jsonl, or .txt file (of data entry lines).
+
+    Returns:
+        Iterator of (metric name, measurement) tuples, or None for unusable rows.
+    """
+    suffix = file_path.suffix.lower()
+    if suffix == ".csv":
+        raw_rows = _iter_csv_rows(file_path)
+    elif suffix == ".txt":
+        raw_rows = _iter_entry_rows(file_path)
+    else:
+        raw_rows = _iter_jsonl_rows(file_path)
+
+    return (_parse_row(row) for row in raw_rows)
+
+
+class MetricNameResolver:
+    """
+    Resolves metric names from an import file to metrics in the store, following
+    the data entry rules: known names are used as they are, verbatim names create a
+    new metric if needed, and other names are matched to the closest known metric
+    (unless `strict`, in which case their rows are skipped). Each distinct name is
+    only resolved once.
+    """
+
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+        self.known_names = get_metric_registry()
+        self.resolved: dict[str, Optional[str]] = {}
+        self.created: list[str] = []
+
+    def resolve(self, metric_name: str, unit: Optional[str]) -> Optional[str]:
+        if metric_name not in self.resolved:
+            self.resolved[metric_name] = self._resolve(metric_name, unit)
+
+        return self.resolved[metric_name]
+
+    def _resolve(self, metric_name: str, unit: Optional[str]) -> Optional[str]:
+        if metric_name in self.known_names:
+            return metric_name
+
+        if verbatim_name := is_verbatim(metric_name):
+            if verbatim_name not in self.known_names:
+                # Metric type can't be asked for, so imported metrics start as generic.
+                new_metric = HealthMetric(metric_name=verbatim_name)
+                new_metric.assign_unit(unit)
+                generate_metric_file(health_metric=new_metric)
+                self.created.append(verbatim_name)
+            return verbatim_name
+
+        if self.strict or not self.known_names:
+            logger.add("WARNING", f"Import skipping unrecognised metric '{metric_name}'.")
+            return None
+
+        closest_name = self.known_names.closest_matches(metric_name)[0]
+        logger.add("action", f"Import matched '{metric_name}' to '{closest_name}'.")
+        return closest_name
+
+
+def import_measurements(
+    file_path: Path, strict: bool = False, chunk_rows: int = IMPORT_CHUNK_ROWS
+) -> dict[str, float]:
+    """
+    Import every measurement in a CSV, JSONL or text file. Rows are read as a stream and
+    grouped by metric, and each chunk of `chunk_rows` rows is appended to the
+    journals of the metrics it touches. Each metric file is then written once, as
+    its journal is folded in.
+
+    Arguments:
+        file_path: Path to the import file.
+        strict: If true, skip rows for unrecognised metrics rather than matching
+            them to the closest known metric.
+        chunk_rows: Number of rows to buffer before writing.
+
+    Returns:
+        Dict of import statistics. Rows are only counted as imported once they're in
+        the metric file, those journalled but not folded in are counted as unfolded.
+    """
+    start_time = time.perf_counter()
+    resolver = MetricNameResolver(strict=strict)
+    stats = {"rows": 0, "imported": 0, "skipped": 0, "unfolded": 0, "metrics": 0}
+    journalled_counts: dict[str, int] = {}
+    pending: dict[str, list[Measurement]] = {}
+    pending_count = 0
+
+    def write_pending():
+        for metric_name, measurements in pending.items():
+            if journal_measurements(metric_name, measurements):
+                journalled_counts[metric_name] = (
+                    journalled_counts.get(metric_name, 0) + len(measurements)
+                )
+            else:
+                stats["skipped"] += len(measurements)
+        pending.clear()
+
+    for parsed_row in iter_import_rows(file_path):
+        stats["rows"] += 1
+        metric_name = (
+            resolver.resolve(parsed_row[0], parsed_row[1].unit) if parsed_row else None
+        )
+        if metric_name is None:
+            stats["skipped"] += 1
+            continue
+
+        pending.setdefault(metric_name, []).append(parsed_row[1])
+        pending_count += 1
+        if pending_count >= chunk_rows:
+            write_pending()
+            pending_count = 0
+
+    write_pending()
+    # The SQLite store has no journal, its measurements were stored as they were
+    # written. Otherwise another writer may have folded the journal first.
+    already_stored = using_sqlite_store()
+    for metric_name, journalled_count in journalled_counts.items():
+        if (
+            already_stored
+            or fold_journal(metric_name)
+            or not journal_size(metric_name)
+        ):
+            stats["imported"] += journalled_count
+            stats["metrics"] += 1
+        else:
+            stats["unfolded"] += journalled_count
+
+    stats["created"] = len(resolver.created)
+    stats["seconds"] = time.perf_counter() - start_time
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+    return stats
+
+
+def bulk_import(arguments: list):
+    """
+    Import measurements from a CSV, JSONL or text file, without interactive data
+    entry. Each row holds a metric name, value, date (DDMMYYYY or ISO) and optional
+    unit.
+
+    Accepted arguments:
+        Position 1: Path to the import file.
+        "strict": Skip rows for unrecognised metrics, rather than matching them to
+            the closest known metric.
+    """
+    if not arguments:
+        print("Usage: import <file.csv|file.jsonl|file.txt> [strict]")
+        return
+
+    file_path = Path(arguments[0])
+    if not file_path.exists():
+        logger.add("warning", f"No import file at '{file_path}'.", cli_out=True)
+        return
+
+    stats = import_measurements(file_path, strict="strict" in arguments[1:])
+
+    logger.add(
+        "action",
+        f"Imported {stats['imported']} of {stats['rows']} rows from '{file_path}' into "
+        f"{stats['metrics']} metrics ({stats['created']} created, {stats['skipped']} "
+        f"skipped, {stats['unfolded']} left in journals) in {stats['seconds']:.2f}s, "
+        f"{stats['rows_per_second']:.0f} rows/s.",
+        cli_out=True,
+    )
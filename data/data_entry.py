@@ -11,17 +11,17 @@ from file_tools.metric_file_parsing import (
     parse_health_metric,
     add_measurement_to_metric_file,
     generate_metric_file,
+    get_metric_registry,
 )
-from utils.sequence_matcher import get_closest_matches
-from file_tools.utils import (
-    is_inequality_value_str,
-)
+from file_tools.metric_registry import MetricNameRegistry
+from file_tools.typo_aliases import typo_aliases
+from data.write_session import WriteSession
+from file_tools.date_codec import decode_date
+from utils.value_kinds import is_inequality_value_str
 from utils.utils import is_verbatim
 from utils.logger import logger
-from file_tools.filepaths import get_filenames_without_extension
 
 Entry_T = Optional[str]
-data_entry_strptime_format = "%d%m%Y"
 
 """
 
@@ -55,21 +55,66 @@ def generate_new_metric(
     return new_health_metric
 
 
+def parse_date_str(date_str: str) -> datetime:
+    """
+    Parse a date in the data entry format (DDMMYYYY), or ISO format.
+    """
+    return decode_date(date_str)
+
+
+def parse_value_str(value_str: str) -> AllowedMetricValueTypes:
+    """
+    Convert the value part of an input to its datatype: a bool, an inequality,
+    a float, or failing those the string itself.
+    """
+    # If value is boolean, try to parse.
+    if value_str.lower() in ["true", "false"]:
+        return value_str.lower() == "true"
+    elif is_inequality_value_str(input_str=value_str):
+        # Is an inequality.
+        return InequalityValue(value_str)
+
+    # Not bool or inequality, may be floating point.
+    try:
+        return float(value_str)
+    except ValueError:
+        # Not float, must be string.
+        return value_str
+
+
+def build_measurement(
+    value: AllowedMetricValueTypes, date: datetime, unit: Optional[str] = None
+) -> Measurement:
+    """
+    Build the Measurement for a parsed value, which is an InequalityMeasurement for
+    inequality values.
+    """
+    if isinstance(value, InequalityValue):
+        return InequalityMeasurement(
+            bound=value.value, inequality=value.inequality_type, date=date, unit=unit
+        )
+
+    return Measurement(value=value, date=date, unit=unit)
+
+
 def add_to_metric(
     metric_name: str,
     value: AllowedMetricValueTypes,
     date: datetime,
     unit: Optional[str] = None,
+    write_session: Optional[WriteSession] = None,
 ):
-    if isinstance(value, InequalityValue):
-        measurement = InequalityMeasurement(
-            bound=value.value, inequality=value.inequality_type, date=date, unit=unit
-        )
-    else:
-        measurement = Measurement(value=value, date=date, unit=unit)
+    """
+    Add a measurement to a metric. If a write session is given, the measurement is
+    buffered by the session rather than written straight away.
+    """
+    measurement = build_measurement(value, date, unit)
 
     # Create new metric entry.
-    add_measurement_to_metric_file(metric_name=metric_name, measurement=measurement)
+    if write_session:
+        write_session.add(metric_name=metric_name, measurement=measurement)
+    else:
+        add_measurement_to_metric_file(metric_name=metric_name, measurement=measurement)
 
 
 class InputHandler:
@@ -86,6 +131,7 @@ class InputHandler:
         last_value_used: Records the most recent metric value processed by this handler.
         last_date_recorded: Records the most recent datetime processed by this handler.
         last_unit_used: Records the most recent unit processed by this handler.
+        write_session: Session buffering this handler's measurements, if any.
     """
 
     last_metric_used: str = None
@@ -93,22 +139,39 @@ class InputHandler:
     last_date_recorded: datetime = datetime(year=1, month=1, day=1)
     last_unit_used: str = None
 
-    def __init__(self, metric_file_path: str):
+    def __init__(
+        self, metric_file_path: str, write_session: Optional[WriteSession] = None
+    ):
         """
         Initialises a new handler.
 
         Attributes:
             metric_file_path: Path to metric file dir.
+            write_session: Session to buffer measurements in. If None, each
+                measurement is written as it is entered.
         """
         self.metric_file_path = metric_file_path
-        self.update_recognised_metrics()
+        self.write_session = write_session
 
-    def update_recognised_metrics(self) -> int:
+    @property
+    def recognised_metrics(self) -> MetricNameRegistry:
         """
-        Updates the list of recognised metrics, returning the count.
+        The names of every metric in the store. The registry only re-lists the store
+        when it has changed, and is updated as new metrics are generated.
         """
+        return get_metric_registry()
 
-        self.recognised_metrics = get_filenames_without_extension(self.metric_file_path)
+    def remembered_alias(self, metric_name: str) -> Optional[dict]:
+        """
+        Returns the typo alias for an unrecognised metric name, if it has been
+        resolved before and still resolves to a metric.
+        """
+        alias = typo_aliases.get(metric_name)
+        if alias and alias["metric_name"] not in self.recognised_metrics:
+            typo_aliases.forget(metric_name)
+            return None
+
+        return alias
 
     def parse_input_str(
         self, input_str: str
@@ -152,24 +215,14 @@ class InputHandler:
         if value_str == "*":
             value: AllowedMetricValueTypes = self.last_value_used
         else:
-            # If value is boolean, try to parse.
-            if value_str.lower() in ["true", "false"]:
-                value = value_str.lower() == "true"
-            elif is_inequality_value_str(input_str=value_str):
-                # Is an inequality.
-                value = InequalityValue(value_str)
-            else:
-                # Not bool or inequality, may be floating point.
-                try:
-                    value = float(value_str)
-                except ValueError:
-                    # Not float, must be string.
-                    value = value_str
-        date = (
-            self.last_date_recorded
-            if date_str == "*"
-            else datetime.strptime(date_str, data_entry_strptime_format)
-        )
+            value = parse_value_str(value_str)
+        try:
+            date = (
+                self.last_date_recorded if date_str == "*" else parse_date_str(date_str)
+            )
+        except ValueError:
+            logger.add("warning", f"InputHandler unable to parse date: {date_str}")
+            return None
         metric_name = (
             self.last_metric_used if metric_name_str == "*" else metric_name_str.lower()
         )
@@ -218,11 +271,14 @@ class ManualEntryHandler(InputHandler):
 
         # Check if generating new metric, or adding to metric;
         if metric_name in self.recognised_metrics:
-            add_to_metric(metric_name, value, date, unit)
+            add_to_metric(
+                metric_name, value, date, unit, write_session=self.write_session
+            )
         else:
             generate_new_metric(metric_name, unit)
-            add_to_metric(metric_name, value, date, unit)
-            self.update_recognised_metrics()
+            add_to_metric(
+                metric_name, value, date, unit, write_session=self.write_session
+            )
 
 
 class AssistedEntryHandler(InputHandler):
@@ -235,6 +291,9 @@ class AssistedEntryHandler(InputHandler):
     """
 
     required_close_matches = 3
+    # Times a misspelling must have been resolved to the same metric before it's
+    # matched without asking.
+    alias_confidence = 2
 
     def set_required_close_matches(self, required_matches: int):
         if required_matches > 0:
@@ -254,7 +313,7 @@ class AssistedEntryHandler(InputHandler):
 
         # Check if generating new metric, or adding to metric;
         if metric_name in self.recognised_metrics:
-            add_to_metric(metric_name, value, date)
+            add_to_metric(metric_name, value, date, write_session=self.write_session)
         else:
             # Check first for verbatim request.
             if verbatim_result := is_verbatim(metric_name):
@@ -262,36 +321,73 @@ class AssistedEntryHandler(InputHandler):
                     f"Creating new metric '{verbatim_result}' and adding measurement."
                 )
                 generate_new_metric(verbatim_result, unit)
-                add_to_metric(verbatim_result, value, date, unit)
-            else:
-                # Not recognised, find close to.
-                similar_metrics = get_closest_matches(
-                    metric_name, self.recognised_metrics, self.required_close_matches
-                )
-                print(
-                    f"'{metric_name}' is not recognised, choose from one of the below close matches,\n"
-                    " or (v) to create a new metric using the input name:"
+                add_to_metric(
+                    verbatim_result, value, date, unit, write_session=self.write_session
                 )
+            else:
+                self.resolve_unrecognised(metric_name, value, date, unit)
+
+    def resolve_unrecognised(
+        self,
+        metric_name: str,
+        value: AllowedMetricValueTypes,
+        date: datetime,
+        unit: Optional[str],
+    ):
+        """
+        Ask the user which metric an unrecognised name was meant to be, unless the
+        typo aliases show they've chosen the same metric for it enough times before.
+        """
+        alias = self.remembered_alias(metric_name)
+        if alias and alias["count"] >= self.alias_confidence:
+            matched_name = alias["metric_name"]
+            print(
+                f"[matched '{metric_name}' to '{matched_name}', "
+                f"chosen {alias['count']} times before]"
+            )
+            typo_aliases.record(metric_name, matched_name)
+            add_to_metric(
+                matched_name, value, date, unit, write_session=self.write_session
+            )
+            return
+
+        # Not recognised, find close to. A previous choice is always offered first.
+        similar_metrics = self.recognised_metrics.closest_matches(
+            metric_name, self.required_close_matches
+        )
+        if alias:
+            previous_choice = alias["metric_name"]
+            similar_metrics = [previous_choice] + [
+                similar for similar in similar_metrics if similar != previous_choice
+            ][: self.required_close_matches - 1]
+
+        print(
+            f"'{metric_name}' is not recognised, choose from one of the below close matches,\n"
+            " or (v) to create a new metric using the input name:"
+        )
 
-                # Display closest matches and ask user to choose one, or to use their input (v)erbatim.
-                for i, similar in enumerate(similar_metrics):
-                    print(f"({i+1}) {similar}")
-                print(f"(v) {metric_name}")
-                user_response = input(" -> ")
-
-                # Use chose (v)erbatim.
-                if user_response == "v":
-                    print(
-                        f"Creating new metric '{metric_name}' and adding measurement."
-                    )
-                    generate_new_metric(metric_name, unit)
-                    add_to_metric(metric_name, value, date, unit)
-                    self.update_recognised_metrics()
-                else:
-                    # User chose from existing names.
-                    metric_name = similar_metrics[int(user_response) - 1]
-                    print(f"Adding measurement to {metric_name}.")
-                    add_to_metric(metric_name, value, date, unit)
+        # Display closest matches and ask user to choose one, or to use their input (v)erbatim.
+        for i, similar in enumerate(similar_metrics):
+            print(f"({i+1}) {similar}")
+        print(f"(v) {metric_name}")
+        user_response = input(" -> ")
+
+        # Use chose (v)erbatim.
+        if user_response == "v":
+            print(f"Creating new metric '{metric_name}' and adding measurement.")
+            generate_new_metric(metric_name, unit)
+            typo_aliases.forget(metric_name)
+            add_to_metric(
+                metric_name, value, date, unit, write_session=self.write_session
+            )
+        else:
+            # User chose from existing names.
+            chosen_name = similar_metrics[int(user_response) - 1]
+            typo_aliases.record(metric_name, chosen_name)
+            print(f"Adding measurement to {chosen_name}.")
+            add_to_metric(
+                chosen_name, value, date, unit, write_session=self.write_session
+            )
 
 
 class SpeedyEntryHandler(InputHandler):
@@ -313,7 +409,9 @@ class SpeedyEntryHandler(InputHandler):
 
         # Check if generating new metric, or adding to metric;
         if metric_name in self.recognised_metrics:
-            add_to_metric(metric_name, value, date, unit)
+            add_to_metric(
+                metric_name, value, date, unit, write_session=self.write_session
+            )
         else:
             # Check first for verbatim request.
             if verbatim_result := is_verbatim(metric_name):
@@ -321,19 +419,26 @@ class SpeedyEntryHandler(InputHandler):
                     f"Creating new metric '{verbatim_result}' and adding measurement."
                 )
                 generate_new_metric(verbatim_result, unit)
-                add_to_metric(verbatim_result, value, date, unit)
-                self.update_recognised_metrics()
-            else:
-                # Not recognised and not verbatim, use the closest match.
-                similar_metrics = get_closest_matches(
-                    metric_name, self.recognised_metrics, 1
+                add_to_metric(
+                    verbatim_result, value, date, unit, write_session=self.write_session
                 )
+            else:
+                # Not recognised and not verbatim, use the metric it was resolved to
+                # last time, otherwise the closest match.
+                if alias := self.remembered_alias(metric_name):
+                    matched_name = alias["metric_name"]
+                else:
+                    matched_name = self.recognised_metrics.closest_matches(
+                        metric_name, 1
+                    )[0]
+                typo_aliases.record(metric_name, matched_name)
 
                 logger.add(
                     "action",
-                    f"{metric_name} not recognised, MODE 3 matched to {similar_metrics[0]}.",
+                    f"{metric_name} not recognised, MODE 3 matched to {matched_name}.",
                 )
-                print(f"[matched '{metric_name}' to '{similar_metrics[0]}']")
+                print(f"[matched '{metric_name}' to '{matched_name}']")
 
-                metric_name = similar_metrics[0]
-                add_to_metric(metric_name, value, date, unit)
+                add_to_metric(
+                    matched_name, value, date, unit, write_session=self.write_session
+                )
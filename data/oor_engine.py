@@ -0,0 +1,146 @@
+from __future__ import annotations
+from itertools import compress
+from typing import TYPE_CHECKING, Iterator
+
+from utils.value_kinds import (
+    VALUE_BOOL,
+    VALUE_FLOAT,
+    VALUE_GREATER_THAN,
+    VALUE_INT,
+    VALUE_LESS_THAN,
+    VALUE_STRING,
+)
+
+if TYPE_CHECKING:
+    from classes import HealthMetric
+
+"""
+Out of Range evaluation over a metric's MeasurementSeries columns.
+
+Rather than calling `value_is_out_of_range()` per measurement, each check is built as
+a mask: a bytes object with one 0/1 byte per entry. Masks over the value column come
+from mapping a float comparison across the column, and masks over the kind column
+from translating its bytes, so neither runs Python code per entry. Masks are then
+combined as integers, and counted or compressed against the entry indexes.
+
+Inequality measurements are censored values: "<5" only says the true value is below
+5. They are only counted as out of range when every value they allow would be, e.g.
+"<3" for a metric that should be greater than 4, but never ">3".
+"""
+
+
+def _kind_table(*kinds: int) -> bytes:
+    """
+    Returns a bytes.translate() table mapping the given kinds to 1, and all others to 0.
+    """
+    return bytes(1 if kind in kinds else 0 for kind in range(256))
+
+
+# Exact values that can be compared with a bound. Booleans compare as 0 and 1.
+EXACT_KINDS = _kind_table(VALUE_FLOAT, VALUE_INT, VALUE_BOOL)
+LESS_THAN_KINDS = _kind_table(VALUE_LESS_THAN)
+GREATER_THAN_KINDS = _kind_table(VALUE_GREATER_THAN)
+STRING_KINDS = _kind_table(VALUE_STRING)
+
+
+def _value_mask(values, predicate: callable) -> bytes:
+    """
+    Returns a mask of the entries in `values` that satisfy a float comparison method,
+    e.g. `bound.__gt__` for the values below `bound`.
+    """
+    return bytes(map(predicate, values))
+
+
+def _kind_mask(kinds, table: bytes) -> bytes:
+    return kinds.tobytes().translate(table)
+
+
+def _and(first: bytes, second: bytes) -> int:
+    return int.from_bytes(first, "little") & int.from_bytes(second, "little")
+
+
+def _ranged_mask(metric: HealthMetric, values, kinds) -> int:
+    minimum, maximum = float(metric.range_minimum), float(metric.range_maximum)
+    at_or_below_minimum = _value_mask(values, minimum.__ge__)
+    at_or_above_maximum = _value_mask(values, maximum.__le__)
+    outside_range = int.from_bytes(at_or_below_minimum, "little") | int.from_bytes(
+        at_or_above_maximum, "little"
+    )
+
+    return (
+        (int.from_bytes(_kind_mask(kinds, EXACT_KINDS), "little") & outside_range)
+        | _and(_kind_mask(kinds, LESS_THAN_KINDS), at_or_below_minimum)
+        | _and(_kind_mask(kinds, GREATER_THAN_KINDS), at_or_above_maximum)
+    )
+
+
+def _greater_than_mask(metric: HealthMetric, values, kinds) -> int:
+    # Out of range below the bound.
+    bound = float(metric.bound)
+
+    return _and(_kind_mask(kinds, EXACT_KINDS), _value_mask(values, bound.__gt__)) | _and(
+        _kind_mask(kinds, LESS_THAN_KINDS), _value_mask(values, bound.__ge__)
+    )
+
+
+def _less_than_mask(metric: HealthMetric, values, kinds) -> int:
+    # Out of range above the bound.
+    bound = float(metric.bound)
+
+    return _and(_kind_mask(kinds, EXACT_KINDS), _value_mask(values, bound.__lt__)) | _and(
+        _kind_mask(kinds, GREATER_THAN_KINDS), _value_mask(values, bound.__le__)
+    )
+
+
+def _boolean_mask(metric: HealthMetric, values, kinds) -> int:
+    # Any exact value other than the ideal, including 0 and 1 for False and True. A
+    # string value never equals the ideal.
+    ideal = float(metric.ideal)
+
+    return _and(_kind_mask(kinds, EXACT_KINDS), _value_mask(values, ideal.__ne__)) | (
+        int.from_bytes(_kind_mask(kinds, STRING_KINDS), "little")
+    )
+
+
+# Mask builders by metric type value. Generic metrics have no range.
+MASK_BUILDERS: dict[str, callable] = {
+    "ranged": _ranged_mask,
+    "greater_than": _greater_than_mask,
+    "less_than": _less_than_mask,
+    "boolean": _boolean_mask,
+}
+
+
+def oor_mask(metric: HealthMetric) -> bytes:
+    """
+    Evaluate which of a metric's measurements are Out of Range.
+
+    Arguments:
+        metric: The HealthMetric to evaluate.
+
+    Returns:
+        Mask with a 1 byte for each OoR measurement, and 0 otherwise.
+    """
+    series = metric.entries
+    count = len(series)
+    mask_builder = MASK_BUILDERS.get(metric.metric_type.value)
+
+    if mask_builder is None or count == 0:
+        return bytes(count)
+
+    return mask_builder(metric, series.values, series.kinds).to_bytes(count, "little")
+
+
+def oor_count(metric: HealthMetric) -> int:
+    """
+    Returns the number of Out of Range measurements in a metric.
+    """
+    return oor_mask(metric).count(1)
+
+
+def oor_indices(metric: HealthMetric) -> Iterator[int]:
+    """
+    Returns the indexes of a metric's Out of Range measurements, in entry order.
+    """
+    mask = oor_mask(metric)
+    return compress(range(len(mask)), mask)
@@ -0,0 +1,238 @@
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from classes import InequalityMeasurement, InequalityType, Measurement
+from file_tools.date_codec import decode_date, encode_date
+from file_tools.file_locks import fcntl, metric_lock
+from file_tools.filepaths import MEM_FILE_PATH
+from file_tools.metric_catalog import metric_catalog
+from file_tools.metric_file_parsing import add_measurements_to_metric_file
+from file_tools.store_settings import get_store_setting
+from utils.logger import logger
+
+# Every buffered measurement is also appended to its session's own recovery file
+# here, so a session that ends without flushing (e.g. a crash) can be recovered by
+# a later one.
+WRITE_SESSION_RECOVERY_DIR = MEM_FILE_PATH / "write_sessions"
+# Held while a session claims recovery files, so two sessions can't both claim one.
+_RECOVERY_LOCK_NAME = ".write_sessions"
+# The single recovery file shared by every session, before each had its own.
+_LEGACY_RECOVERY_PATH = MEM_FILE_PATH / "write_session.jsonl"
+
+
+def _measurement_to_record(metric_name: str, measurement: Measurement) -> dict:
+    record = {
+        "metric_name": metric_name,
+        "value": measurement.value,
+        "date": encode_date(measurement.date),
+        "unit": measurement.unit,
+    }
+    if isinstance(measurement, InequalityMeasurement):
+        record["inequality"] = measurement.inequality.value
+
+    return record
+
+
+def _record_to_measurement(record: dict) -> Measurement:
+    date = decode_date(record["date"])
+
+    if inequality := record.get("inequality"):
+        return InequalityMeasurement(
+            record["value"], InequalityType(inequality), date, unit=record["unit"]
+        )
+
+    return Measurement(record["value"], date, unit=record["unit"])
+
+
+class WriteSession:
+    """
+    Buffers measurements entered during data entry, so that each metric touched is
+    written once per flush rather than once per measurement.
+
+    The buffer is flushed when asked to, or once it holds more measurements than the
+    "write_session_max_pending" store setting, or its oldest measurement is older
+    than "write_session_max_age_seconds". Each buffered measurement is also recorded
+    in the session's own recovery file, which is cleared once flushed.
+
+    A session holds an advisory lock on its recovery file until it is closed (or
+    its process ends), so a new session only recovers the files of sessions that
+    are no longer running, and never replays or clears another live session's.
+    """
+
+    def __init__(self, recovery_dir: Path = WRITE_SESSION_RECOVERY_DIR):
+        self.recovery_dir = recovery_dir
+        self.recovery_path = recovery_dir / f"{os.getpid()}_{uuid.uuid4().hex}.jsonl"
+        self.pending: dict[str, list[Measurement]] = {}
+        self.max_pending: int = get_store_setting("write_session_max_pending")
+        self.max_age_seconds: float = get_store_setting("write_session_max_age_seconds")
+        self._oldest_pending_time: Optional[float] = None
+
+        self.recovery_dir.mkdir(parents=True, exist_ok=True)
+        with metric_lock(_RECOVERY_LOCK_NAME):
+            # Created and locked together, so no other session can claim it as
+            # abandoned in between.
+            self._recovery_fd = os.open(
+                self.recovery_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644
+            )
+            if fcntl is not None:
+                fcntl.flock(self._recovery_fd, fcntl.LOCK_EX)
+
+        self.recover()
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(measurements) for measurements in self.pending.values())
+
+    def _buffer(self, metric_name: str, measurement: Measurement):
+        self.pending.setdefault(metric_name, []).append(measurement)
+        if self._oldest_pending_time is None:
+            self._oldest_pending_time = time.monotonic()
+
+    def add(self, metric_name: str, measurement: Measurement):
+        """
+        Buffer a measurement, flushing the session if a threshold is reached.
+
+        Arguments:
+            metric_name: Name of the metric the measurement belongs to.
+            measurement: The measurement to be added.
+        """
+        self._buffer(metric_name, measurement)
+        self._write_records([(metric_name, measurement)])
+
+        pending_age = time.monotonic() - self._oldest_pending_time
+        if self.pending_count >= self.max_pending or pending_age >= self.max_age_seconds:
+            self.flush()
+
+    def _write_records(self, measurements: list[tuple[str, Measurement]]):
+        # Appended through the locked descriptor, as replacing the file would
+        # replace the lock too.
+        if not measurements:
+            return
+        os.write(
+            self._recovery_fd,
+            "".join(
+                json.dumps(_measurement_to_record(metric_name, measurement)) + "\n"
+                for metric_name, measurement in measurements
+            ).encode(),
+        )
+        os.fsync(self._recovery_fd)
+
+    def flush(self) -> int:
+        """
+        Write every buffered measurement, with one write per metric. Measurements for
+        a metric that fails to write are kept in the buffer (and recovery file).
+
+        Returns:
+            Number of measurements written.
+        """
+        written_count = 0
+
+        for metric_name, measurements in list(self.pending.items()):
+            if add_measurements_to_metric_file(metric_name, measurements):
+                written_count += len(measurements)
+                self.pending.pop(metric_name)
+
+        # The catalog is saved once for the whole session, not once per metric.
+        metric_catalog.save()
+
+        # Only this session's own recovery file is rewritten.
+        os.ftruncate(self._recovery_fd, 0)
+        self._write_records(
+            [
+                (metric_name, measurement)
+                for metric_name, measurements in self.pending.items()
+                for measurement in measurements
+            ]
+        )
+        if not self.pending:
+            self._oldest_pending_time = None
+
+        if written_count:
+            logger.add("info", f"Write session flushed {written_count} measurements.")
+        return written_count
+
+    def close(self):
+        """
+        Release the session's recovery file, removing it unless measurements are
+        still waiting to be written, in which case a later session recovers them.
+        """
+        if not self.pending:
+            self.recovery_path.unlink(missing_ok=True)
+        os.close(self._recovery_fd)
+
+    def _claim_abandoned_file(self, recovery_path: Path) -> list[str]:
+        """
+        Returns the lines of another session's recovery file, and removes it, if
+        that session is no longer running. Otherwise returns an empty list.
+        """
+        try:
+            recovery_fd = os.open(recovery_path, os.O_RDWR)
+        except FileNotFoundError:
+            return []
+
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(recovery_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Its session is still running.
+                    return []
+            if os.fstat(recovery_fd).st_nlink == 0:
+                # Closed (and removed) by its session since it was listed.
+                return []
+
+            with open(recovery_fd, closefd=False) as recovery_file:
+                lines = recovery_file.read().splitlines()
+            recovery_path.unlink()
+            return lines
+        finally:
+            os.close(recovery_fd)
+
+    def recover(self) -> int:
+        """
+        Flush any measurements left in the recovery files of sessions that didn't
+        finish. A partially written final line is skipped.
+
+        Returns:
+            Number of measurements recovered.
+        """
+        recovered_count = 0
+
+        with metric_lock(_RECOVERY_LOCK_NAME):
+            recovery_paths = sorted(self.recovery_dir.glob("*.jsonl"))
+            for recovery_path in [_LEGACY_RECOVERY_PATH, *recovery_paths]:
+                if recovery_path == self.recovery_path:
+                    continue
+
+                recovered: list[tuple[str, Measurement]] = []
+                for line in self._claim_abandoned_file(recovery_path):
+                    try:
+                        record = json.loads(line)
+                        recovered.append(
+                            (record["metric_name"], _record_to_measurement(record))
+                        )
+                    except (json.JSONDecodeError, KeyError, ValueError):
+                        logger.add(
+                            "WARNING", f"Skipping unreadable write session line: {line}"
+                        )
+
+                # Kept in this session's own recovery file from here on.
+                self._write_records(recovered)
+                for metric_name, measurement in recovered:
+                    self._buffer(metric_name, measurement)
+                recovered_count += len(recovered)
+
+        if not recovered_count:
+            return 0
+
+        logger.add(
+            "info",
+            f"Recovering {recovered_count} measurements from an unfinished write session.",
+            cli_out=True,
+        )
+        self.flush()
+        return recovered_count
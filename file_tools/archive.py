@@ -0,0 +1,97 @@
+import json
+import lzma
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+"""
+Archived metric data layout (".varc"):
+
+    | b"VARC" | codec id (uint8) | compressed, compact JSON |
+
+Archives hold data that's rarely written: either a whole metric file, or a single
+segment of a segmented metric. The JSON is written without indentation or spaces
+before compressing, as most of a pretty-printed metric file is whitespace.
+"""
+
+ARCHIVE_EXTENSION = ".varc"
+ARCHIVE_MAGIC = b"VARC"
+
+# Codec name -> (id stored in the archive, compress, decompress).
+ARCHIVE_CODECS: dict[str, tuple[int, callable, callable]] = {
+    "zlib": (1, lambda content: zlib.compress(content, 9), zlib.decompress),
+    "lzma": (2, lambda content: lzma.compress(content, preset=9), lzma.decompress),
+}
+
+_prefix = struct.Struct("<4sB")
+
+
+def encode_archive(data, codec: str = "lzma") -> bytes:
+    """
+    Encode a JSON serialisable value as an archive.
+
+    Arguments:
+        data: The value, e.g. a metric file JSON dict or a list of entries.
+        codec: Name of the compression codec, one of ARCHIVE_CODECS.
+
+    Returns:
+        The archive bytes.
+    """
+    codec_id, compress, _ = ARCHIVE_CODECS[codec]
+    content = json.dumps(data, separators=(",", ":")).encode()
+    return _prefix.pack(ARCHIVE_MAGIC, codec_id) + compress(content)
+
+
+def decode_archive(archive: bytes):
+    """
+    Decode archive bytes back to the value they were encoded from.
+
+    Raises:
+        ValueError: If the bytes aren't an archive, or use an unknown codec.
+    """
+    magic, codec_id = _prefix.unpack_from(archive)
+    if magic != ARCHIVE_MAGIC:
+        raise ValueError("Not a vitals archive.")
+
+    for known_id, _, decompress in ARCHIVE_CODECS.values():
+        if known_id == codec_id:
+            return json.loads(decompress(archive[_prefix.size :]))
+
+    raise ValueError(f"Unknown archive codec id {codec_id}.")
+
+
+def read_archive(file_path: Path):
+    """
+    Read and decode an archive file.
+    """
+    return decode_archive(Path(file_path).read_bytes())
+
+
+def is_cold(
+    file_path: Path,
+    after_days: Optional[float],
+    over_bytes: Optional[int],
+    now: Optional[float] = None,
+) -> bool:
+    """
+    Decide whether stored data is cold enough to archive: it hasn't been written for
+    `after_days` days, or it's at least `over_bytes` in size. Either rule may be
+    turned off by passing None.
+
+    Arguments:
+        file_path: Path to the stored data.
+        after_days: Days since the last write after which data is cold.
+        over_bytes: Size in bytes from which data is cold.
+        now: Time to measure age from, defaults to the current time.
+
+    Returns:
+        True if the data is cold.
+    """
+    file_stat = Path(file_path).stat()
+    age_days = ((now or time.time()) - file_stat.st_mtime) / 86400
+
+    return (after_days is not None and age_days >= after_days) or (
+        over_bytes is not None and file_stat.st_size >= over_bytes
+    )
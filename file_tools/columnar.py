@@ -0,0 +1,313 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from file_tools.date_codec import encode_date, epoch_to_date, parse_date_epoch
+from utils.value_kinds import (
+    MISSING_DATE,
+    NO_UNIT,
+    VALUE_BOOL,
+    VALUE_FLOAT,
+    VALUE_GREATER_THAN,
+    VALUE_INT,
+    VALUE_LESS_THAN,
+    VALUE_STRING,
+    is_inequality_value_str,
+)
+
+"""
+Columnar metric file layout (".vcol"):
+
+    | b"VCOL" | header length (uint32) | header JSON, padded to 8 bytes |
+    | dates (int64 x n) | values (float64 x n) | kinds (uint8 x n) | pad to 2 bytes |
+    | unit ids (uint16 x n) |
+
+The header holds everything from the JSON metric file except "data", plus the
+entry count, the byte order the columns were written in, and lookup tables for
+units and string values. Dates are seconds since the Unix epoch, values are floats,
+and each entry's kind records how its value should be read back (see
+utils/value_kinds.py).
+
+The columns hold what a loaded metric uses, so some entries can't be rebuilt from
+them exactly: dates with a timezone or fractional seconds, inequality values not
+written as "<float>" (e.g. "<2"), and fields other than date, value and unit. The
+header's "overrides" keeps the original fields of just those entries, by index, so
+converting a metric file to columnar and back never changes it.
+"""
+
+COLUMNAR_EXTENSION = ".vcol"
+COLUMNAR_MAGIC = b"VCOL"
+
+_prefix = struct.Struct("<4sI")
+
+# Header keys describing the encoding, rather than copied from the metric file.
+_ENCODING_KEYS = ("count", "byteorder", "units", "strings", "overrides")
+
+
+def _pad_to(length: int, alignment: int) -> int:
+    return (alignment - length % alignment) % alignment
+
+
+def _is_float_str(value_str: str) -> bool:
+    try:
+        float(value_str)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_plain_date_str(date_str: str) -> bool:
+    # Only "YYYY-MM-DDTHH:MM:SS" dates are read back from the date column unchanged.
+    return len(date_str) == 19 and date_str[10] == "T"
+
+
+def _decode_date(epoch_seconds: int) -> Optional[str]:
+    """
+    Returns a date column entry as it is stored in a JSON metric file.
+    """
+    if epoch_seconds == MISSING_DATE:
+        return None
+    return encode_date(epoch_to_date(epoch_seconds))
+
+
+def _decode_value(kind: int, value: float, strings: list[str]):
+    """
+    Returns a value column entry, of the given kind, as it is stored in a JSON metric
+    file.
+    """
+    if kind == VALUE_FLOAT:
+        return value
+    elif kind == VALUE_INT:
+        return int(value)
+    elif kind == VALUE_BOOL:
+        return bool(value)
+    elif kind == VALUE_STRING:
+        return strings[int(value)]
+
+    operator = "<" if kind == VALUE_LESS_THAN else ">"
+    return f"{operator}{value}"
+
+
+def encode_columnar(health_data: dict) -> bytes:
+    """
+    Encode a metric file JSON dict into the columnar binary layout.
+
+    Arguments:
+        health_data: JSON dict of a metric file.
+
+    Returns:
+        The encoded bytes.
+    """
+    data_values = health_data.get("data", [])
+    count = len(data_values)
+
+    dates = array("q", bytes(8 * count))
+    values = array("d", bytes(8 * count))
+    kinds = array("B", bytes(count))
+    unit_ids = array("H", bytes(2 * count))
+    unit_table: dict[str, int] = {}
+    string_table: dict[str, int] = {}
+    overrides: dict[str, dict] = {}
+
+    for index, data_point in enumerate(data_values):
+        # Whatever the columns would read back differently is kept here.
+        override = {
+            key: field
+            for key, field in data_point.items()
+            if key not in ("date", "value", "unit")
+        }
+
+        date = data_point.get("date")
+        dates[index] = parse_date_epoch(date) if date else MISSING_DATE
+
+        value = data_point["value"]
+        if isinstance(value, bool):
+            kinds[index], values[index] = VALUE_BOOL, float(value)
+        elif isinstance(value, int):
+            kinds[index], values[index] = VALUE_INT, float(value)
+        elif isinstance(value, float):
+            kinds[index], values[index] = VALUE_FLOAT, value
+        elif is_inequality_value_str(value) and _is_float_str(value[1:]):
+            kinds[index] = VALUE_LESS_THAN if value[0] == "<" else VALUE_GREATER_THAN
+            values[index] = float(value[1:])
+            if value != f"{value[0]}{values[index]}":
+                override["value"] = value
+        else:
+            kinds[index] = VALUE_STRING
+            values[index] = string_table.setdefault(value, len(string_table))
+
+        if unit := data_point.get("unit"):
+            unit_ids[index] = unit_table.setdefault(unit, len(unit_table) + 1)
+
+        if date is not None and not _is_plain_date_str(date):
+            override["date"] = date
+        if override:
+            overrides[str(index)] = override
+
+    header = {key: value for key, value in health_data.items() if key != "data"}
+    header["count"] = count
+    header["byteorder"] = sys.byteorder
+    header["units"] = list(unit_table)
+    header["strings"] = list(string_table)
+    header["overrides"] = overrides
+
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b" " * _pad_to(_prefix.size + len(header_bytes), 8)
+    kinds_bytes = kinds.tobytes()
+    kinds_bytes += bytes(_pad_to(len(kinds_bytes), 2))
+
+    return b"".join(
+        [
+            _prefix.pack(COLUMNAR_MAGIC, len(header_bytes)),
+            header_bytes,
+            dates.tobytes(),
+            values.tobytes(),
+            kinds_bytes,
+            unit_ids.tobytes(),
+        ]
+    )
+
+
+class ColumnarSeries:
+    """
+    A read-only view over a columnar metric file. The file is memory mapped, and each
+    column is exposed as a typed memoryview, so a series can be read without parsing
+    or building any per-entry objects.
+
+    Attributes:
+        header: The metric file header (everything except the data).
+        dates: Entry dates, as seconds since the Unix epoch.
+        values: Entry values, as floats. See `kinds` for how to interpret them.
+        kinds: Value kind of each entry.
+        unit_ids: Unit id of each entry, see `unit_for()`.
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+        self._file = open(self.file_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = _prefix.unpack_from(self._map, 0)
+        if magic != COLUMNAR_MAGIC:
+            self.close()
+            raise ValueError(f"'{self.file_path}' is not a columnar metric file.")
+
+        offset = _prefix.size
+        self.header: dict = json.loads(self._map[offset : offset + header_length])
+        offset += header_length
+        count = self.header["count"]
+
+        # Columns written on a machine with a different byte order are copied and
+        # swapped, rather than read in place.
+        swap = self.header.get("byteorder", sys.byteorder) != sys.byteorder
+        self._views = []
+        self.dates = self._column("q", offset, count, swap)
+        offset += 8 * count
+        self.values = self._column("d", offset, count, swap)
+        offset += 8 * count
+        self.kinds = self._column("B", offset, count, swap)
+        offset += count + _pad_to(count, 2)
+        self.unit_ids = self._column("H", offset, count, swap)
+
+    def _column(self, type_code: str, offset: int, count: int, swap: bool):
+        size = array(type_code).itemsize * count
+        view = memoryview(self._map)[offset : offset + size]
+        self._views.append(view)
+
+        if not swap or type_code == "B":
+            column = view.cast(type_code)
+            self._views.append(column)
+            return column
+
+        column = array(type_code, view)
+        column.byteswap()
+        return column
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    def unit_for(self, index: int) -> Optional[str]:
+        """
+        Returns the unit of the entry at `index`, or None if it has none.
+        """
+        unit_id = self.unit_ids[index]
+        return None if unit_id == NO_UNIT else self.header["units"][unit_id - 1]
+
+    def value_for(self, index: int):
+        """
+        Returns the value of the entry at `index`, as it is stored in a JSON metric file.
+        """
+        override = self.header.get("overrides", {}).get(str(index), {})
+        if "value" in override:
+            return override["value"]
+        return _decode_value(
+            self.kinds[index], self.values[index], self.header["strings"]
+        )
+
+    def to_json(self) -> dict:
+        """
+        Rebuild the JSON dict of the metric file this series was encoded from.
+        """
+        health_data = {
+            key: value
+            for key, value in self.header.items()
+            if key not in _ENCODING_KEYS
+        }
+        strings, overrides = self.header["strings"], self.header.get("overrides", {})
+
+        data_values = []
+        for index, date in enumerate(self.dates):
+            data_point = {
+                "date": _decode_date(date),
+                "value": _decode_value(self.kinds[index], self.values[index], strings),
+            }
+            if unit := self.unit_for(index):
+                data_point["unit"] = unit
+            if override := overrides.get(str(index)):
+                data_point.update(override)
+            data_values.append(data_point)
+
+        health_data["data"] = data_values
+        return health_data
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "ColumnarSeries":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def read_columnar_to_json(file_path: Path) -> dict:
+    """
+    Read a columnar metric file and return the equivalent JSON dict.
+
+    Arguments:
+        file_path: Path to the columnar metric file.
+
+    Returns:
+        JSON dict of the metric file.
+    """
+    with ColumnarSeries(file_path) as series:
+        return series.to_json()
+
+
+def write_columnar(file_path: Path, health_data: dict):
+    """
+    Write a metric file JSON dict to disk in the columnar layout.
+
+    Arguments:
+        file_path: Path to write to.
+        health_data: JSON dict of the metric file.
+    """
+    Path(file_path).write_bytes(encode_columnar(health_data))
@@ -0,0 +1,84 @@
+import json
+from typing import Optional
+
+from file_tools.date_codec import date_to_epoch, encode_date, parse_date
+
+"""
+Clean up of a metric file's measurement entries, used by `manage compact`. Entries
+are put in date order, dates are normalised, units that only repeat the file level
+unit are dropped (it's applied to entries without their own when they're read), and
+exact duplicates are removed.
+"""
+
+# Sort key for entries without a (readable) date, which go after every dated entry.
+_UNDATED = (float("inf"),)
+
+
+def _normalise_entry(entry: dict, file_unit: Optional[str]) -> tuple[dict, tuple, int]:
+    """
+    Returns a normalised copy of an entry, its sort key, and 1 if a redundant unit
+    was dropped (otherwise 0). Dates with a timezone or fractional seconds are kept
+    as they were written, as the normalised form would drop them.
+    """
+    normalised = dict(entry)
+    sort_key = _UNDATED
+
+    if date := entry.get("date"):
+        try:
+            decoded_date = parse_date(date)
+            if decoded_date.tzinfo is None and not decoded_date.microsecond:
+                normalised["date"] = encode_date(decoded_date)
+            # Ordered by the time as written, as when the metric is loaded.
+            sort_key = (date_to_epoch(decoded_date), decoded_date.microsecond)
+        except ValueError:
+            # Left as it is, to be looked at by hand.
+            pass
+
+    dropped_unit = 0
+    if file_unit and normalised.get("unit") == file_unit:
+        del normalised["unit"]
+        dropped_unit = 1
+
+    return normalised, sort_key, dropped_unit
+
+
+def compact_entries(
+    entries: list[dict], file_unit: Optional[str] = None
+) -> tuple[list[dict], dict[str, int]]:
+    """
+    Sort, normalise and deduplicate a metric's measurement entries.
+
+    Arguments:
+        entries: The metric file "data" list (with any journal merged in).
+        file_unit: The metric's file level unit, if it has one.
+
+    Returns:
+        The compacted entries, and a dict counting the duplicates removed, units
+        dropped, and whether the entries were out of date order.
+    """
+    keyed_entries = []
+    units_dropped = 0
+    for entry in entries:
+        normalised, sort_key, dropped_unit = _normalise_entry(entry, file_unit)
+        keyed_entries.append((sort_key, normalised))
+        units_dropped += dropped_unit
+
+    was_sorted = all(
+        keyed_entries[index][0] <= keyed_entries[index + 1][0]
+        for index in range(len(keyed_entries) - 1)
+    )
+    # Stable, so measurements taken at the same time keep their order.
+    keyed_entries.sort(key=lambda keyed_entry: keyed_entry[0])
+
+    compacted, seen = [], set()
+    for _, entry in keyed_entries:
+        identity = json.dumps(entry, sort_keys=True)
+        if identity not in seen:
+            seen.add(identity)
+            compacted.append(entry)
+
+    return compacted, {
+        "duplicates_removed": len(entries) - len(compacted),
+        "units_dropped": units_dropped,
+        "reordered": int(not was_sorted),
+    }
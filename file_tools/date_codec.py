@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+"""
+Conversion between the date formats used by vitals. Dates are stored in metric files
+as ISO format strings ("YYYY-MM-DDTHH:MM:SS"), typed during data entry as DDMMYYYY,
+and held in memory as whole seconds since the Unix epoch. Dates with a timezone are
+converted to UTC, and naive dates are taken as they are.
+
+Strings are decoded straight to epoch seconds. `decode_date_epoch` memoises decoded
+strings, for data entry and imports, which see the same dates over and over. Loading
+a metric file sees each date once, so uses `parse_date_epoch` to skip the cache.
+"""
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# Distinct date strings to remember. Daily measurements over 20 years fit easily.
+DATE_CACHE_SIZE = 16_384
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# Days before the first of each month, in a year that isn't a leap year.
+_DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+
+def _is_leap_year(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _days_since_epoch(year: int, month: int, day: int) -> int:
+    """
+    Returns the days from the Unix epoch to a calendar date, validating the date.
+    """
+    if not 1 <= month <= 12:
+        raise ValueError(f"month {month} is out of range")
+    leap_day = month == 2 and _is_leap_year(year)
+    if not 1 <= day <= _DAYS_IN_MONTH[month - 1] + leap_day:
+        raise ValueError(f"day {day} is out of range for month {month}")
+
+    previous_year = year - 1
+    days_before_year = (
+        previous_year * 365
+        + previous_year // 4
+        - previous_year // 100
+        + previous_year // 400
+    )
+    days_before_month = _DAYS_BEFORE_MONTH[month - 1] + (
+        month > 2 and _is_leap_year(year)
+    )
+    return days_before_year + days_before_month + day - EPOCH_ORDINAL
+
+
+def parse_date_epoch(date_str: str) -> int:
+    """
+    Decode an ISO format or DDMMYYYY date string to whole seconds since the Unix
+    epoch.
+
+    Arguments:
+        date_str: The date string.
+
+    Returns:
+        Seconds since the Unix epoch.
+
+    Raises:
+        ValueError: If the string isn't a recognised date, including eight digits
+            that aren't a valid DDMMYYYY date (e.g. "19991231").
+    """
+    # DDMMYYYY, as typed during data entry. Parsing this by hand is several times
+    # faster than `strptime`. Eight digits are never read as a compact ISO date
+    # (YYYYMMDD), which would silently accept day and month typed the wrong way.
+    if len(date_str) == 8 and date_str.isdigit():
+        return 86400 * _days_since_epoch(
+            int(date_str[4:8]), int(date_str[2:4]), int(date_str[0:2])
+        )
+
+    # ISO format, as stored in metric files. The standard library's parser is
+    # written in C, so is faster than any hand-written Python for this layout.
+    return date_to_epoch(datetime.fromisoformat(date_str))
+
+
+# Memoised form of `parse_date_epoch`.
+decode_date_epoch = lru_cache(maxsize=DATE_CACHE_SIZE)(parse_date_epoch)
+
+
+def parse_date(date_str: str) -> datetime:
+    """
+    Decode an ISO format or DDMMYYYY date string to a datetime, keeping any fractional
+    seconds and timezone given in an ISO string, which aren't kept when decoding to
+    epoch seconds.
+
+    Raises:
+        ValueError: If the string isn't a recognised date.
+    """
+    if len(date_str) == 8 and date_str.isdigit():
+        return epoch_to_date(parse_date_epoch(date_str))
+
+    return datetime.fromisoformat(date_str)
+
+
+def decode_date(date_str: str) -> datetime:
+    """
+    Decode an ISO format or DDMMYYYY date string to a naive datetime, to the second.
+    """
+    return epoch_to_date(decode_date_epoch(date_str))
+
+
+def encode_date(date: datetime) -> str:
+    """
+    Encode a datetime in the normalised form stored in metric files,
+    "YYYY-MM-DDTHH:MM:SS", so stored dates sort and compare as strings.
+    """
+    return date.isoformat(timespec="seconds")
+
+
+def date_to_epoch(date: datetime) -> int:
+    """
+    Convert a datetime to whole seconds since the Unix epoch. A datetime with a
+    timezone is converted to UTC first.
+    """
+    epoch_seconds = (
+        (date.toordinal() - EPOCH_ORDINAL) * 86400
+        + date.hour * 3600
+        + date.minute * 60
+        + date.second
+    )
+    if utc_offset := date.utcoffset():
+        epoch_seconds -= utc_offset // timedelta(seconds=1)
+    return epoch_seconds
+
+
+def epoch_to_date(epoch_seconds: int) -> datetime:
+    """
+    Convert whole seconds since the Unix epoch to a naive datetime.
+    """
+    return EPOCH + timedelta(seconds=epoch_seconds)
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from file_tools.filepaths import LOCK_DIR_PATH
+from file_tools.store_settings import get_store_setting
+
+try:
+    import fcntl
+except ImportError:
+    # Advisory locks are POSIX only. Elsewhere writes are still atomic, but
+    # concurrent writers aren't kept apart.
+    fcntl = None
+
+"""
+Safe writes for metric data shared between processes (e.g. a scheduled import and
+an interactive session).
+
+Each metric has an advisory lock file in memory/locks, held with `flock` for the
+whole of any read-modify-write of the metric (its file, segments and journal).
+Locks are re-entrant within a thread, so locked functions can call each other, and
+waiting for a lock gives up after the "lock_timeout_seconds" store setting.
+
+Files are replaced atomically: written to a temporary file alongside, flushed to
+disk, then moved into place, so a reader (or a crash) never sees a partial file.
+"""
+
+_LOCK_POLL_SECONDS = 0.005
+
+# Metric name -> (lock file descriptor, depth), for the locks held by each thread.
+_held_locks = threading.local()
+
+
+class MetricLockTimeout(TimeoutError):
+    """
+    Raised when a metric's lock couldn't be acquired within the timeout.
+    """
+
+
+def _lock_path(metric_name: str) -> Path:
+    return LOCK_DIR_PATH / f"{Path(metric_name).stem}.lock"
+
+
+@contextmanager
+def metric_lock(metric_name: str, timeout: Optional[float] = None) -> Iterator[None]:
+    """
+    Hold a metric's exclusive lock for the duration of the context.
+
+    Arguments:
+        metric_name: Name of the metric, with or without its extension.
+        timeout: Seconds to wait for the lock, defaults to the "lock_timeout_seconds"
+            store setting.
+
+    Raises:
+        MetricLockTimeout: If the lock is still held elsewhere after the timeout.
+    """
+    metric_name = Path(metric_name).stem
+    held = _held_locks.__dict__.setdefault("locks", {})
+
+    if metric_name in held:
+        lock_fd, depth = held[metric_name]
+        held[metric_name] = (lock_fd, depth + 1)
+        try:
+            yield
+        finally:
+            lock_fd, depth = held[metric_name]
+            held[metric_name] = (lock_fd, depth - 1)
+        return
+
+    if fcntl is None:
+        held[metric_name] = (None, 1)
+        try:
+            yield
+        finally:
+            del held[metric_name]
+        return
+
+    timeout = get_store_setting("lock_timeout_seconds") if timeout is None else timeout
+    LOCK_DIR_PATH.mkdir(parents=True, exist_ok=True)
+    lock_fd = os.open(_lock_path(metric_name), os.O_RDWR | os.O_CREAT, 0o644)
+    deadline = time.monotonic() + timeout
+
+    try:
+        while True:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise MetricLockTimeout(
+                        f"Timed out after {timeout}s waiting for the lock on "
+                        f"'{metric_name}'."
+                    )
+                time.sleep(_LOCK_POLL_SECONDS)
+
+        held[metric_name] = (lock_fd, 1)
+        try:
+            yield
+        finally:
+            del held[metric_name]
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+    finally:
+        os.close(lock_fd)
+
+
+@contextmanager
+def metric_locks(*metric_names: str, timeout: Optional[float] = None) -> Iterator[None]:
+    """
+    Hold the locks of several metrics, acquired in name order so that two writers
+    locking the same metrics can't deadlock.
+    """
+    with ExitStack() as stack:
+        for metric_name in sorted({Path(name).stem for name in metric_names}):
+            stack.enter_context(metric_lock(metric_name, timeout))
+        yield
+
+
+def fsync_file(file_path: Path):
+    """
+    Flush a file's contents to disk.
+    """
+    file_fd = os.open(file_path, os.O_RDONLY)
+    try:
+        os.fsync(file_fd)
+    finally:
+        os.close(file_fd)
+
+
+def _fsync_directory(directory: Path):
+    # Makes a rename durable. Not every platform can open a directory.
+    try:
+        fsync_file(directory)
+    except OSError:
+        pass
+
+
+def temporary_path_for(file_path: Path) -> Path:
+    """
+    Returns a hidden path alongside `file_path` to write its replacement to, unique
+    to the calling process and thread.
+    """
+    return file_path.with_name(
+        f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+
+
+def replace_file(file_path: Path, temporary_path: Path):
+    """
+    Flush an already written temporary file to disk, then atomically move it over
+    `file_path`.
+    """
+    fsync_file(temporary_path)
+    os.replace(temporary_path, file_path)
+    _fsync_directory(file_path.parent)
+
+
+def atomic_write_bytes(file_path: Path, content: bytes):
+    """
+    Atomically replace a file's contents: a reader sees either the old contents or
+    the new, never a mix.
+    """
+    temporary_path = temporary_path_for(file_path)
+    with open(temporary_path, "wb") as temporary_file:
+        temporary_file.write(content)
+        temporary_file.flush()
+        os.fsync(temporary_file.fileno())
+
+    os.replace(temporary_path, file_path)
+    _fsync_directory(file_path.parent)
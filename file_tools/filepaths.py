@@ -4,11 +4,25 @@ from pathlib import Path
 FILE_VERS = 9
 FILE_DIR_NAME = "metric_files"
 FILE_DIR_PATH = Path(FILE_DIR_NAME)
+JOURNAL_DIR_NAME = "journal_files"
+JOURNAL_DIR_PATH = Path(JOURNAL_DIR_NAME)
+SEGMENT_DIR_NAME = "segment_files"
+SEGMENT_DIR_PATH = Path(SEGMENT_DIR_NAME)
+MEM_FILE_NAME = "memory"
+MEM_FILE_PATH = Path(MEM_FILE_NAME)
+LOCK_DIR_PATH = MEM_FILE_PATH / "locks"
 
 
 def get_filenames_without_extension(directory):
-    """Returns a list of filenames in the given directory without their extensions."""
+    """
+    Returns a list of filenames in the given directory without their extensions.
+    Hidden files (such as metric files part way through being written) are skipped.
+    """
     directory_path = Path(directory) if isinstance(directory, str) else directory
-    filenames = [file.stem for file in directory_path.iterdir() if file.is_file()]
+    filenames = [
+        file.stem
+        for file in directory_path.iterdir()
+        if file.is_file() and not file.name.startswith(".")
+    ]
 
     return filenames
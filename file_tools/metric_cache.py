@@ -0,0 +1,179 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from classes import HealthMetric
+from file_tools.store_settings import get_store_setting
+from utils.logger import logger
+
+
+class MetricCache:
+    """
+    Process-wide LRU cache of parsed metric files, so that a metric referenced by
+    several commands is only read and parsed once. Each entry holds the metric's JSON
+    dict, and the HealthMetric built from it once one has been requested. Metrics
+    loaded straight from columnar files are cached without a JSON dict.
+
+    Entries are validated against the metric's signature (see `get_metric_signature`),
+    so a metric changed outside this process is re-read. Entries are evicted least
+    recently used first, once the total size of cached metric files exceeds the budget.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, metric_name: str, signature: Optional[list]) -> Optional[dict]:
+        """
+        Returns the cache entry for a metric, if present and still matching `signature`.
+        """
+        with self._lock:
+            entry = self._entries.get(metric_name)
+
+            if (
+                entry is None
+                or entry["health_data"] is None
+                or signature is None
+                or entry["signature"] != signature
+            ):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(metric_name)
+            self.hits += 1
+            return entry
+
+    def get_metric(
+        self, metric_name: str, signature: Optional[list]
+    ) -> Optional[HealthMetric]:
+        """
+        Returns the cached HealthMetric for a metric, if one has been built and the
+        entry still matches `signature`. Only a successful lookup is counted, as a
+        failed one falls back to `get()`.
+        """
+        with self._lock:
+            entry = self._entries.get(metric_name)
+
+            if entry is None or entry["metric"] is None or entry["signature"] != signature:
+                return None
+
+            self._entries.move_to_end(metric_name)
+            self.hits += 1
+            return entry["metric"]
+
+    def attach_metric(
+        self, metric_name: str, signature: Optional[list], metric: HealthMetric
+    ):
+        """
+        Store the HealthMetric built from a cached entry's JSON dict.
+        """
+        with self._lock:
+            entry = self._entries.get(metric_name)
+            if entry is not None and entry["signature"] == signature:
+                entry["metric"] = metric
+
+    def record_append(
+        self,
+        metric_name: str,
+        previous_signature: Optional[list],
+        signature: Optional[list],
+        new_entry: dict,
+    ):
+        """
+        Bring a cached entry up to date with a measurement appended to its metric, so
+        the append doesn't force a re-read. The cached HealthMetric is dropped, and
+        rebuilt from the updated JSON dict when next requested.
+        """
+        with self._lock:
+            entry = self._entries.get(metric_name)
+            if entry is None:
+                return
+
+            if (
+                previous_signature is None
+                or entry["signature"] != previous_signature
+                or entry["health_data"] is None
+            ):
+                self._remove(metric_name)
+                return
+
+            entry["health_data"]["data"].append(new_entry)
+            entry["metric"] = None
+            entry["signature"] = signature
+
+            new_cost = signature[2] + signature[3]
+            self.used_bytes += new_cost - entry["cost"]
+            entry["cost"] = new_cost
+
+    def put(
+        self,
+        metric_name: str,
+        signature: Optional[list],
+        health_data: Optional[dict],
+        metric: Optional[HealthMetric] = None,
+    ):
+        """
+        Cache a metric's JSON dict (and optionally its HealthMetric), or just its
+        HealthMetric if it was built without one, replacing any existing entry.
+        Metrics without a signature can't be validated, so aren't cached.
+        """
+        if signature is None:
+            self.invalidate(metric_name)
+            return
+
+        # The metric file size (plus its journal) stands in for the memory used.
+        cost = signature[2] + signature[3]
+
+        with self._lock:
+            self._remove(metric_name)
+            if cost > self.budget_bytes:
+                return
+
+            self._entries[metric_name] = {
+                "signature": signature,
+                "health_data": health_data,
+                "metric": metric,
+                "cost": cost,
+            }
+            self.used_bytes += cost
+
+            while self.used_bytes > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.used_bytes -= evicted["cost"]
+                self.evictions += 1
+
+    def invalidate(self, metric_name: str):
+        with self._lock:
+            self._remove(metric_name)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def _remove(self, metric_name: str):
+        if (entry := self._entries.pop(metric_name, None)) is not None:
+            self.used_bytes -= entry["cost"]
+
+    def log_stats(self, cli_out: bool = False):
+        """
+        Log the cache hit/miss counters.
+        """
+        lookups = self.hits + self.misses
+        hit_rate = 100 * self.hits / lookups if lookups else 0
+        logger.add(
+            "info",
+            f"Metric cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate), "
+            f"{self.evictions} evictions, {len(self._entries)} entries using "
+            f"{self.used_bytes} of {self.budget_bytes} bytes.",
+            cli_out=cli_out,
+        )
+
+
+# Initialise cache.
+metric_cache = MetricCache(budget_bytes=get_store_setting("cache_budget_bytes"))
@@ -0,0 +1,143 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+from classes import HealthMetric
+from file_tools.date_codec import encode_date
+from file_tools.file_locks import atomic_write_bytes, metric_lock
+from file_tools.filepaths import MEM_FILE_PATH
+from utils.logger import logger
+
+CATALOG_PATH = MEM_FILE_PATH / "catalog.json"
+CATALOG_VERSION = 2
+# Metric names can't start with ".", so this lock is never a metric's.
+CATALOG_LOCK_NAME = ".catalog"
+
+
+def build_catalog_entry(
+    health_data: dict, metric: Optional[HealthMetric], signature: Optional[list]
+) -> dict:
+    """
+    Summarise a metric file into a catalog entry.
+
+    Arguments:
+        health_data: JSON dict of the metric file, with its journal merged in.
+        metric: The HealthMetric loaded from `health_data`, whose OoR counters are
+            recorded.
+        signature: The metric file signature at the time `health_data` was read.
+
+    Returns:
+        The catalog entry.
+    """
+    dates = [entry["date"] for entry in health_data.get("data", []) if entry.get("date")]
+
+    return {
+        "metric_name": health_data["metric_name"],
+        "metric_type": health_data.get("metric_type"),
+        "metric_guide": health_data.get("metric_guide"),
+        "unit": health_data.get("unit"),
+        "entry_count": len(health_data.get("data", [])),
+        "first_date": min(dates, default=None),
+        "last_date": max(dates, default=None),
+        "oor_count": metric.oor_count if metric else 0,
+        "latest_oor_date": (
+            encode_date(metric.latest_oor_date)
+            if metric and metric.latest_oor_date
+            else None
+        ),
+        "signature": signature,
+    }
+
+
+class MetricCatalog:
+    """
+    A persisted summary of every metric in the store, so that listing, searching and
+    out of range summaries don't need to open each metric file. Each entry records
+    the signature (modification time and sizes) of the metric file it was built from,
+    which is used to detect entries that have gone stale. Entries also hold each
+    metric's OoR count and latest OoR date, which are updated as measurements are
+    appended, so finding out of range metrics doesn't scan any measurements.
+
+    The catalog file is only read when first needed. Changes are kept in memory
+    until saved (e.g. once a journal is folded, or a write session flushed), so an
+    append doesn't rewrite the whole catalog. Saving takes the catalog's lock, and
+    merges this process's changes into the catalog as saved, so changes saved by
+    another process in the meantime aren't lost.
+    """
+
+    def __init__(self, catalog_path: Path = CATALOG_PATH):
+        self.catalog_path = catalog_path
+        self._entries: dict[str, dict] = None
+        self._changed_names: set[str] = set()
+        self._removed_names: set[str] = set()
+
+    def _read_entries(self) -> dict[str, dict]:
+        try:
+            catalog_json = json.loads(self.catalog_path.read_text())
+            if catalog_json.get("catalog_version") == CATALOG_VERSION:
+                return catalog_json["metrics"]
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.add("WARNING", f"Metric catalog unreadable, rebuilding: {e}")
+
+        return {}
+
+    @property
+    def entries(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = self._read_entries()
+
+        return self._entries
+
+    def names(self) -> list[str]:
+        return sorted(self.entries.keys())
+
+    def get(self, metric_name: str) -> Optional[dict]:
+        return self.entries.get(metric_name)
+
+    def set(self, metric_name: str, entry: dict):
+        self.entries[metric_name] = entry
+        self._changed_names.add(metric_name)
+        self._removed_names.discard(metric_name)
+
+    def remove(self, metric_name: str):
+        if self.entries.pop(metric_name, None) is not None:
+            self._removed_names.add(metric_name)
+            self._changed_names.discard(metric_name)
+
+    def save(self):
+        """
+        Write the catalog to disk, if it has changed since it was last saved.
+        """
+        if not self._changed_names and not self._removed_names:
+            return
+
+        try:
+            with metric_lock(CATALOG_LOCK_NAME):
+                saved_entries = self._read_entries()
+                for metric_name in self._removed_names:
+                    saved_entries.pop(metric_name, None)
+                for metric_name in self._changed_names:
+                    saved_entries[metric_name] = self.entries[metric_name]
+
+                catalog_json = {
+                    "catalog_version": CATALOG_VERSION,
+                    "metrics": saved_entries,
+                }
+                self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write_bytes(
+                    self.catalog_path, json.dumps(catalog_json, indent=4).encode()
+                )
+        except IOError as e:
+            # Includes timing out waiting for the lock.
+            logger.add("ERROR", f"Failed to write metric catalog: {e}")
+            return
+
+        self._entries = saved_entries
+        self._changed_names.clear()
+        self._removed_names.clear()
+
+
+# Initialise catalog.
+metric_catalog = MetricCatalog()
@@ -1,268 +1,1790 @@
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 from classes import (
     BooleanMetric,
     GreaterThanMetric,
     HealthMetric,
     InequalityMeasurement,
-    InequalityValue,
     LessThanMetric,
     Measurement,
     MetricType,
     RangedMetric,
 )
 
-from file_tools.utils import is_inequality_value_str
+from file_tools.archive import (
+    ARCHIVE_CODECS,
+    ARCHIVE_EXTENSION,
+    encode_archive,
+    is_cold,
+    read_archive,
+)
+from file_tools.columnar import (
+    COLUMNAR_EXTENSION,
+    ColumnarSeries,
+    read_columnar_to_json,
+    write_columnar,
+)
+from file_tools.compaction import compact_entries
+from file_tools.date_codec import encode_date
+from file_tools.file_locks import (
+    MetricLockTimeout,
+    atomic_write_bytes,
+    metric_lock,
+    metric_locks,
+    replace_file,
+    temporary_path_for,
+)
+from file_tools.metric_cache import metric_cache
+from file_tools.metric_catalog import MetricCatalog, build_catalog_entry, metric_catalog
+from file_tools.metric_journal import (
+    JOURNAL_FOLD_BYTES,
+    append_many_to_journal,
+    append_to_journal,
+    clear_journal,
+    get_journalled_metric_names,
+    journal_size,
+    read_journal,
+    rename_journal,
+)
+from file_tools.metric_registry import (
+    MetricNameRegistry,
+    metric_registry,
+    modification_time,
+)
+from file_tools.migrations import migrate_health_data
+from file_tools.segmented import (
+    SEGMENTED_EXTENSION,
+    append_segmented,
+    archive_segments,
+    read_segmented_header,
+    read_segmented_to_json,
+    remove_segmented,
+    segment_dir,
+    rename_segmented,
+    restore_segments,
+    write_segmented,
+)
+from file_tools.sqlite_store import SQLITE_STORE_PATH, get_sqlite_store
+from file_tools.store_settings import get_store_setting, set_store_setting
+from file_tools.typo_aliases import typo_aliases
+from utils.value_kinds import is_inequality_value_str
 from utils.logger import logger
 from file_tools.filepaths import (
-    FILE_DIR_NAME,
     FILE_DIR_PATH,
     FILE_VERS,
+    MEM_FILE_PATH,
     get_filenames_without_extension,
 )
 
+MIGRATION_REPORT_PATH = MEM_FILE_PATH / "migration_report.json"
+
+# Maps each supported store format to the extension of its metric files.
+METRIC_FILE_EXTENSIONS: dict[str, str] = {
+    "json": ".json",
+    "columnar": COLUMNAR_EXTENSION,
+    "segmented": SEGMENTED_EXTENSION,
+    "archive": ARCHIVE_EXTENSION,
+}
+
+ARCHIVE_REPORT_PATH = MEM_FILE_PATH / "archive_report.json"
+COMPACTION_REPORT_PATH = MEM_FILE_PATH / "compaction_report.json"
+
+
+def using_sqlite_store() -> bool:
+    """
+    Returns True if the store is configured to use the SQLite backend rather than
+    one metric file per metric.
+    """
+    return get_store_setting("backend") == "sqlite"
+
+
+def get_metric_registry() -> MetricNameRegistry:
+    """
+    Returns the metric name registry, after re-listing the store if another process
+    has changed it since it was last listed.
+    """
+    if using_sqlite_store():
+        store = get_sqlite_store()
+        metric_registry.sync(SQLITE_STORE_PATH, store.data_version(), store.list_names)
+    else:
+        metric_registry.sync(
+            FILE_DIR_PATH,
+            modification_time(FILE_DIR_PATH),
+            lambda: get_filenames_without_extension(FILE_DIR_PATH),
+        )
+
+    return metric_registry
+
+
+def get_metric_names() -> list[str]:
+    """
+    Returns the names of every metric in the store, regardless of backend, sorted.
+    """
+    return get_metric_registry().names()
+
+
+def metric_exists(metric_name: str) -> bool:
+    """
+    Returns true if a metric with this name is in the store.
+    """
+    return Path(metric_name).stem in get_metric_registry()
+
+
+def get_metric_file_path(metric_name: str) -> Path:
+    """
+    Resolve the name of a metric to the path of its metric file, in whichever format
+    it is currently stored. If no file exists yet, the path uses the store's
+    configured format.
+
+    Arguments:
+        metric_name: Name of the metric, or a path to its metric file.
+
+    Returns:
+        Path to the metric file.
+    """
+    given_path = Path(metric_name)
+    if given_path.suffix in METRIC_FILE_EXTENSIONS.values():
+        return given_path
+
+    for extension in METRIC_FILE_EXTENSIONS.values():
+        candidate_path = FILE_DIR_PATH / f"{metric_name}{extension}"
+        if candidate_path.exists():
+            return candidate_path
+
+    return _store_format_path(metric_name)
+
+
+def _store_format_path(metric_name: str) -> Path:
+    """
+    Returns the path a metric file would have in the store's configured format.
+    """
+    store_extension = METRIC_FILE_EXTENSIONS[get_store_setting("format")]
+    return FILE_DIR_PATH / f"{metric_name}{store_extension}"
+
+
+def get_metric_signature(metric_name: str) -> Optional[list]:
+    """
+    Returns a cheap signature of a metric's stored data (file format, modification
+    time and size, and journal size), which changes whenever the metric is written.
+    Metrics in the SQLite store are signed by their revision and size instead.
+
+    Arguments:
+        metric_name: Name of the metric.
+
+    Returns:
+        The signature, or None if there is no metric file.
+    """
+    if using_sqlite_store():
+        return get_sqlite_store().signature(metric_name)
+
+    file_path = get_metric_file_path(metric_name)
+    try:
+        file_stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+
+    return [
+        file_path.suffix,
+        file_stat.st_mtime_ns,
+        file_stat.st_size,
+        journal_size(metric_name),
+    ]
+
+
+def refresh_catalog_entry(
+    metric_name: str, health_data: Optional[dict] = None
+) -> Optional[dict]:
+    """
+    Rebuild the catalog entry for a single metric from its stored data.
+
+    Arguments:
+        metric_name: Name of the metric.
+        health_data: The metric's complete JSON dict, if already in hand.
+
+    Returns:
+        The new catalog entry, or None if the metric couldn't be read.
+    """
+    signature = get_metric_signature(metric_name)
+    health_data = health_data or read_metric_file_to_json(metric_name)
+
+    if not health_data:
+        metric_catalog.remove(metric_name)
+        return None
+
+    entry = build_catalog_entry(
+        health_data, load_metric_from_json(health_data), signature
+    )
+    metric_catalog.set(metric_name, entry)
+    return entry
+
+
+def get_metric_catalog() -> MetricCatalog:
+    """
+    Returns the metric catalog, after rebuilding any entries whose metric has changed
+    on disk since the entry was recorded. This only stats each metric file, and only
+    opens those that are new or changed.
+
+    Returns:
+        The up to date MetricCatalog.
+    """
+    metric_names = get_metric_names()
+
+    for catalogued_name in set(metric_catalog.names()) - set(metric_names):
+        metric_catalog.remove(catalogued_name)
+
+    for metric_name in metric_names:
+        entry = metric_catalog.get(metric_name)
+        if entry is None or entry["signature"] != get_metric_signature(metric_name):
+            refresh_catalog_entry(metric_name)
+
+    metric_catalog.save()
+    return metric_catalog
+
+
+def rebuild_catalog_entries(metric_names: Optional[list[str]] = None) -> int:
+    """
+    Rebuild catalog entries from their metrics' stored data, regardless of whether
+    they look stale. This recounts the OoR counters, e.g. after a metric guide has
+    been changed.
+
+    Arguments:
+        metric_names: Names of the metrics to rebuild, or None for every metric.
+
+    Returns:
+        Number of entries rebuilt.
+    """
+    rebuilt_count = 0
+    for metric_name in metric_names or get_metric_names():
+        if refresh_catalog_entry(metric_name) is not None:
+            rebuilt_count += 1
+
+    metric_catalog.save()
+    return rebuilt_count
+
+
+def _record_appended_measurement(
+    metric_name: str,
+    new_entry: dict,
+    measurement: Measurement,
+    previous_signature: Optional[list],
+):
+    """
+    Update a metric's catalog entry in place for a newly appended measurement. If the
+    entry was already stale before the append, it is rebuilt instead. The catalog is
+    saved later, e.g. once the journal is folded, so an append stays O(1).
+    """
+    entry = metric_catalog.get(metric_name)
+
+    if entry is None or entry["signature"] != previous_signature:
+        refresh_catalog_entry(metric_name)
+    else:
+        entry["entry_count"] += 1
+        entry["first_date"] = min(filter(None, [entry["first_date"], new_entry["date"]]))
+        entry["last_date"] = max(filter(None, [entry["last_date"], new_entry["date"]]))
+
+        # Classify the new measurement against the metric guide, using an empty
+        # metric built from the entry to maintain the OoR counters.
+        guide_metric = build_metric_from_header(entry)
+        if guide_metric:
+            guide_metric.add_entry(measurement)
+            if guide_metric.oor_count:
+                entry["oor_count"] += 1
+                entry["latest_oor_date"] = max(
+                    filter(None, [entry["latest_oor_date"], new_entry["date"]])
+                )
+
+        entry["signature"] = get_metric_signature(metric_name)
+        metric_catalog.set(metric_name, entry)
+
+
+def _read_metric_data(
+    file_path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    """
+    Read a metric file in any supported format, without merging its journal. The
+    date bounds are a hint: segmented metrics only read the segments overlapping
+    them, other formats are read in full.
+    """
+    if file_path.suffix == COLUMNAR_EXTENSION:
+        return read_columnar_to_json(file_path)
+    elif file_path.suffix == SEGMENTED_EXTENSION:
+        return read_segmented_to_json(file_path, since, until)
+    elif file_path.suffix == ARCHIVE_EXTENSION:
+        return read_archive(file_path)
+
+    with open(file_path, "r") as health_file:
+        return json.load(health_file)
+
+
+def _write_metric_data(file_path: Path, data: dict):
+    """
+    Write a metric file JSON dict to disk, in the format implied by the path. The
+    file is replaced atomically (see file_locks.py), so it's never left partly
+    written. Callers changing an existing metric should hold its lock, and callers
+    creating a metric should add it to the metric registry.
+    """
+    with metric_registry.own_write(FILE_DIR_PATH):
+        if file_path.suffix == SEGMENTED_EXTENSION:
+            write_segmented(file_path, data)
+        elif file_path.suffix == COLUMNAR_EXTENSION:
+            temporary_path = temporary_path_for(file_path)
+            write_columnar(temporary_path, data)
+            replace_file(file_path, temporary_path)
+        elif file_path.suffix == ARCHIVE_EXTENSION:
+            atomic_write_bytes(
+                file_path, encode_archive(data, get_store_setting("archive_codec"))
+            )
+        else:
+            atomic_write_bytes(
+                file_path,
+                json.dumps(data, indent=get_store_setting("json_indent")).encode(),
+            )
+
+
+def _remove_metric_data(file_path: Path):
+    """
+    Remove a metric file in any supported format. Callers removing a metric, rather
+    than one of its formats, should remove it from the metric registry.
+    """
+    with metric_registry.own_write(FILE_DIR_PATH):
+        if file_path.suffix == SEGMENTED_EXTENSION:
+            remove_segmented(file_path)
+        else:
+            file_path.unlink(missing_ok=True)
+
+
+def read_metric_file_to_json(metric_name: str, include_journal: bool = True) -> dict:
+    """
+    Given the name of a health metric file, load said file and return
+    JSON dict. Any measurements still held in the metric's journal are
+    appended to the "data" list, so the result reflects every write.
+
+    Arguments:
+        metric_name: Name of metric file, without the .json.
+        include_journal: If true, merge in unfolded journal entries.
+
+    Returns:
+        JSON dict of metric_name.
+    """
+    filename = get_metric_file_path(metric_name)
+
+    # Only complete metrics (with their journal) are cached.
+    if include_journal:
+        signature = get_metric_signature(filename.stem)
+        if cached := metric_cache.get(filename.stem, signature):
+            return cached["health_data"]
+
+    if using_sqlite_store():
+        data = get_sqlite_store().read_json(filename.stem)
+        if data is None:
+            logger.add("WARNING", f"Metric '{metric_name}' is not stored.", cli_out=True)
+        elif include_journal:
+            metric_cache.put(filename.stem, signature, data)
+        return data
+
+    try:
+        data = _read_metric_data(filename)
+
+        if include_journal:
+            data["data"].extend(read_journal(filename.stem))
+            metric_cache.put(filename.stem, signature, data)
+        return data
+
+    except FileNotFoundError:
+        warning_text = f"File '{filename} could not be found."
+        logger.add("WARNING", warning_text, cli_out=True)
+        return None
+
+
+def read_metric_json_between(
+    metric_name: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Optional[dict]:
+    """
+    Returns a metric's JSON dict holding only the measurement entries dated within
+    [since, until]. With the SQLite backend this is an indexed lookup, and segmented
+    metrics only read the segments overlapping the range. Other metric files are
+    read in full (or from the metric cache) and filtered.
+
+    Arguments:
+        metric_name: Name of the metric.
+        since: Earliest date to include, or None for no lower bound.
+        until: Latest date to include, or None for no upper bound.
+
+    Returns:
+        JSON dict of the metric, or None if it isn't stored.
+    """
+    if using_sqlite_store():
+        store = get_sqlite_store()
+        health_data = store.read_header(metric_name)
+        if health_data is not None:
+            health_data["data"] = store.read_entries_between(metric_name, since, until)
+        return health_data
+
+    file_path = get_metric_file_path(metric_name)
+    if file_path.suffix == SEGMENTED_EXTENSION:
+        # Only read the segments overlapping the range, rather than the whole metric.
+        try:
+            health_data = _read_metric_data(file_path, since, until)
+        except FileNotFoundError:
+            return None
+        health_data["data"].extend(read_journal(metric_name))
+    elif health_data := read_metric_file_to_json(metric_name):
+        # Copied, so the cached dict keeps all of its entries.
+        health_data = dict(health_data)
+    else:
+        return None
+
+    since_str = encode_date(since) if since else ""
+    until_str = encode_date(until) if until else "~"
+    health_data["data"] = [
+        entry
+        for entry in health_data["data"]
+        if entry.get("date") and since_str <= entry["date"] <= until_str
+    ]
+    return health_data
+
+
+def read_metric_entries_between(
+    metric_name: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> list[dict]:
+    """
+    Returns the measurement entries of a metric dated within [since, until] (see
+    `read_metric_json_between`).
+
+    Arguments:
+        metric_name: Name of the metric.
+        since: Earliest date to include, or None for no lower bound.
+        until: Latest date to include, or None for no upper bound.
+
+    Returns:
+        List of measurement entries, in the metric file format.
+    """
+    health_data = read_metric_json_between(metric_name, since, until)
+    return health_data["data"] if health_data else []
+
+
+def iter_metric_entries(
+    metric_name: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[dict]:
+    """
+    Yield the measurement entries of a metric dated within [since, until], with the
+    file level unit applied to entries without their own. The metric is read without
+    going through the metric cache, so streaming many metrics doesn't fill it.
+
+    Arguments:
+        metric_name: Name of the metric.
+        since: Earliest date to include, or None for no lower bound.
+        until: Latest date to include, or None for no upper bound.
+
+    Returns:
+        Iterator of measurement entries, in the metric file format.
+    """
+    if using_sqlite_store():
+        store = get_sqlite_store()
+        header = store.read_header(metric_name) or {}
+        entries = store.iter_entries_between(metric_name, since, until)
+    else:
+        try:
+            header = _read_metric_data(get_metric_file_path(metric_name), since, until)
+        except FileNotFoundError:
+            logger.add("WARNING", f"Metric '{metric_name}' could not be found.")
+            return
+
+        since_str = encode_date(since) if since else ""
+        until_str = encode_date(until) if until else "~"
+        entries = (
+            entry
+            for entry in header.pop("data") + read_journal(metric_name)
+            if entry.get("date") and since_str <= entry["date"] <= until_str
+        )
+
+    unit_from_file = header.get("unit")
+    for entry in entries:
+        if unit_from_file and not entry.get("unit"):
+            entry["unit"] = unit_from_file
+        yield entry
+
+
+def write_json_to_metric_file(metric_name: str, json_dict: dict) -> bool:
+    """
+    Given the name of a health metric file, and a JSON dict, write
+    JSON dict to file.
+
+    The JSON dict is assumed to be complete (i.e. read with its journal merged
+    in), so the metric's journal is cleared once the write succeeds.
+
+    Arguments:
+        metric_name: Name of metric file, without the .json.
+        json: The JSON dict.
+
+    Returns:
+        Bool indicating write success.
+    """
+    if using_sqlite_store():
+        get_sqlite_store().write_json(Path(metric_name).stem, json_dict)
+    else:
+        filepath = get_metric_file_path(metric_name)
+        archived_path = None
+        if filepath.suffix == ARCHIVE_EXTENSION:
+            # Data being written is no longer cold, so moves back to the store's
+            # format (unless that is itself the archive format).
+            archived_path, filepath = filepath, _store_format_path(filepath.stem)
+
+        try:
+            with metric_lock(filepath.stem):
+                _write_metric_data(filepath, json_dict)
+                if archived_path and archived_path != filepath:
+                    _remove_metric_data(archived_path)
+                clear_journal(filepath.stem)
+        except IOError as e:
+            logger.add("ERROR", f"Failed to write metric file: {e}")
+            metric_cache.invalidate(filepath.stem)
+            return False
+
+        metric_cache.put(filepath.stem, get_metric_signature(filepath.stem), json_dict)
+
+    # In case the write created the metric.
+    metric_registry.add(Path(metric_name).stem)
+    refresh_catalog_entry(Path(metric_name).stem, json_dict)
+    return True
+
+
+def generate_metric_file(health_metric: HealthMetric) -> str:
+    """
+    Provided a health metric object, generate a metric file to store the currently
+    contained data. File is named using the metric_name attribute and saved to the
+    required directory.
+
+    Arguments:
+        health_metric: The metric to be saved to file.
+
+    Returns:
+        A string path to the generated file.
+    """
+    preformed_dictionary = {
+        "metric_name": health_metric.metric_name,
+        "file_version": FILE_VERS,
+        "metric_type": health_metric.metric_type.value,
+        "metric_guide": health_metric.metric_guide(),
+        "data": [],
+    }
+
+    if health_metric.unit:
+        preformed_dictionary["unit"] = health_metric.unit
+
+    if using_sqlite_store():
+        get_sqlite_store().write_json(health_metric.metric_name, preformed_dictionary)
+        file_path = f"{SQLITE_STORE_PATH}:{health_metric.metric_name}"
+    else:
+        file_path = get_metric_file_path(health_metric.metric_name)
+
+        try:
+            _write_metric_data(file_path, preformed_dictionary)
+        except IOError as e:
+            logger.add("ERROR", f"Failed to write metric file: {e}")
+            raise
+
+        metric_cache.put(
+            health_metric.metric_name,
+            get_metric_signature(health_metric.metric_name),
+            preformed_dictionary,
+        )
+
+    refresh_catalog_entry(health_metric.metric_name, preformed_dictionary)
+    metric_catalog.save()
+    metric_registry.add(health_metric.metric_name)
+
+    logger.add("action", f"Created new metric `{health_metric.metric_name}`.")
+    return str(file_path)
+
+
+def _measurement_to_entry(measurement: Measurement) -> dict:
+    """
+    Convert a Measurement to a metric file "data" entry. The unit is only included
+    if the measurement has one of its own.
+    """
+    # Convert datetime to string in ISO format
+    new_entry = {
+        "date": encode_date(measurement.date),
+        "value": measurement.value
+        if not isinstance(measurement, InequalityMeasurement)
+        else str(measurement),
+    }
+    if measurement.unit:
+        new_entry["unit"] = measurement.unit
+
+    return new_entry
+
+
+def _append_to_segmented_metric(metric_name: str, new_entries: list[dict]) -> bool:
+    """
+    Append entries to a segmented metric, along with anything in its journal. Only
+    the segments the entries fall in are rewritten, rather than the whole metric.
+
+    Arguments:
+        metric_name: Name of the metric to be added to.
+        new_entries: Entries to be added, in order.
+
+    Returns:
+        Bool indicating write success.
+    """
+    file_path = get_metric_file_path(metric_name)
+    previous_signature = get_metric_signature(metric_name)
+    journal_entries = read_journal(metric_name)
+    entries = journal_entries + new_entries
+
+    try:
+        # Apply the file level unit to any measurement without its own.
+        if unit_from_file := read_segmented_header(file_path).get("unit"):
+            for entry in entries:
+                entry.setdefault("unit", unit_from_file)
+
+        with metric_registry.own_write(FILE_DIR_PATH):
+            append_segmented(file_path, entries)
+    except (IOError, json.JSONDecodeError) as e:
+        logger.add("ERROR", f"Failed to append to segmented metric '{metric_name}': {e}")
+        metric_cache.invalidate(metric_name)
+        return False
+
+    clear_journal(metric_name)
+    metric_cache.invalidate(metric_name)
+
+    # Folding the journal alone doesn't change the metric's contents, so an up to
+    # date catalog entry only needs its signature updating. Otherwise the entry is
+    # left stale, to be rebuilt the next time the catalog is used.
+    catalog_entry = metric_catalog.get(metric_name)
+    if (
+        not new_entries
+        and catalog_entry
+        and catalog_entry["signature"] == previous_signature
+    ):
+        catalog_entry["signature"] = get_metric_signature(metric_name)
+        metric_catalog.set(metric_name, catalog_entry)
+
+    return True
+
+
+def add_measurement_to_metric_file(metric_name: str, measurement: Measurement) -> bool:
+    """Adds a new entry (date and value) to an existing health JSON file, accepts a datetime object for the date.
+
+    The entry is appended to the metric's journal rather than rewriting the whole
+    file, so the cost of an append doesn't grow with the metric's history. Once the
+    journal is large enough it is folded back into the metric file.
+
+    Arguments:
+        metric_name: Name of the metric to be added to.
+        measurement: Measurement to be added.
+
+    Returns:
+        Bool indicating write success.
+    """
+    # Add new entry. If the measurement has no unit of its own, the file level
+    # unit is applied when the journal is folded.
+    new_entry = _measurement_to_entry(measurement)
+
+    if using_sqlite_store():
+        store = get_sqlite_store()
+        if (header := store.read_header(metric_name)) is None:
+            print(f"Error: Metric {metric_name} not found. Please create it first.")
+            return False
+
+        if "unit" not in new_entry and (unit_from_file := header.get("unit")):
+            new_entry["unit"] = unit_from_file
+
+        # The store reads both signatures in the append's own transaction, so
+        # neither can include another process's write.
+        previous_signature, new_signature = store.append(metric_name, new_entry)
+        metric_cache.record_append(
+            metric_name, previous_signature, new_signature, new_entry
+        )
+        _record_appended_measurement(
+            metric_name, new_entry, measurement, previous_signature
+        )
+        logger.add("action", f"Added new measurement to '{metric_name}'.")
+        return True
+
+    file_path = get_metric_file_path(metric_name)
+
+    if not file_path.exists():
+        print(f"Error: File {file_path} not found. Please create the file first.")
+        return False
+
+    try:
+        with metric_lock(metric_name):
+            # Both signatures are read under the lock, so neither can include another
+            # process's append, and the cached metric is only extended if it was
+            # up to date just before this append.
+            previous_signature = get_metric_signature(metric_name)
+            current_journal_size = append_to_journal(metric_name, new_entry)
+            metric_cache.record_append(
+                metric_name,
+                previous_signature,
+                get_metric_signature(metric_name),
+                new_entry,
+            )
+            _record_appended_measurement(
+                metric_name, new_entry, measurement, previous_signature
+            )
+    except IOError as e:
+        logger.add("ERROR", f"Failed to write to journal for {file_path}: {e}")
+        return False
+
+    logger.add("action", f"Added new measurement to '{file_path.name}'.")
+
+    if current_journal_size > JOURNAL_FOLD_BYTES:
+        fold_journal(metric_name)
+
+    return True
+
+
+def add_measurements_to_metric_file(
+    metric_name: str, measurements: list[Measurement]
+) -> bool:
+    """
+    Add several measurements to a metric with a single write, rather than appending
+    each one in turn. Any journalled measurements are folded in by the same write.
+
+    Arguments:
+        metric_name: Name of the metric to be added to.
+        measurements: Measurements to be added, in order.
+
+    Returns:
+        Bool indicating write success.
+    """
+    new_entries = [_measurement_to_entry(measurement) for measurement in measurements]
+
+    if using_sqlite_store():
+        store = get_sqlite_store()
+        if (header := store.read_header(metric_name)) is None:
+            print(f"Error: Metric {metric_name} not found. Please create it first.")
+            return False
+
+        if unit_from_file := header.get("unit"):
+            for entry in new_entries:
+                entry.setdefault("unit", unit_from_file)
+
+        store.append_many(metric_name, new_entries)
+        refresh_catalog_entry(metric_name)
+    else:
+        try:
+            with metric_lock(metric_name):
+                if not _add_entries_to_metric_file(metric_name, new_entries):
+                    return False
+        except MetricLockTimeout as e:
+            logger.add("ERROR", f"Failed to add measurements to '{metric_name}': {e}")
+            return False
+
+    logger.add(
+        "action", f"Added {len(new_entries)} new measurements to '{metric_name}'."
+    )
+    return True
+
+
+def _add_entries_to_metric_file(metric_name: str, new_entries: list[dict]) -> bool:
+    """
+    Add entries to a metric file, folding in its journal. The caller holds the
+    metric's lock.
+    """
+    if get_metric_file_path(metric_name).suffix == SEGMENTED_EXTENSION:
+        if not get_metric_file_path(metric_name).exists():
+            print(f"Error: Metric {metric_name} not found. Please create it first.")
+            return False
+        return _append_to_segmented_metric(metric_name, new_entries)
+
+    data = read_metric_file_to_json(metric_name)
+    if not data:
+        print(f"Error: Metric {metric_name} not found. Please create it first.")
+        return False
+
+    # Apply the file level unit to any measurement without its own.
+    if unit_from_file := data.get("unit"):
+        for entry in new_entries:
+            entry.setdefault("unit", unit_from_file)
+
+    data["data"].extend(new_entries)
+    return write_json_to_metric_file(metric_name=metric_name, json_dict=data)
+
+
+def journal_measurements(metric_name: str, measurements: list[Measurement]) -> bool:
+    """
+    Append several measurements to a metric's journal with a single write, without
+    folding the journal into the metric file. This keeps the cost of repeated batches
+    proportional to the batch rather than the metric, for callers that fold once
+    they're done (e.g. bulk imports). The SQLite store has no journal, so the
+    measurements are appended to the store directly.
+
+    Arguments:
+        metric_name: Name of the metric to be added to.
+        measurements: Measurements to be added, in order.
+
+    Returns:
+        Bool indicating write success.
+    """
+    if using_sqlite_store():
+        return add_measurements_to_metric_file(metric_name, measurements)
+
+    if not get_metric_file_path(metric_name).exists():
+        print(f"Error: Metric {metric_name} not found. Please create it first.")
+        return False
+
+    try:
+        with metric_lock(metric_name):
+            append_many_to_journal(
+                metric_name,
+                [_measurement_to_entry(measurement) for measurement in measurements],
+            )
+    except IOError as e:
+        logger.add("ERROR", f"Failed to write to journal for '{metric_name}': {e}")
+        return False
+
+    # The journal has changed, so the cached metric and catalog entry are stale.
+    metric_cache.invalidate(metric_name)
+    return True
+
+
+def fold_journal(metric_name: str) -> int:
+    """
+    Fold any journalled measurements for a metric back into its metric file, then
+    clear the journal, and save the metric catalog.
+
+    Arguments:
+        metric_name: Name of the metric to be folded.
+
+    Returns:
+        Number of measurements folded into the metric file.
+    """
+    try:
+        with metric_lock(metric_name):
+            folded_count = _fold_journal(metric_name)
+    except MetricLockTimeout as e:
+        logger.add("ERROR", f"Unable to fold journal for '{metric_name}': {e}")
+        return 0
+
+    # Catalog changes from the journalled appends are saved once, with the fold.
+    metric_catalog.save()
+    return folded_count
+
+
+def _fold_journal(metric_name: str) -> int:
+    journal_entries = read_journal(metric_name)
+    if not journal_entries:
+        return 0
+
+    if get_metric_file_path(metric_name).suffix == SEGMENTED_EXTENSION:
+        if not _append_to_segmented_metric(metric_name, []):
+            return 0
+        logger.add(
+            "action",
+            f"Folded {len(journal_entries)} journalled measurements into '{metric_name}'.",
+        )
+        return len(journal_entries)
+
+    data = read_metric_file_to_json(metric_name, include_journal=False)
+    if not data:
+        logger.add("ERROR", f"Unable to fold journal, no metric file for '{metric_name}'.")
+        return 0
+
+    # Apply the file level unit to any measurement without its own.
+    if unit_from_file := data.get("unit"):
+        for entry in journal_entries:
+            entry.setdefault("unit", unit_from_file)
+
+    data["data"].extend(journal_entries)
+
+    if not write_json_to_metric_file(metric_name=metric_name, json_dict=data):
+        return 0
+
+    logger.add(
+        "action",
+        f"Folded {len(journal_entries)} journalled measurements into '{metric_name}'.",
+    )
+    return len(journal_entries)
+
+
+def fold_all_journals() -> int:
+    """
+    Fold the journal of every metric that has one.
+
+    Returns:
+        Total number of measurements folded.
+    """
+    return sum(
+        fold_journal(metric_name) for metric_name in get_journalled_metric_names()
+    )
+
+
+def update_measurement_units(
+    metric_name: str, new_unit: str, update_file_level_unit: bool = False
+) -> int:
+    """
+    Update all measurements in a given metric file with a new unit value.
+
+    Arguments:
+        metric_name: Name of the metric file to be modified.
+        new_unit: New unit string to be applied.
+        update_file_level_unit: If true, also update the metric file level unit.
+
+    Returns:
+        Number of measurements that were modified.
+    """
+    try:
+        with metric_lock(metric_name):
+            return _update_measurement_units(
+                metric_name, new_unit, update_file_level_unit
+            )
+    except MetricLockTimeout as e:
+        logger.add("ERROR", f"Can't update units of '{metric_name}': {e}", cli_out=True)
+        return 0
+
+
+def _update_measurement_units(
+    metric_name: str, new_unit: str, update_file_level_unit: bool
+) -> int:
+    modified_units = 0
+    file_json = read_metric_file_to_json(metric_name)
+
+    if file_json:
+        for measurement in file_json.get("data"):
+            measurement["unit"] = new_unit
+            modified_units += 1
+
+        # Update file level value if needed.
+        if update_file_level_unit:
+            file_json["unit"] = new_unit
+            logger.add(
+                "action", f"'{metric_name}' unit changed to '{new_unit}'.", cli_out=True
+            )
+
+        # Save the modified JSON back to the file
+        write_json_to_metric_file(metric_name=metric_name, json_dict=file_json)
+        logger.add(
+            "action",
+            f"Updated {modified_units} measurements from {metric_name} with unit '{new_unit}'.",
+            cli_out=True,
+        )
+
+    else:
+        logger.add("WARNING", "Can't mass update file.")
+
+    return modified_units
+
+
+def rename_health_file(current_metric_name: str, new_metric_name: str):
+    if using_sqlite_store():
+        if get_sqlite_store().rename(current_metric_name, new_metric_name):
+            metric_registry.rename(current_metric_name, new_metric_name)
+            print(f" - Metric renamed successfully to {new_metric_name}")
+        else:
+            print(f"The metric {current_metric_name} does not exist.")
+        _record_rename(current_metric_name, new_metric_name)
+        return
+
+    try:
+        with metric_locks(current_metric_name, new_metric_name):
+            _rename_health_file(current_metric_name, new_metric_name)
+    except MetricLockTimeout as e:
+        print(f"Unable to rename '{current_metric_name}': {e}")
+
+
+def _rename_health_file(current_metric_name: str, new_metric_name: str):
+    # Specify the old and new file names
+    old_file = get_metric_file_path(current_metric_name)
+    new_file = FILE_DIR_PATH / f"{new_metric_name}{old_file.suffix}"
+
+    # Rename the file
+    try:
+        with metric_registry.own_write(FILE_DIR_PATH):
+            if old_file.suffix == SEGMENTED_EXTENSION:
+                rename_segmented(old_file, new_file)
+            else:
+                old_file.rename(new_file)
+        rename_journal(current_metric_name, new_metric_name)
+        metric_registry.rename(current_metric_name, new_metric_name)
+        print(f" - File renamed successfully to {new_file}")
+    except FileNotFoundError:
+        print(f"The file {old_file} does not exist.")
+    except PermissionError:
+        print("Permission denied. Make sure you have the right access.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+    # Read the JSON data from the renamed file.
+    try:
+        data = _read_metric_data(new_file)
+        key_to_modify = "metric_name"
+
+        # Update metric_name.
+        if key_to_modify in data:
+            old_value = data[key_to_modify]
+            data[key_to_modify] = new_metric_name
+            print(
+                f" - Changed value of '{key_to_modify}' from '{old_value}' to '{new_metric_name}'"
+            )
+        else:
+            print(f" - The key '{key_to_modify}' does not exist in the JSON file.")
+
+        # Save the modified JSON back to the file
+        _write_metric_data(new_file, data)
+
+    except FileNotFoundError:
+        print(f"The file {str(new_file)} does not exist.")
+    except json.JSONDecodeError:
+        print("Error decoding JSON. Please ensure the file contains valid JSON.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+    _record_rename(current_metric_name, new_metric_name)
+
+
+def _record_rename(current_metric_name: str, new_metric_name: str):
+    """
+    Update the metric cache and catalog to follow a renamed metric, and forget any
+    typo aliases resolving to its old name.
+    """
+    metric_cache.invalidate(current_metric_name)
+    metric_cache.invalidate(new_metric_name)
+    metric_catalog.remove(current_metric_name)
+    refresh_catalog_entry(new_metric_name)
+    metric_catalog.save()
+    typo_aliases.forget_metric(current_metric_name)
+
+
+def convert_metric_file(metric_name: str, store_format: str) -> bool:
+    """
+    Rewrite a metric file in a different store format, folding in its journal. The
+    original file is only removed once the converted file has been written.
+
+    Arguments:
+        metric_name: Name of the metric to convert.
+        store_format: Target format, one of METRIC_FILE_EXTENSIONS.
+
+    Returns:
+        Bool indicating whether the file was converted.
+    """
+    try:
+        with metric_lock(metric_name):
+            return _convert_metric_file(metric_name, store_format)
+    except MetricLockTimeout as e:
+        logger.add("ERROR", f"Failed to convert '{metric_name}' to {store_format}: {e}")
+        return False
+
+
+def _convert_metric_file(metric_name: str, store_format: str) -> bool:
+    current_path = get_metric_file_path(metric_name)
+    target_path = FILE_DIR_PATH / f"{metric_name}{METRIC_FILE_EXTENSIONS[store_format]}"
+
+    if current_path == target_path:
+        return False
+
+    data = read_metric_file_to_json(metric_name)
+    if not data:
+        return False
+
+    try:
+        _write_metric_data(target_path, data)
+    except (IOError, ValueError) as e:
+        logger.add("ERROR", f"Failed to convert '{metric_name}' to {store_format}: {e}")
+        _remove_metric_data(target_path)
+        return False
+
+    _remove_metric_data(current_path)
+    clear_journal(metric_name)
+    metric_cache.invalidate(metric_name)
+    return True
+
+
+def convert_store(store_format: str) -> int:
+    """
+    Convert every metric file in the store to the given format, and make it the
+    format used for new metric files.
+
+    Arguments:
+        store_format: Target format, one of METRIC_FILE_EXTENSIONS.
+
+    Returns:
+        Number of metric files converted.
+    """
+    if using_sqlite_store():
+        logger.add("WARNING", "Store uses SQLite, export it to files first.", cli_out=True)
+        return 0
+
+    converted_count = sum(
+        convert_metric_file(metric_name, store_format)
+        for metric_name in get_filenames_without_extension(FILE_DIR_PATH)
+    )
+    set_store_setting("format", store_format)
+
+    logger.add(
+        "action",
+        f"Converted {converted_count} metric files to the '{store_format}' format.",
+    )
+    return converted_count
+
+
+def import_store_to_sqlite() -> int:
+    """
+    One-shot import of every metric file (with its journal) into the SQLite store,
+    after which the store uses the SQLite backend. Metric files are left in place.
+
+    Returns:
+        Number of metrics imported.
+    """
+    if using_sqlite_store():
+        logger.add("WARNING", "Store already uses SQLite.", cli_out=True)
+        return 0
+
+    store = get_sqlite_store()
+    imported_count = 0
+
+    for metric_name in get_filenames_without_extension(FILE_DIR_PATH):
+        if health_data := read_metric_file_to_json(metric_name):
+            store.write_json(metric_name, health_data)
+            imported_count += 1
+
+    set_store_setting("backend", "sqlite")
+    logger.add("action", f"Imported {imported_count} metrics into '{SQLITE_STORE_PATH}'.")
+    return imported_count
+
+
+def export_sqlite_to_store() -> int:
+    """
+    Export every metric in the SQLite store back to one metric file per metric, in
+    the store's configured format, after which the store uses metric files again.
+
+    Returns:
+        Number of metrics exported.
+    """
+    if not using_sqlite_store():
+        logger.add("WARNING", "Store doesn't use SQLite.", cli_out=True)
+        return 0
+
+    store = get_sqlite_store()
+    metric_names = store.list_names()
+    set_store_setting("backend", "files")
+    FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+    for metric_name in metric_names:
+        write_json_to_metric_file(metric_name, store.read_json(metric_name))
+
+    logger.add("action", f"Exported {len(metric_names)} metrics from '{SQLITE_STORE_PATH}'.")
+    return len(metric_names)
+
+
+def migrate_metric_file(metric_name: str, dry_run: bool = False) -> dict:
+    """
+    Upgrade a single stored metric to the current file version. Metric files are
+    rewritten atomically, and their journal (always written at the current version)
+    is left as it is.
+
+    Arguments:
+        metric_name: Name of the metric.
+        dry_run: If true, work out the migration without writing anything.
+
+    Returns:
+        Migration result for the report.
+    """
+    result = {"metric_name": metric_name, "status": "current", "steps": []}
+
+    try:
+        with metric_lock(metric_name):
+            if using_sqlite_store():
+                health_data = get_sqlite_store().read_json(metric_name)
+            else:
+                file_path = get_metric_file_path(metric_name)
+                health_data = _read_metric_data(file_path)
+
+            result["from_version"] = health_data.get("file_version")
+            result["steps"] = migrate_health_data(health_data)
+            if not result["steps"]:
+                return result
+
+            result["status"] = "would_migrate" if dry_run else "migrated"
+            if dry_run:
+                return result
+
+            if using_sqlite_store():
+                get_sqlite_store().write_json(metric_name, health_data)
+            else:
+                _write_metric_data(file_path, health_data)
+            metric_cache.invalidate(metric_name)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+
+    return result
+
+
+def migrate_store(dry_run: bool = False, workers: Optional[int] = None) -> dict:
+    """
+    Upgrade every outdated metric in the store to the current file version, using a
+    thread pool for metric files, and record a report in MIGRATION_REPORT_PATH.
+
+    Arguments:
+        dry_run: If true, report what would be migrated without writing anything.
+        workers: Number of workers. Defaults to the "load_workers" store setting,
+            or the CPU count.
+
+    Returns:
+        The migration report.
+    """
+    start_time = time.perf_counter()
+    metric_names = get_metric_names()
+
+    # SQLite connections can't be shared between threads.
+    if using_sqlite_store():
+        results = [migrate_metric_file(name, dry_run) for name in metric_names]
+    else:
+        workers = workers or get_store_setting("load_workers") or os.cpu_count()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(migrate_metric_file, metric_names, [dry_run] * len(metric_names))
+            )
+
+    status_counts = {}
+    for result in results:
+        status_counts[result["status"]] = status_counts.get(result["status"], 0) + 1
+
+    report = {
+        "run_at": datetime.now().isoformat(),
+        "dry_run": dry_run,
+        "operating_version": FILE_VERS,
+        "seconds": time.perf_counter() - start_time,
+        "counts": status_counts,
+        "metrics": [result for result in results if result["status"] != "current"],
+    }
+
+    try:
+        MIGRATION_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        MIGRATION_REPORT_PATH.write_text(json.dumps(report, indent=4))
+    except IOError as e:
+        logger.add("ERROR", f"Failed to write migration report: {e}")
+
+    if not dry_run and status_counts.get("migrated"):
+        get_metric_catalog()
+
+    logger.add(
+        "action",
+        f"Migration{' (dry run)' if dry_run else ''} of {len(results)} metrics: "
+        + ", ".join(f"{count} {status}" for status, count in status_counts.items()),
+    )
+    return report
+
 
-def read_metric_file_to_json(metric_name: str) -> dict:
+def _stored_bytes(metric_name: str) -> int:
     """
-    Given the name of a health metric file, load said file and return
-    JSON dict.
+    Returns the bytes a metric takes up on disk, including its journal and, for
+    segmented metrics, every segment.
+    """
+    file_path = get_metric_file_path(metric_name)
+    stored_bytes = journal_size(metric_name)
+
+    if file_path.exists():
+        stored_bytes += file_path.stat().st_size
+    if file_path.suffix == SEGMENTED_EXTENSION and segment_dir(file_path).exists():
+        stored_bytes += sum(
+            segment.stat().st_size for segment in segment_dir(file_path).iterdir()
+        )
+
+    return stored_bytes
+
+
+def compact_metric_file(
+    metric_name: str, dry_run: bool = False, rewrite: bool = False
+) -> dict:
+    """
+    Compact a single stored metric: fold in its journal, sort its entries by date,
+    normalise dates, drop units that only repeat the file level unit, and remove
+    exact duplicates. Metric files are rewritten atomically in their current format,
+    and only if something changed.
 
     Arguments:
-        metric_name: Name of metric file, without the .json.
+        metric_name: Name of the metric.
+        dry_run: If true, work out the compaction without writing anything.
+        rewrite: If true, rewrite the metric even if nothing changed, e.g. to apply
+            a new "json_indent" store setting.
 
     Returns:
-        JSON dict of metric_name.
+        Compaction result for the report.
     """
-    filename = (
-        f"{FILE_DIR_NAME}/{metric_name}.json"
-        if ".json" not in metric_name
-        else metric_name
-    )
+    result = {"metric_name": metric_name, "status": "clean"}
 
     try:
-        # Write updated data back to the file
-        with open(filename, "r") as health_file:
-            data = json.load(health_file)
-        return data
+        with metric_lock(metric_name):
+            if using_sqlite_store():
+                health_data = get_sqlite_store().read_json(metric_name)
+                journal_entries = []
+                bytes_before = None
+            else:
+                file_path = get_metric_file_path(metric_name)
+                bytes_before = _stored_bytes(metric_name)
+                health_data = _read_metric_data(file_path)
+                journal_entries = read_journal(metric_name)
+
+            entries = health_data["data"] + journal_entries
+            compacted, stats = compact_entries(entries, health_data.get("unit"))
+            result |= stats
+            result["entries_before"] = len(entries)
+            if compacted == health_data["data"] and not journal_entries and not rewrite:
+                return result
+
+            result["status"] = "would_compact" if dry_run else "compacted"
+            if dry_run:
+                return result
+
+            health_data["data"] = compacted
+            if using_sqlite_store():
+                get_sqlite_store().write_json(metric_name, health_data)
+            else:
+                _write_metric_data(file_path, health_data)
+                clear_journal(metric_name)
+                result["bytes_saved"] = bytes_before - _stored_bytes(metric_name)
+            metric_cache.invalidate(metric_name)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
 
-    except FileNotFoundError:
-        warning_text = f"File '{filename} could not be found."
-        logger.add("WARNING", warning_text, cli_out=True)
-        return None
+    return result
 
 
-def write_json_to_metric_file(metric_name: str, json_dict: dict) -> bool:
+def compact_store(
+    dry_run: bool = False, rewrite: bool = False, workers: Optional[int] = None
+) -> dict:
     """
-    Given the name of a health metric file, and a JSON dict, write
-    JSON dict to file.
+    Compact every metric in the store, using a thread pool for metric files, and
+    record a report in COMPACTION_REPORT_PATH.
 
     Arguments:
-        metric_name: Name of metric file, without the .json.
-        json: The JSON dict.
+        dry_run: If true, report what would be compacted without writing anything.
+        rewrite: If true, rewrite every metric, even those already compact.
+        workers: Number of workers. Defaults to the "load_workers" store setting,
+            or the CPU count.
 
     Returns:
-        Bool indicating write success.
+        The compaction report.
     """
-    filepath = Path(
-        f"{FILE_DIR_NAME}/{metric_name}.json"
-        if ".json" not in metric_name
-        else metric_name
-    )
+    start_time = time.perf_counter()
+    metric_names = get_metric_names()
+
+    # SQLite connections can't be shared between threads.
+    if using_sqlite_store():
+        results = [compact_metric_file(name, dry_run, rewrite) for name in metric_names]
+    else:
+        workers = workers or get_store_setting("load_workers") or os.cpu_count()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(
+                    compact_metric_file,
+                    metric_names,
+                    [dry_run] * len(metric_names),
+                    [rewrite] * len(metric_names),
+                )
+            )
+
+    status_counts = {}
+    for result in results:
+        status_counts[result["status"]] = status_counts.get(result["status"], 0) + 1
+
+    report = {
+        "run_at": datetime.now().isoformat(),
+        "dry_run": dry_run,
+        "seconds": time.perf_counter() - start_time,
+        "counts": status_counts,
+        "bytes_saved": sum(result.get("bytes_saved", 0) for result in results),
+        "duplicates_removed": sum(
+            result.get("duplicates_removed", 0) for result in results
+        ),
+        "metrics": [result for result in results if result["status"] != "clean"],
+    }
 
     try:
-        filepath.write_text(json.dumps(json_dict, indent=4))
+        COMPACTION_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        COMPACTION_REPORT_PATH.write_text(json.dumps(report, indent=4))
     except IOError as e:
-        logger.add("ERROR", f"Failed to write metric file: {e}")
-        return False
+        logger.add("ERROR", f"Failed to write compaction report: {e}")
 
-    return True
+    if not dry_run and status_counts.get("compacted"):
+        get_metric_catalog()
 
+    logger.add(
+        "action",
+        f"Compaction{' (dry run)' if dry_run else ''} of {len(results)} metrics: "
+        + ", ".join(f"{count} {status}" for status, count in status_counts.items()),
+    )
+    return report
 
-def generate_metric_file(health_metric: HealthMetric) -> str:
+
+def _time_read(read: callable, repeats: int = 3) -> float:
     """
-    Provided a health metric object, generate a metric file to store the currently
-    contained data. File is named using the metric_name attribute and saved to the
-    required directory.
+    Returns the fastest of `repeats` timings of `read()`, in seconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        read()
+        timings.append(time.perf_counter() - start_time)
+
+    return min(timings)
+
+
+def archive_metric_file(
+    metric_name: str, codec: str, dry_run: bool = False
+) -> Optional[dict]:
+    """
+    Archive a metric's cold data, following the "archive_after_days" and
+    "archive_over_bytes" store settings. Whole metric files are compressed into the
+    archive format, while segmented metrics have their cold segments compressed.
+    Metrics with unfolded journal entries are still being written to, so are left.
 
     Arguments:
-        health_metric: The metric to be saved to file.
+        metric_name: Name of the metric.
+        codec: Name of the compression codec, one of ARCHIVE_CODECS.
+        dry_run: If true, work out what archiving would save without writing.
 
     Returns:
-        A string path to the generated file.
+        Dict of the bytes and read time before and after archiving, or None if
+        nothing in the metric was archived.
     """
-    file_path = Path(FILE_DIR_NAME) / f"{health_metric.metric_name}.json"
+    try:
+        with metric_lock(metric_name):
+            return _archive_metric_file(metric_name, codec, dry_run)
+    except MetricLockTimeout as e:
+        logger.add("ERROR", f"Failed to archive '{metric_name}': {e}")
+        return None
 
-    preformed_dictionary = {
-        "metric_name": health_metric.metric_name,
-        "file_version": FILE_VERS,
-        "metric_type": health_metric.metric_type.value,
-        "metric_guide": health_metric.metric_guide(),
-        "data": [],
+
+def _archive_metric_file(metric_name: str, codec: str, dry_run: bool) -> Optional[dict]:
+    file_path = get_metric_file_path(metric_name)
+    after_days = get_store_setting("archive_after_days")
+    over_bytes = get_store_setting("archive_over_bytes")
+
+    if file_path.suffix == ARCHIVE_EXTENSION or journal_size(metric_name):
+        return None
+
+    read_seconds_before = _time_read(lambda: _read_metric_data(file_path))
+
+    if file_path.suffix == SEGMENTED_EXTENSION:
+        with metric_registry.own_write(FILE_DIR_PATH):
+            archived_segments = archive_segments(
+                file_path, codec, after_days, over_bytes, dry_run=dry_run
+            )
+        if not archived_segments:
+            return None
+
+        bytes_before = sum(segment["bytes_before"] for segment in archived_segments)
+        bytes_after = sum(segment["bytes_after"] for segment in archived_segments)
+        archive_path = file_path
+    else:
+        if not is_cold(file_path, after_days, over_bytes):
+            return None
+
+        health_data = _read_metric_data(file_path)
+        content = encode_archive(health_data, codec)
+        bytes_before, bytes_after = file_path.stat().st_size, len(content)
+        archive_path = file_path.with_suffix(ARCHIVE_EXTENSION)
+
+        if not dry_run:
+            with metric_registry.own_write(FILE_DIR_PATH):
+                atomic_write_bytes(archive_path, content)
+            _remove_metric_data(file_path)
+            metric_cache.invalidate(metric_name)
+
+    return {
+        "metric_name": metric_name,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "read_seconds_before": read_seconds_before,
+        "read_seconds_after": (
+            None if dry_run else _time_read(lambda: _read_metric_data(archive_path))
+        ),
     }
 
-    if health_metric.unit:
-        preformed_dictionary["unit"] = health_metric.unit
+
+def archive_store(dry_run: bool = False, codec: Optional[str] = None) -> dict:
+    """
+    Archive the cold data of every metric file in the store, and record a report in
+    ARCHIVE_REPORT_PATH with the compression ratio and read time cost.
+
+    Arguments:
+        dry_run: If true, report what archiving would save without writing.
+        codec: Name of the compression codec, defaults to the "archive_codec" store
+            setting.
+
+    Returns:
+        The archive report.
+    """
+    codec = codec or get_store_setting("archive_codec")
+    if codec not in ARCHIVE_CODECS:
+        raise ValueError(f"Unknown codec '{codec}', expected one of {list(ARCHIVE_CODECS)}.")
+    if using_sqlite_store():
+        logger.add("WARNING", "Store uses SQLite, which can't be archived.", cli_out=True)
+        return {}
+
+    results = [
+        result
+        for metric_name in get_metric_names()
+        if (result := archive_metric_file(metric_name, codec, dry_run))
+    ]
+    bytes_before = sum(result["bytes_before"] for result in results)
+    bytes_after = sum(result["bytes_after"] for result in results)
+
+    report = {
+        "run_at": datetime.now().isoformat(),
+        "dry_run": dry_run,
+        "codec": codec,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "ratio": bytes_before / bytes_after if bytes_after else None,
+        "metrics": results,
+    }
 
     try:
-        file_path.write_text(json.dumps(preformed_dictionary, indent=4))
+        ARCHIVE_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        ARCHIVE_REPORT_PATH.write_text(json.dumps(report, indent=4))
     except IOError as e:
-        logger.add("ERROR", f"Failed to write metric file: {e}")
-        raise
-
-    logger.add("action", f"Created new metric file `{health_metric.metric_name}.json`.")
-    return str(file_path)
+        logger.add("ERROR", f"Failed to write archive report: {e}")
 
+    logger.add(
+        "action",
+        f"Archive{' (dry run)' if dry_run else ''} of {len(results)} metrics with "
+        f"{codec}: {bytes_before} bytes to {bytes_after} bytes.",
+    )
+    return report
 
-def add_measurement_to_metric_file(metric_name: str, measurement: Measurement) -> bool:
-    """Adds a new entry (date and value) to an existing health JSON file, accepts a datetime object for the date.
 
-    Arguments:
-        metric_name: Name of the metric to be added to.
-        measurement: Measurement to be added.
+def restore_archived_store() -> int:
+    """
+    Decompress every archived metric file back to the store's format, and every
+    archived segment of segmented metrics.
 
     Returns:
-        Bool indicating write success.
+        Number of metric files and segments restored.
     """
-    # Load existing data
-    file_path = Path(FILE_DIR_NAME) / f"{metric_name}.json"
+    restored_count = 0
 
-    if not file_path.exists():
-        print(f"Error: File {file_path} not found. Please create the file first.")
-        return False
+    for metric_name in get_filenames_without_extension(FILE_DIR_PATH):
+        try:
+            with metric_lock(metric_name):
+                file_path = get_metric_file_path(metric_name)
+                if file_path.suffix == SEGMENTED_EXTENSION:
+                    with metric_registry.own_write(FILE_DIR_PATH):
+                        restored_count += restore_segments(file_path)
+                elif file_path.suffix == ARCHIVE_EXTENSION:
+                    target_path = _store_format_path(metric_name)
+                    if target_path != file_path:
+                        _write_metric_data(target_path, read_archive(file_path))
+                        _remove_metric_data(file_path)
+                        metric_cache.invalidate(metric_name)
+                        restored_count += 1
+        except MetricLockTimeout as e:
+            logger.add("ERROR", f"Failed to restore '{metric_name}': {e}")
+
+    logger.add("action", f"Restored {restored_count} archived metric files and segments.")
+    return restored_count
+
+
+def _read_metric_source(metric_name: str) -> Optional[dict]:
+    """
+    Read phase of loading a metric. JSON metric files are returned undecoded, so that
+    decoding happens in the parse phase; other formats are decoded as they're read.
+    """
+    start_time = time.perf_counter()
+    source = {"metric_name": metric_name, "signature": get_metric_signature(metric_name)}
 
     try:
-        data = json.loads(file_path.read_text())
-    except json.JSONDecodeError as e:
-        logger.add("ERROR", f"Failed to parse JSON from {file_path}: {e}")
-        return False
+        file_path = get_metric_file_path(metric_name)
+        if not using_sqlite_store() and file_path.suffix == ".json":
+            source["raw"] = file_path.read_bytes()
+            source["journal"] = read_journal(metric_name)
+        elif not using_sqlite_store() and file_path.suffix == COLUMNAR_EXTENSION:
+            # Mapped and copied into the metric's series in the parse phase.
+            source["columnar_path"] = file_path
+            source["journal"] = read_journal(metric_name)
+        else:
+            source["health_data"] = read_metric_file_to_json(metric_name)
+    except Exception as e:
+        logger.add("WARNING", f"Failed to read metric '{metric_name}': {e}")
+        return None
 
-    # Convert datetime to string in ISO format
-    date_str = measurement.date.isoformat()
+    source["read_time"] = time.perf_counter() - start_time
+    return source
 
-    # Add new entry
-    new_entry = {
-        "date": date_str,
-        "value": measurement.value
-        if not isinstance(measurement, InequalityMeasurement)
-        else str(measurement),
-    }
-    # Check measurement has own unit.
-    if measurement.unit:
-        new_entry["unit"] = measurement.unit
-    elif unit_from_file := data.get("unit"):
-        # If no unit, try to use value default.
-        new_entry["unit"] = unit_from_file
 
-    data["data"].append(new_entry)
+def _parse_metric_source(
+    source: dict, return_health_data: bool = True
+) -> tuple[Optional[dict], Optional[HealthMetric], Optional[str]]:
+    """
+    Parse phase of loading a metric, for a source returned by `_read_metric_source`.
+    Kept at module level so it can be run in a worker process.
 
+    Returns:
+        Tuple of the metric's JSON dict (if requested, and the metric wasn't built
+        straight from a columnar file), its HealthMetric, and an error message if
+        parsing failed.
+    """
     try:
-        file_path.write_text(json.dumps(data, indent=4))
-    except IOError as e:
-        logger.add("ERROR", f"Failed to write to metric file {file_path}: {e}")
-        return False
+        if columnar_path := source.get("columnar_path"):
+            metric = load_metric_from_columnar(columnar_path, source["journal"])
+            if metric is None:
+                return None, None, "unreadable columnar metric file"
+            return None, metric, None
+
+        health_data = source.get("health_data")
+        if health_data is None:
+            health_data = json.loads(source["raw"])
+            health_data["data"].extend(source["journal"])
+
+        metric = load_metric_from_json(health_data)
+    except Exception as e:
+        return None, None, str(e)
 
-    logger.add("action", f"Added new measurement to '{file_path.name}'.")
-    return True
+    return (health_data if return_health_data else None), metric, None
 
 
-def update_measurement_units(
-    metric_name: str, new_unit: str, update_file_level_unit: bool = False
-) -> int:
+def get_all_metric_files(
+    metric_names: Optional[list[str]] = None,
+    workers: Optional[int] = None,
+    use_processes: Optional[bool] = None,
+    report_timing: bool = False,
+) -> list[HealthMetric]:
     """
-    Update all measurements in a given metric file with a new unit value.
+    Load every metric in the store, or those named. Metric files are read by a thread pool, then
+    decoded and built into HealthMetric objects by a thread pool, or a process pool
+    if requested. A metric that fails to read or parse is logged and left out, rather
+    than failing the whole load. Metrics already in the metric cache are reused.
 
     Arguments:
-        metric_name: Name of the metric file to be modified.
-        new_unit: New unit string to be applied.
-        update_file_level_unit: If true, also update the metric file level unit.
+        metric_names: Names of the metrics to load, or None for every metric.
+            Names of metrics not in the store are left out.
+        workers: Number of workers per pool. Defaults to the "load_workers" store
+            setting, or the CPU count.
+        use_processes: If true, parse in a process pool. Defaults to the
+            "load_with_processes" store setting. Metrics parsed in another process
+            aren't added to the metric cache.
+        report_timing: If true, print the load timings as well as logging them.
 
     Returns:
-        Number of measurements that were modified.
+        List of HealthMetric objects, in the order of `metric_names` (or name order).
     """
-    modified_units = 0
-    file_json = read_metric_file_to_json(metric_name)
-
-    if file_json:
-        for measurement in file_json.get("data"):
-            measurement["unit"] = new_unit
-            modified_units += 1
+    workers = workers or get_store_setting("load_workers") or os.cpu_count()
+    if use_processes is None:
+        use_processes = get_store_setting("load_with_processes")
 
-        # Update file level value if needed.
-        if update_file_level_unit:
-            file_json["unit"] = new_unit
-            logger.add(
-                "action", f"'{metric_name}' unit changed to '{new_unit}'.", cli_out=True
-            )
+    if metric_names is None:
+        metric_names = get_metric_names()
+    else:
+        metric_names = [name for name in metric_names if metric_exists(name)]
 
-        # Save the modified JSON back to the file
-        write_json_to_metric_file(metric_name=metric_name, json_dict=file_json)
-        logger.add(
-            "action",
-            f"Updated {modified_units} measurements from {metric_name} with unit '{new_unit}'.",
-            cli_out=True,
+    metrics: dict[str, Optional[HealthMetric]] = {
+        metric_name: metric_cache.get_metric(
+            metric_name, get_metric_signature(metric_name)
         )
+        for metric_name in metric_names
+    }
+    to_load = [metric_name for metric_name, metric in metrics.items() if metric is None]
 
+    # Read phase. SQLite connections can't be shared between threads.
+    read_start = time.perf_counter()
+    if using_sqlite_store():
+        sources = [_read_metric_source(metric_name) for metric_name in to_load]
     else:
-        logger.add("WARNING", "Can't mass update file.")
-
-    return modified_units
-
-
-def rename_health_file(current_metric_name: str, new_metric_name: str):
-    # Specify the old and new file names
-    old_file = Path(FILE_DIR_NAME) / f"{current_metric_name}.json"
-    new_file = Path(FILE_DIR_NAME) / f"{new_metric_name}.json"
-
-    # Rename the file
-    try:
-        old_file.rename(new_file)
-        print(f" - File renamed successfully to {new_file}")
-    except FileNotFoundError:
-        print(f"The file {old_file} does not exist.")
-    except PermissionError:
-        print("Permission denied. Make sure you have the right access.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-
-    # Read the JSON data from the renamed file.
-    try:
-        with open(str(new_file), "r") as file:
-            data = json.load(file)
-        key_to_modify = "metric_name"
-
-        # Update metric_name.
-        if key_to_modify in data:
-            old_value = data[key_to_modify]
-            data[key_to_modify] = new_metric_name
-            print(
-                f" - Changed value of '{key_to_modify}' from '{old_value}' to '{new_metric_name}'"
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            sources = list(pool.map(_read_metric_source, to_load))
+    sources = [source for source in sources if source]
+    read_time = time.perf_counter() - read_start
+
+    # Parse phase.
+    parse_start = time.perf_counter()
+    if use_processes:
+        # Imported here, as it pulls in multiprocessing, which slows startup.
+        from concurrent.futures import ProcessPoolExecutor as pool_type
+    else:
+        pool_type = ThreadPoolExecutor
+    with pool_type(max_workers=workers) as pool:
+        parsed = list(
+            pool.map(
+                _parse_metric_source, sources, [not use_processes] * len(sources)
             )
-        else:
-            print(f" - The key '{key_to_modify}' does not exist in the JSON file.")
+        )
+    parse_time = time.perf_counter() - parse_start
+
+    failed_count = len(to_load) - len(sources)
+    for source, (health_data, metric, error) in zip(sources, parsed):
+        metric_name = source["metric_name"]
+        if metric is None:
+            failed_count += 1
+            logger.add("WARNING", f"Failed to parse metric '{metric_name}': {error}")
+            continue
+
+        metrics[metric_name] = metric
+        if not use_processes:
+            metric_cache.put(metric_name, source["signature"], health_data, metric)
+
+    logger.add(
+        "info",
+        f"Loaded {len(metric_names) - failed_count} of {len(metric_names)} metrics "
+        f"({len(metric_names) - len(to_load)} cached) with {workers} workers: "
+        f"read {read_time:.3f}s (total per-file {sum(s['read_time'] for s in sources):.3f}s), "
+        f"parse {parse_time:.3f}s using {'processes' if use_processes else 'threads'}.",
+        cli_out=report_timing,
+    )
 
-        # Save the modified JSON back to the file
-        with open(str(new_file), "w") as file:
-            json.dump(data, file, indent=4)
+    return [metrics[metric_name] for metric_name in metric_names if metrics[metric_name]]
 
-    except FileNotFoundError:
-        print(f"The file {str(new_file)} does not exist.")
-    except json.JSONDecodeError:
-        print("Error decoding JSON. Please ensure the file contains valid JSON.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
 
+def build_metric_from_header(health_data: dict) -> Optional[HealthMetric]:
+    """
+    Given the header of a metric file (name, type, guide and unit), produce the
+    HealthMetric subclass representing it, without any entries.
 
-MEM_FILE_NAME = "memory"
-MEM_FILE_PATH = Path(MEM_FILE_NAME)
+    Arguments:
+        health_data: A JSON dict containing at least the metric file header keys.
 
+    Returns:
+        An empty HealthMetric, or None if the metric type isn't recognised.
+    """
+    metric_name = health_data["metric_name"]
+    metric_type = MetricType(health_data["metric_type"])
+    metric_guide = health_data["metric_guide"]
 
-def get_all_metric_files() -> list[HealthMetric]:
-    return [
-        generate_health_metric_from_file(metric)
-        for metric in get_filenames_without_extension(FILE_DIR_PATH)
-    ]
+    if metric_type == MetricType.Ranged:
+        lower_value, upper_value = metric_guide
+        metric = RangedMetric(
+            metric_name=metric_name,
+            range_minimum=lower_value,
+            range_maximum=upper_value,
+        )
+    elif metric_type == MetricType.GreaterThan:
+        metric = GreaterThanMetric(
+            metric_name=metric_name, minimum_value=float(metric_guide)
+        )
+    elif metric_type == MetricType.LessThan:
+        metric = LessThanMetric(metric_name=metric_name, maximum_value=float(metric_guide))
+    elif metric_type == MetricType.Boolean:
+        metric = BooleanMetric(metric_name=metric_name, ideal_boolean_value=metric_guide)
+    elif metric_type == MetricType.Metric:
+        metric = HealthMetric(metric_name=metric_name)
+    else:
+        # Metric type doesn't match supported types.
+        fv_warn = f"Metric file type `{metric_type}` is not recognised.\n"
+        logger.add("WARNING", fv_warn, cli_out=True)
+        return None
+
+    metric.assign_unit(unit=health_data.get("unit", None))
+    return metric
 
 
 def load_metric_from_json(health_data: dict) -> Optional[HealthMetric]:
@@ -287,91 +1809,103 @@ def load_metric_from_json(health_data: dict) -> Optional[HealthMetric]:
         )
         return None
 
-    file_is_outdated = False
-    # Check for outdated file.
-    if file_version < FILE_VERS:
-        version_delta = FILE_VERS - file_version
-        fv_warn = f"file `{metric_name}` is outdated by {version_delta}. (File vers: {file_version}, operating vers: {FILE_VERS})"
-        logger.add("WARNING", fv_warn, cli_out=True)
-        file_is_outdated = True
+    # Files at the current version are parsed straight away. Outdated files are
+    # upgraded in memory, until `migrate_store()` upgrades them on disk.
+    if file_version != FILE_VERS:
+        try:
+            migrate_health_data(health_data)
+        except ValueError as e:
+            logger.add(
+                "WARNING", f"file `{metric_name}` can't be migrated: {e}", cli_out=True
+            )
+            return None
+
+        fv_warn = f"file `{metric_name}` is outdated. (File vers: {file_version}, operating vers: {FILE_VERS}). Run `manage migrate` to update it."
+        logger.add("WARNING", fv_warn)
 
     try:
-        metric_type = MetricType(health_data["metric_type"])
-        metric_guide = health_data["metric_guide"]
         data_values = health_data["data"]
 
-        if metric_type == MetricType.Ranged:
-            lower_value, upper_value = metric_guide
-            metric = RangedMetric(
-                metric_name=metric_name,
-                range_minimum=lower_value,
-                range_maximum=upper_value,
-            )
-        elif metric_type == MetricType.GreaterThan:
-            metric = GreaterThanMetric(
-                metric_name=metric_name, minimum_value=float(metric_guide)
-            )
-        elif metric_type == MetricType.LessThan:
-            metric = LessThanMetric(
-                metric_name=metric_name, maximum_value=float(metric_guide)
-            )
-        elif metric_type == MetricType.Boolean:
-            metric = BooleanMetric(
-                metric_name=metric_name, ideal_boolean_value=metric_guide
-            )
-        elif metric_type == MetricType.Metric:
-            metric = HealthMetric(metric_name=metric_name)
-        else:
-            # Metric type doesn't match supported types.
-            fv_warn = f"Metric file type `{metric_type}` is not recognised.\n"
-            logger.add("WARNING", fv_warn, cli_out=True)
+        metric = build_metric_from_header(health_data)
+        if metric is None:
             return None
 
-        # Process individual data entries.
-        default_unit = health_data.get("unit", None)
-        metric.assign_unit(unit=default_unit)
-
-        for entry_number, data_point in enumerate(data_values):
-            # Date should be included with each entry.
-            date = data_point["date"]
-            if not date:
-                warning_text = f"Skipping entry '{entry_number}' - no date found."
-                logger.add("WARNING", warning_text)
-                continue
-
-            # Value is implied to exist, it shouldn't be possible for this to not exist.
-            data_point_unit = data_point.get("unit", default_unit)
-            data_point_value = data_point["value"]
-
-            # Inequality measurements are handled uniquely.
-            if is_inequality_value_str(data_point_value):
-                value_parsed = InequalityValue(data_point_value)
-                measurement = InequalityMeasurement(
-                    value_parsed.value,
-                    value_parsed.inequality_type,
-                    date,
-                    unit=data_point_unit,
-                )
+        # Process individual data entries. These are added straight to the metric's
+        # series, rather than building a Measurement for each.
+        skipped_entries = metric.entries.extend_from_json(data_values, metric.unit)
+        metric.recount_oor()
 
-            else:
-                # Non-equality measurement parsing.
-                measurement = Measurement(data_point_value, date, unit=data_point_unit)
+        # Date should be included with each entry.
+        for entry_number in skipped_entries:
+            warning_text = f"Skipping entry '{entry_number}' - no date found."
+            logger.add("WARNING", warning_text)
+    except Exception as e:
+        logger.add(
+            "WARNING",
+            f"Couldn't parse metric file `{metric_name}`. Reason is unknown. {e}",
+            cli_out=True,
+        )
+        return None
+    return metric
 
-            metric.add_entry(measurement)
+
+def load_metric_from_columnar(
+    file_path: Path, journal_entries: list[dict]
+) -> Optional[HealthMetric]:
+    """
+    Build a HealthMetric straight from a columnar metric file, copying each memory
+    mapped column into the metric's series in one go, rather than decoding every
+    entry to JSON and parsing it back. Outdated files are migrated through their JSON
+    dict instead.
+
+    Arguments:
+        file_path: Path to the columnar metric file.
+        journal_entries: The metric's unfolded journal entries, appended after.
+
+    Returns:
+        The HealthMetric, or None if parsing failed.
+    """
+    try:
+        with ColumnarSeries(file_path) as series:
+            if series.header.get("file_version") == FILE_VERS:
+                metric = build_metric_from_header(series.header)
+                if metric is None:
+                    return None
+
+                skipped_entries = metric.entries.extend_from_columns(
+                    series.dates,
+                    series.values,
+                    series.kinds,
+                    series.unit_ids,
+                    series.header["units"],
+                    series.header["strings"],
+                    metric.unit,
+                )
+            else:
+                metric = None
     except Exception as e:
-        # If file was outdated, this is likely the cause, though this should be refined.
-        if file_is_outdated:
-            logger.add(
-                "WARNING",
-                f"Couldn't parse, outdated file may be the cause. {e}",
-                cli_out=True,
-            )
-        else:
-            logger.add(
-                "WARNING" "Couldn't parse, file is up to date. Reason is unknown. {e}",
-                cli_out=True,
-            )
+        logger.add(
+            "WARNING",
+            f"Couldn't parse metric file `{file_path.stem}`. {e}",
+            cli_out=True,
+        )
         return None
+
+    if metric is None:
+        health_data = read_columnar_to_json(file_path)
+        health_data["data"].extend(journal_entries)
+        return load_metric_from_json(health_data)
+
+    skipped_journal_entries = metric.entries.extend_from_json(
+        journal_entries, metric.unit
+    )
+    skipped_entries += [
+        len(series) + entry_number for entry_number in skipped_journal_entries
+    ]
+    metric.recount_oor()
+
+    for entry_number in skipped_entries:
+        logger.add("WARNING", f"Skipping entry '{entry_number}' - no date found.")
     return metric
 
 
@@ -380,18 +1914,73 @@ def generate_health_metric_from_file(filepath: str) -> HealthMetric:
     Given the filepath or name of a metric file, load said metric file
     and return the generated HealthMetric object.
 
+    HealthMetric objects are cached, so repeated calls for an unchanged metric
+    return the same object.
+
     Arguments:
         filepath: String filepath or name of metric file.
 
     Returns:
         HealthMetric object, or None if parsing was not possible.
     """
+    metric_name = Path(filepath).stem
+    signature = get_metric_signature(metric_name)
+    if cached_metric := metric_cache.get_metric(metric_name, signature):
+        return cached_metric
+
+    file_path = None if using_sqlite_store() else get_metric_file_path(filepath)
+    if file_path and file_path.suffix == COLUMNAR_EXTENSION and file_path.exists():
+        metric = load_metric_from_columnar(file_path, read_journal(metric_name))
+        if metric:
+            metric_cache.put(metric_name, signature, None, metric)
+        return metric
+
     health_data = read_metric_file_to_json(metric_name=filepath)
+    if not health_data:
+        return None
+
     metric = load_metric_from_json(health_data)
+    if metric:
+        metric_cache.attach_metric(metric_name, signature, metric)
 
     return metric
 
 
+def load_metric_between(
+    metric_name: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Optional[HealthMetric]:
+    """
+    Load a metric for the measurements dated within [since, until], reading only
+    those measurements where the store allows (see `read_metric_json_between`). If
+    the whole metric is already cached it is returned instead, so callers should
+    still narrow the measurements with `between()`. Metrics loaded for a date range
+    aren't cached.
+
+    Arguments:
+        metric_name: Name of the metric.
+        since: Earliest date to include, or None for no lower bound.
+        until: Latest date to include, or None for no upper bound.
+
+    Returns:
+        HealthMetric object, or None if parsing was not possible.
+    """
+    if since is None and until is None:
+        return generate_health_metric_from_file(metric_name)
+
+    metric_name = Path(metric_name).stem
+    signature = get_metric_signature(metric_name)
+    if cached_metric := metric_cache.get_metric(metric_name, signature):
+        return cached_metric
+
+    health_data = read_metric_json_between(metric_name, since, until)
+    if not health_data:
+        return None
+
+    return load_metric_from_json(health_data)
+
+
 def parse_health_metric(metric_name: str, unit: Optional[str] = None) -> HealthMetric:
     """
     Given the name of a new metric file, prompt the user to select the type of metric,
@@ -493,7 +2082,7 @@ def parse_health_metric(metric_name: str, unit: Optional[str] = None) -> HealthM
         return None
 
     print(
-        f"\n === New metric file '{metric_name}' generated (reporting {len(get_filenames_without_extension(FILE_DIR_NAME)) + 1} metric files) === \n"
+        f"\n === New metric file '{metric_name}' generated (reporting {len(get_metric_names()) + 1} metric files) === \n"
     )
 
     # Assign default unit if provided.
@@ -0,0 +1,128 @@
+import json
+from pathlib import Path
+
+from utils.logger import logger
+from file_tools.filepaths import JOURNAL_DIR_PATH
+
+# Once a journal grows past this many bytes, it is folded back into its metric file
+# so that reads never have to merge an unbounded journal.
+JOURNAL_FOLD_BYTES = 64 * 1024
+
+
+def journal_path(metric_name: str) -> Path:
+    """
+    Returns the path to the journal file for a given metric.
+
+    Arguments:
+        metric_name: Name of the metric, with or without the .json.
+
+    Returns:
+        Path to the metric's journal file.
+    """
+    return JOURNAL_DIR_PATH / f"{Path(metric_name).stem}.jsonl"
+
+
+def append_to_journal(metric_name: str, entry: dict) -> int:
+    """
+    Append a single measurement entry to the end of a metric's journal. This is O(1)
+    regardless of how many measurements the metric file already holds.
+
+    Arguments:
+        metric_name: Name of the metric being appended to.
+        entry: The measurement entry, in the same format as the metric file "data" list.
+
+    Returns:
+        Size of the journal in bytes after the append.
+    """
+    JOURNAL_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+    with open(journal_path(metric_name), "a") as journal_file:
+        journal_file.write(json.dumps(entry) + "\n")
+        return journal_file.tell()
+
+
+def append_many_to_journal(metric_name: str, entries: list[dict]) -> int:
+    """
+    Append several measurement entries to the end of a metric's journal, with a
+    single write.
+
+    Arguments:
+        metric_name: Name of the metric being appended to.
+        entries: The measurement entries, in order.
+
+    Returns:
+        Size of the journal in bytes after the append.
+    """
+    JOURNAL_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+    with open(journal_path(metric_name), "a") as journal_file:
+        journal_file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        return journal_file.tell()
+
+
+def read_journal(metric_name: str) -> list[dict]:
+    """
+    Read all entries from a metric's journal, in the order they were appended. A
+    partially written final line (e.g. from a crash mid-append) is skipped.
+
+    Arguments:
+        metric_name: Name of the metric.
+
+    Returns:
+        List of journalled measurement entries, empty if there is no journal.
+    """
+    entries = []
+
+    try:
+        with open(journal_path(metric_name), "r") as journal_file:
+            for line_number, line in enumerate(journal_file):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.add(
+                        "WARNING",
+                        f"Skipping unreadable line {line_number} in journal for '{metric_name}'.",
+                    )
+    except FileNotFoundError:
+        pass
+
+    return entries
+
+
+def journal_size(metric_name: str) -> int:
+    """
+    Returns the size of a metric's journal in bytes, or 0 if no journal exists.
+    """
+    try:
+        return journal_path(metric_name).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def clear_journal(metric_name: str):
+    """
+    Remove a metric's journal. Should only be called once the journal has been
+    folded into the metric file.
+    """
+    journal_path(metric_name).unlink(missing_ok=True)
+
+
+def rename_journal(current_metric_name: str, new_metric_name: str):
+    """
+    Move a metric's journal so that it follows a renamed metric file.
+    """
+    old_journal = journal_path(current_metric_name)
+    if old_journal.exists():
+        old_journal.rename(journal_path(new_metric_name))
+
+
+def get_journalled_metric_names() -> list[str]:
+    """
+    Returns the names of all metrics that currently have unfolded journal entries.
+    """
+    if not JOURNAL_DIR_PATH.exists():
+        return []
+
+    return [journal.stem for journal in JOURNAL_DIR_PATH.glob("*.jsonl")]
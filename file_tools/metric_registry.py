@@ -0,0 +1,142 @@
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from utils.sequence_matcher import NameMatcher
+
+
+class MetricNameRegistry:
+    """
+    The names of every metric in the store, held in memory as a set (for membership
+    tests) and a sorted list (for listing and matching), so that checking whether a
+    name is known doesn't re-list the metric directory.
+
+    The registry is synced against the store's source: the metric file directory, or
+    the SQLite database. Names are only re-listed when the source's version changes
+    (e.g. another process created a metric). Metrics created or renamed by this
+    process are applied to the registry directly, so it stays correct even on
+    filesystems whose modification times are too coarse to notice them, and the
+    process's own writes are made within `own_write()`, so they don't cause a
+    re-list.
+
+    Closest matches are found with a NameMatcher index, built on first use and kept
+    up to date as names change.
+    """
+
+    def __init__(self):
+        self._names: set[str] = set()
+        self._sorted_names: list[str] = []
+        self._source_path: Optional[Path] = None
+        self._source_version: Optional[int] = None
+        self._matcher: Optional[NameMatcher] = None
+
+    def sync(
+        self, source_path: Path, source_version: Optional[int], list_names: callable
+    ):
+        """
+        Re-list the metric names if the source has changed since it was last listed.
+
+        Arguments:
+            source_path: The metric file directory, or the SQLite database.
+            source_version: Changes whenever a metric is created, removed or renamed:
+                the directory's modification time (see `modification_time()`), or the
+                database's data_version. None if the source doesn't exist.
+            list_names: Callable returning the names of every metric in the source.
+        """
+        if source_path == self._source_path and source_version == self._source_version:
+            return
+
+        # The version is taken before listing, so a change made while listing is
+        # picked up by the next sync.
+        names = set(list_names()) if source_version is not None else set()
+        if self._matcher is not None:
+            for removed_name in self._names - names:
+                self._matcher.remove(removed_name)
+            for added_name in names - self._names:
+                self._matcher.add(added_name)
+
+        self._names = names
+        self._sorted_names = sorted(names)
+        self._source_path, self._source_version = source_path, source_version
+
+    @contextmanager
+    def own_write(self, source_path: Path):
+        """
+        Context manager for a write by this process to the metric file directory. An
+        atomic write (a temporary file, then `os.replace`) changes the directory's
+        modification time without changing its names, so if the registry was in sync
+        before the write, it is kept in sync after it, rather than re-listing. Any
+        names the write changes must be applied with `add()`, `remove()` or
+        `rename()`.
+
+        A change made by another process during the write is only noticed once the
+        directory changes again.
+        """
+        version_before = modification_time(source_path)
+        yield
+        if (
+            source_path == self._source_path
+            and version_before is not None
+            and version_before == self._source_version
+        ):
+            self._source_version = modification_time(source_path)
+
+    def names(self) -> list[str]:
+        """
+        Returns every metric name, sorted.
+        """
+        return list(self._sorted_names)
+
+    def closest_matches(
+        self, metric_name: str, number_of_results: int = 1
+    ) -> list[str]:
+        """
+        Returns the `number_of_results` metric names closest to `metric_name`, best
+        first.
+        """
+        if self._matcher is None:
+            self._matcher = NameMatcher(self._sorted_names)
+
+        return self._matcher.closest_matches(metric_name, number_of_results)
+
+    def add(self, metric_name: str):
+        if metric_name not in self._names:
+            self._names.add(metric_name)
+            insort(self._sorted_names, metric_name)
+            if self._matcher is not None:
+                self._matcher.add(metric_name)
+
+    def remove(self, metric_name: str):
+        if metric_name in self._names:
+            self._names.remove(metric_name)
+            del self._sorted_names[bisect_left(self._sorted_names, metric_name)]
+            if self._matcher is not None:
+                self._matcher.remove(metric_name)
+
+    def rename(self, current_metric_name: str, new_metric_name: str):
+        self.remove(current_metric_name)
+        self.add(new_metric_name)
+
+    def __contains__(self, metric_name: str) -> bool:
+        return metric_name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sorted_names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+def modification_time(path: Path) -> Optional[int]:
+    """
+    Returns the modification time of a path in nanoseconds, or None if it doesn't
+    exist.
+    """
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+metric_registry = MetricNameRegistry()
@@ -0,0 +1,104 @@
+import ast
+
+from file_tools.filepaths import FILE_VERS
+
+"""
+Upgrade steps for metric files written by older versions of vitals, following the
+history in txt_files/health_file_update_log.txt. Each step upgrades a metric file
+JSON dict from one version to the next, in place. Versions before 4 predate the
+current layout, so can't be migrated.
+"""
+
+# Upgrade steps, by the version they upgrade from.
+MIGRATION_STEPS: dict[int, callable] = {}
+
+
+def migration_step(from_version: int) -> callable:
+    """
+    Register a function as the upgrade step from `from_version` to the next version.
+    """
+
+    def register(step: callable) -> callable:
+        MIGRATION_STEPS[from_version] = step
+        return step
+
+    return register
+
+
+@migration_step(4)
+def _support_boolean_and_metric_types(health_data: dict):
+    # Version 5 added new metric types, without changing the layout.
+    pass
+
+
+@migration_step(5)
+def _parse_metric_guide(health_data: dict):
+    # Version 6 stores the metric guide as its actual datatype, not a string.
+    metric_guide = health_data.get("metric_guide")
+    if isinstance(metric_guide, str):
+        try:
+            metric_guide = ast.literal_eval(metric_guide)
+        except (ValueError, SyntaxError):
+            # Not a literal, e.g. "Generic Metric".
+            pass
+
+    if isinstance(metric_guide, tuple):
+        metric_guide = list(metric_guide)
+    health_data["metric_guide"] = metric_guide
+
+
+@migration_step(6)
+def _rename_date_keys(health_data: dict):
+    # Version 7 removed "metric" from "metric_date" and "metric_time".
+    for entry in health_data.get("data", []):
+        if "metric_date" in entry:
+            entry["date"] = entry.pop("metric_date")
+        if "metric_time" in entry:
+            entry["time"] = entry.pop("metric_time")
+
+
+@migration_step(7)
+def _add_unit(health_data: dict):
+    # Version 8 added a file level unit.
+    health_data.setdefault("unit", None)
+
+
+@migration_step(8)
+def _support_inequality_values(health_data: dict):
+    # Version 9 allows inequality values, without changing the layout.
+    pass
+
+
+def migrate_health_data(health_data: dict) -> list[int]:
+    """
+    Upgrade a metric file JSON dict to the current file version, in place.
+
+    Arguments:
+        health_data: JSON dict of a metric file.
+
+    Returns:
+        The versions that were upgraded from, in order. Empty if already current.
+
+    Raises:
+        ValueError: If the file's version can't be upgraded.
+    """
+    file_version = health_data.get("file_version")
+    if not isinstance(file_version, int):
+        raise ValueError(f"file version '{file_version}' is not recognised")
+    if file_version > FILE_VERS:
+        raise ValueError(
+            f"file version {file_version} is newer than the operating version {FILE_VERS}"
+        )
+
+    applied_steps = []
+    while file_version < FILE_VERS:
+        step = MIGRATION_STEPS.get(file_version)
+        if step is None:
+            raise ValueError(f"no migration from file version {file_version}")
+
+        step(health_data)
+        applied_steps.append(file_version)
+        file_version += 1
+        health_data["file_version"] = file_version
+
+    return applied_steps
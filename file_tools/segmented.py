@@ -0,0 +1,352 @@
+import json
+import shutil
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from file_tools.archive import ARCHIVE_EXTENSION, encode_archive, is_cold, read_archive
+from file_tools.date_codec import encode_date
+from file_tools.file_locks import atomic_write_bytes
+from file_tools.filepaths import SEGMENT_DIR_PATH
+
+"""
+Segmented metric file layout (".segments"):
+
+    metric_files/<name>.segments        Manifest: the metric file header, plus a
+                                        summary of each segment.
+    segment_files/<name>/<year>.json    Each segment: a JSON list of the year's
+                                        measurement entries.
+    segment_files/<name>/undated.json   Entries without a date, if any.
+    segment_files/<name>/<year>.varc    A cold segment, compressed (see archive.py).
+
+Measurements are split into one segment per calendar year. Segments for past years
+are effectively immutable, as new measurements almost always land in the latest
+(active) segment, so an append only rewrites that segment and the manifest.
+Range reads use the manifest's per-segment date bounds to open only the segments
+that overlap the range.
+
+Each segment's summary records a checksum of its contents, so rewriting a whole
+metric skips segments that haven't changed. Every file is replaced atomically (see
+file_locks.py), with the manifest written last, so a reader never sees
+a manifest describing a segment that isn't there.
+
+Cold segments (never the active one) can be archived, after which the manifest marks
+them with the codec used. Archived segments are decompressed as they're read, and
+written back uncompressed if they're ever appended to.
+"""
+
+SEGMENTED_EXTENSION = ".segments"
+UNDATED_SEGMENT = "undated"
+
+
+def segment_dir(manifest_path: Path) -> Path:
+    """
+    Returns the directory holding the segments of the metric with this manifest.
+    """
+    return SEGMENT_DIR_PATH / manifest_path.stem
+
+
+def _segment_path(directory: Path, key: str, archived: bool = False) -> Path:
+    return directory / f"{key}{ARCHIVE_EXTENSION if archived else '.json'}"
+
+
+def _segment_key(entry: dict) -> str:
+    date = entry.get("date")
+    return date[:4] if date else UNDATED_SEGMENT
+
+
+def _read_manifest(manifest_path: Path) -> dict:
+    with open(manifest_path, "r") as manifest_file:
+        return json.load(manifest_file)
+
+
+def read_segmented_header(manifest_path: Path) -> dict:
+    """
+    Returns the metric file header of a segmented metric (everything except "data"),
+    without opening any segments.
+    """
+    header = _read_manifest(manifest_path)
+    header.pop("segments")
+    return header
+
+
+def _write_segment(directory: Path, key: str, entries: list[dict]) -> dict:
+    """
+    Write a segment uncompressed, and return its summary for the manifest.
+    """
+    content = json.dumps(entries, indent=4).encode()
+    atomic_write_bytes(_segment_path(directory, key), content)
+    return _segment_summary(key, entries, zlib.crc32(content))
+
+
+def _read_segment(directory: Path, segment: dict) -> list[dict]:
+    if segment.get("archived"):
+        return read_archive(_segment_path(directory, segment["key"], archived=True))
+
+    with open(_segment_path(directory, segment["key"]), "r") as segment_file:
+        return json.load(segment_file)
+
+
+def _remove_segment_files(directory: Path, key: str):
+    _segment_path(directory, key).unlink(missing_ok=True)
+    _segment_path(directory, key, archived=True).unlink(missing_ok=True)
+
+
+def _segment_summary(key: str, entries: list[dict], checksum: int) -> dict:
+    dates = [entry["date"] for entry in entries if entry.get("date")]
+    return {
+        "key": key,
+        "entry_count": len(entries),
+        "first_date": min(dates, default=None),
+        "last_date": max(dates, default=None),
+        "checksum": checksum,
+    }
+
+
+def _write_manifest(manifest_path: Path, header: dict, segments: dict[str, dict]):
+    manifest = dict(header)
+    manifest["segments"] = [segments[key] for key in sorted(segments)]
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(manifest_path, json.dumps(manifest, indent=4).encode())
+
+
+def write_segmented(manifest_path: Path, health_data: dict) -> int:
+    """
+    Write a metric file JSON dict in the segmented layout, replacing whatever was
+    there. Segments whose contents haven't changed are left untouched, and segments
+    that no longer have any entries are removed.
+
+    Arguments:
+        manifest_path: Path to the metric's manifest.
+        health_data: JSON dict of a metric file.
+
+    Returns:
+        Number of segments written.
+    """
+    try:
+        previous_segments = {
+            segment["key"]: segment
+            for segment in _read_manifest(manifest_path)["segments"]
+        }
+    except FileNotFoundError:
+        previous_segments = {}
+
+    grouped_entries: dict[str, list[dict]] = {}
+    for entry in health_data.get("data", []):
+        grouped_entries.setdefault(_segment_key(entry), []).append(entry)
+
+    directory = segment_dir(manifest_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    segments, written_count = {}, 0
+
+    for key, entries in grouped_entries.items():
+        content = json.dumps(entries, indent=4).encode()
+        checksum = zlib.crc32(content)
+        previous_segment = previous_segments.get(key)
+        if (
+            previous_segment
+            and previous_segment["checksum"] == checksum
+            and _segment_path(
+                directory, key, archived=bool(previous_segment.get("archived"))
+            ).exists()
+        ):
+            # Unchanged, so left as it is (archived or not).
+            segments[key] = previous_segment
+            continue
+
+        atomic_write_bytes(_segment_path(directory, key), content)
+        written_count += 1
+        segments[key] = _segment_summary(key, entries, checksum)
+
+    header = {key: value for key, value in health_data.items() if key != "data"}
+    _write_manifest(manifest_path, header, segments)
+
+    # Tidy up segments that are now empty, or no longer archived.
+    for key, previous_segment in previous_segments.items():
+        if key not in segments:
+            _remove_segment_files(directory, key)
+        elif previous_segment.get("archived") and not segments[key].get("archived"):
+            _segment_path(directory, key, archived=True).unlink(missing_ok=True)
+
+    return written_count
+
+
+def append_segmented(manifest_path: Path, new_entries: list[dict]) -> int:
+    """
+    Append measurement entries to a segmented metric. Only the segments the entries
+    fall in (usually just the active one) are read and rewritten; all other segments
+    are left untouched.
+
+    Arguments:
+        manifest_path: Path to the metric's manifest.
+        new_entries: Entries to append, in order.
+
+    Returns:
+        Number of segments written.
+    """
+    manifest = _read_manifest(manifest_path)
+    segments = {segment["key"]: segment for segment in manifest.pop("segments")}
+    directory = segment_dir(manifest_path)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    grouped_entries: dict[str, list[dict]] = {}
+    for entry in new_entries:
+        grouped_entries.setdefault(_segment_key(entry), []).append(entry)
+
+    previously_archived = []
+    for key, entries in grouped_entries.items():
+        if key in segments:
+            entries = _read_segment(directory, segments[key]) + entries
+            if segments[key].get("archived"):
+                previously_archived.append(key)
+        segments[key] = _write_segment(directory, key, entries)
+
+    _write_manifest(manifest_path, manifest, segments)
+    for key in previously_archived:
+        _segment_path(directory, key, archived=True).unlink(missing_ok=True)
+
+    return len(grouped_entries)
+
+
+def _overlaps(
+    segment: dict, since_str: Optional[str], until_str: Optional[str]
+) -> bool:
+    if segment["first_date"] is None:
+        # Undated entries are never in a date range.
+        return since_str is None and until_str is None
+
+    return (since_str is None or segment["last_date"] >= since_str) and (
+        until_str is None or segment["first_date"] <= until_str
+    )
+
+
+def read_segmented_to_json(
+    manifest_path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    """
+    Read a segmented metric into a metric file JSON dict. If `since` or `until` are
+    given, only segments overlapping [since, until] are opened, so "data" may also
+    hold entries just outside the range for the caller to filter.
+
+    Arguments:
+        manifest_path: Path to the metric's manifest.
+        since: Earliest date needed, or None for no lower bound.
+        until: Latest date needed, or None for no upper bound.
+
+    Returns:
+        JSON dict of the metric, in the same form as a JSON metric file.
+    """
+    health_data = _read_manifest(manifest_path)
+    segments = health_data.pop("segments")
+    since_str = encode_date(since) if since else None
+    until_str = encode_date(until) if until else None
+
+    directory = segment_dir(manifest_path)
+    health_data["data"] = []
+    for segment in segments:
+        if _overlaps(segment, since_str, until_str):
+            health_data["data"].extend(_read_segment(directory, segment))
+
+    return health_data
+
+
+def remove_segmented(manifest_path: Path):
+    """
+    Remove a segmented metric: its manifest, then its segments.
+    """
+    manifest_path.unlink(missing_ok=True)
+    shutil.rmtree(segment_dir(manifest_path), ignore_errors=True)
+
+
+def rename_segmented(manifest_path: Path, new_manifest_path: Path):
+    """
+    Move a segmented metric's manifest and segments to a new name. The metric name
+    within the manifest is left for the caller to update.
+    """
+    if segment_dir(manifest_path).exists():
+        segment_dir(manifest_path).rename(segment_dir(new_manifest_path))
+    manifest_path.rename(new_manifest_path)
+
+
+def archive_segments(
+    manifest_path: Path,
+    codec: str,
+    after_days: Optional[float],
+    over_bytes: Optional[int],
+    dry_run: bool = False,
+) -> list[dict]:
+    """
+    Compress the cold segments of a segmented metric. The active (latest) segment
+    is never archived, as it's the one appends are written to.
+
+    Arguments:
+        manifest_path: Path to the metric's manifest.
+        codec: Name of the compression codec, one of ARCHIVE_CODECS.
+        after_days: Days since a segment was written after which it's cold.
+        over_bytes: Size in bytes from which a segment is cold.
+        dry_run: If true, only work out what archiving would save.
+
+    Returns:
+        A dict for each archived segment, with its key and size before and after.
+    """
+    manifest = _read_manifest(manifest_path)
+    segments = {segment["key"]: segment for segment in manifest.pop("segments")}
+    directory = segment_dir(manifest_path)
+    dated_keys = [key for key in segments if key != UNDATED_SEGMENT]
+    active_key = max(dated_keys, default=None)
+    archived = []
+
+    for key, segment in segments.items():
+        segment_path = _segment_path(directory, key)
+        if (
+            key == active_key
+            or segment.get("archived")
+            or not is_cold(segment_path, after_days, over_bytes)
+        ):
+            continue
+
+        content = encode_archive(_read_segment(directory, segment), codec)
+        archived.append(
+            {
+                "key": key,
+                "bytes_before": segment_path.stat().st_size,
+                "bytes_after": len(content),
+            }
+        )
+        if not dry_run:
+            atomic_write_bytes(_segment_path(directory, key, archived=True), content)
+            segment["archived"] = codec
+
+    if archived and not dry_run:
+        _write_manifest(manifest_path, manifest, segments)
+        for segment in archived:
+            _segment_path(directory, segment["key"]).unlink(missing_ok=True)
+
+    return archived
+
+
+def restore_segments(manifest_path: Path) -> int:
+    """
+    Decompress every archived segment of a segmented metric.
+
+    Returns:
+        Number of segments restored.
+    """
+    manifest = _read_manifest(manifest_path)
+    segments = {segment["key"]: segment for segment in manifest.pop("segments")}
+    directory = segment_dir(manifest_path)
+    restored_keys = [key for key, segment in segments.items() if segment.get("archived")]
+
+    for key in restored_keys:
+        entries = _read_segment(directory, segments[key])
+        segments[key] = _write_segment(directory, key, entries)
+
+    if restored_keys:
+        _write_manifest(manifest_path, manifest, segments)
+        for key in restored_keys:
+            _segment_path(directory, key, archived=True).unlink(missing_ok=True)
+
+    return len(restored_keys)
@@ -0,0 +1,274 @@
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from file_tools.date_codec import encode_date
+from file_tools.filepaths import MEM_FILE_PATH
+
+SQLITE_STORE_PATH = MEM_FILE_PATH / "metric_store.sqlite3"
+
+_schema = """
+CREATE TABLE IF NOT EXISTS metrics (
+    metric_name TEXT PRIMARY KEY,
+    header TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    data_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    metric_name TEXT NOT NULL,
+    date TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS measurements_metric_date
+    ON measurements (metric_name, date);
+"""
+
+
+class SQLiteMetricStore:
+    """
+    Stores every metric in a single SQLite database, as an alternative to one JSON file
+    per metric. Each metric's header (everything except "data") is kept as JSON in the
+    `metrics` table, and each measurement is a row in `measurements`, indexed on
+    (metric_name, date). Measurements are returned in the order they were added, so a
+    metric read from here is identical to the metric file it was imported from.
+
+    Every write to a metric gives it a new `revision`, from a counter shared by all
+    metrics, and updates the size of its measurements in `data_bytes`, so that a
+    metric's signature is a primary key lookup, and only changes with that metric.
+    """
+
+    def __init__(self, db_path: Path = SQLITE_STORE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.executescript(_schema)
+        self._add_signature_columns()
+
+    def _add_signature_columns(self):
+        """
+        Add the revision and data_bytes columns to a database created before they
+        existed, sizing the measurements already stored.
+        """
+        columns = self.connection.execute("PRAGMA table_info(metrics)").fetchall()
+        if "revision" in [column[1] for column in columns]:
+            return
+
+        with self.connection:
+            self.connection.execute(
+                "ALTER TABLE metrics ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"
+            )
+            self.connection.execute(
+                "ALTER TABLE metrics ADD COLUMN data_bytes INTEGER NOT NULL DEFAULT 0"
+            )
+            self.connection.execute(
+                "UPDATE metrics SET data_bytes = (SELECT total(length(entry)) "
+                "FROM measurements "
+                "WHERE measurements.metric_name = metrics.metric_name)"
+            )
+
+    def _bump_revision(self, metric_name: str, added_bytes: int):
+        """
+        Give a metric the next revision, and add to the size of its measurements.
+        Called within the write's transaction.
+        """
+        self.connection.execute(
+            "UPDATE metrics SET revision = (SELECT max(revision) + 1 FROM metrics), "
+            "data_bytes = data_bytes + ? WHERE metric_name = ?",
+            (added_bytes, metric_name),
+        )
+
+    def exists(self, metric_name: str) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM metrics WHERE metric_name = ?", (metric_name,)
+        ).fetchone()
+        return row is not None
+
+    def data_version(self) -> int:
+        """
+        Returns the database's data_version, which changes whenever another
+        connection commits a change, but not for this connection's own commits.
+        """
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def list_names(self) -> list[str]:
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT metric_name FROM metrics ORDER BY metric_name"
+            )
+        ]
+
+    def read_header(self, metric_name: str) -> Optional[dict]:
+        """
+        Returns a metric's header (its metric file without "data"), or None if it
+        isn't stored.
+        """
+        row = self.connection.execute(
+            "SELECT header FROM metrics WHERE metric_name = ?", (metric_name,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def signature(self, metric_name: str) -> Optional[list]:
+        """
+        Returns a signature of a metric's stored data, in the same form as a metric
+        file's (see `get_metric_signature`): the store's file extension, the metric's
+        revision, the size of its measurements, and the size of its header. Or None
+        if the metric isn't stored.
+        """
+        row = self.connection.execute(
+            "SELECT revision, data_bytes, length(header) FROM metrics "
+            "WHERE metric_name = ?",
+            (metric_name,),
+        ).fetchone()
+        return [self.db_path.suffix, *row] if row else None
+
+    def read_json(self, metric_name: str) -> Optional[dict]:
+        """
+        Returns the metric file JSON dict for a metric, or None if it isn't stored.
+        """
+        health_data = self.read_header(metric_name)
+        if health_data is None:
+            return None
+
+        health_data["data"] = [
+            json.loads(entry)
+            for (entry,) in self.connection.execute(
+                "SELECT entry FROM measurements WHERE metric_name = ? ORDER BY seq",
+                (metric_name,),
+            )
+        ]
+        return health_data
+
+    def read_entries_between(
+        self,
+        metric_name: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> list[dict]:
+        """
+        Returns a metric's measurement entries dated within [since, until], using the
+        (metric_name, date) index. Either bound may be omitted.
+        """
+        return list(self.iter_entries_between(metric_name, since, until))
+
+    def iter_entries_between(
+        self,
+        metric_name: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[dict]:
+        """
+        Generator form of `read_entries_between()`, which yields entries as they are
+        fetched rather than loading them all.
+        """
+        query = "SELECT entry FROM measurements WHERE metric_name = ?"
+        parameters = [metric_name]
+
+        if since:
+            query += " AND date >= ?"
+            parameters.append(encode_date(since))
+        if until:
+            query += " AND date <= ?"
+            parameters.append(encode_date(until))
+
+        for (entry,) in self.connection.execute(query + " ORDER BY date", parameters):
+            yield json.loads(entry)
+
+    def write_json(self, metric_name: str, health_data: dict):
+        """
+        Replace everything stored for a metric with the given metric file JSON dict.
+        """
+        header = {key: value for key, value in health_data.items() if key != "data"}
+        rows = [
+            (metric_name, entry.get("date"), json.dumps(entry))
+            for entry in health_data.get("data", [])
+        ]
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO metrics (metric_name, header) VALUES (?, ?)",
+                (metric_name, json.dumps(header)),
+            )
+            self.connection.execute(
+                "DELETE FROM measurements WHERE metric_name = ?", (metric_name,)
+            )
+            self.connection.executemany(
+                "INSERT INTO measurements (metric_name, date, entry) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._bump_revision(metric_name, sum(len(row[2]) for row in rows))
+
+    def append(self, metric_name: str, entry: dict) -> tuple[list, list]:
+        """
+        Append a single measurement entry to a metric.
+
+        Returns:
+            The metric's signatures from just before and just after the append.
+        """
+        return self.append_many(metric_name, [entry])
+
+    def append_many(self, metric_name: str, entries: list[dict]) -> tuple[list, list]:
+        """
+        Append several measurement entries to a metric, in a single transaction.
+        The transaction takes the write lock before reading the metric's signature,
+        so no other connection's write can land between that read and the insert.
+
+        Returns:
+            The metric's signatures from just before and just after the append.
+        """
+        rows = [
+            (metric_name, entry.get("date"), json.dumps(entry)) for entry in entries
+        ]
+
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            previous_signature = self.signature(metric_name)
+            self.connection.executemany(
+                "INSERT INTO measurements (metric_name, date, entry) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._bump_revision(metric_name, sum(len(row[2]) for row in rows))
+            new_signature = self.signature(metric_name)
+        return previous_signature, new_signature
+
+    def rename(self, current_metric_name: str, new_metric_name: str) -> bool:
+        """
+        Rename a metric, including the metric_name recorded in its header.
+
+        Returns:
+            Bool indicating whether the metric existed to be renamed.
+        """
+        header = self.read_header(current_metric_name)
+        if header is None:
+            return False
+
+        header["metric_name"] = new_metric_name
+
+        with self.connection:
+            self.connection.execute(
+                "UPDATE metrics SET metric_name = ?, header = ? WHERE metric_name = ?",
+                (new_metric_name, json.dumps(header), current_metric_name),
+            )
+            self.connection.execute(
+                "UPDATE measurements SET metric_name = ? WHERE metric_name = ?",
+                (new_metric_name, current_metric_name),
+            )
+            self._bump_revision(new_metric_name, 0)
+        return True
+
+
+_store: SQLiteMetricStore = None
+
+
+def get_sqlite_store() -> SQLiteMetricStore:
+    """
+    Returns the process-wide SQLiteMetricStore, opening the database on first use.
+    """
+    global _store
+
+    if _store is None:
+        _store = SQLiteMetricStore()
+    return _store
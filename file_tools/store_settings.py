@@ -0,0 +1,76 @@
+import json
+from typing import Any
+
+from file_tools.filepaths import MEM_FILE_PATH
+from utils.logger import logger
+
+STORE_SETTINGS_PATH = MEM_FILE_PATH / "store_settings.json"
+
+# Settings used when the store has no settings file, or the file omits a key.
+DEFAULT_STORE_SETTINGS: dict[str, Any] = {
+    "format": "json",
+    "json_indent": 4,
+    "backend": "files",
+    "cache_budget_bytes": 32 * 1024 * 1024,
+    "load_workers": None,
+    "load_with_processes": False,
+    "write_session_max_pending": 50,
+    "write_session_max_age_seconds": 300,
+    "archive_codec": "lzma",
+    "archive_after_days": 365,
+    "archive_over_bytes": None,
+    "lock_timeout_seconds": 10,
+    "typo_alias_capacity": 500,
+}
+
+_loaded_settings: dict[str, Any] = None
+
+
+def load_store_settings() -> dict[str, Any]:
+    """
+    Returns the settings for the metric store, reading the settings file on first use.
+
+    Returns:
+        Dict of store settings, with defaults applied for any missing keys.
+    """
+    global _loaded_settings
+
+    if _loaded_settings is None:
+        _loaded_settings = dict(DEFAULT_STORE_SETTINGS)
+        try:
+            _loaded_settings |= json.loads(STORE_SETTINGS_PATH.read_text())
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError as e:
+            logger.add("WARNING", f"Store settings unreadable, using defaults: {e}")
+
+    return _loaded_settings
+
+
+def get_store_setting(key: str) -> Any:
+    """
+    Returns a single store setting.
+
+    Arguments:
+        key: Name of the setting.
+
+    Returns:
+        The setting's value, or its default if not set.
+    """
+    return load_store_settings().get(key, DEFAULT_STORE_SETTINGS.get(key))
+
+
+def set_store_setting(key: str, value: Any):
+    """
+    Update a single store setting and persist the settings file.
+
+    Arguments:
+        key: Name of the setting.
+        value: New value for the setting. Must be JSON serialisable.
+    """
+    settings = load_store_settings()
+    settings[key] = value
+
+    MEM_FILE_PATH.mkdir(parents=True, exist_ok=True)
+    STORE_SETTINGS_PATH.write_text(json.dumps(settings, indent=4))
+    logger.add("action", f"Store setting '{key}' set to '{value}'.")
@@ -0,0 +1,110 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from file_tools.file_locks import atomic_write_bytes
+from file_tools.filepaths import MEM_FILE_PATH
+from file_tools.store_settings import get_store_setting
+from utils.logger import logger
+
+TYPO_ALIASES_PATH = MEM_FILE_PATH / "typo_aliases.json"
+TYPO_ALIASES_VERSION = 1
+
+
+class TypoAliasMemory:
+    """
+    A persisted map of misspelt metric names to the metric they were resolved to
+    during data entry, so a misspelling typed again is resolved with a dict lookup
+    rather than fuzzy matching.
+
+    Each alias counts how many times it has been resolved, as a measure of confidence,
+    and records when it was last used. Aliases are kept in least recently used order,
+    and the least recently used are evicted once there are more than the
+    "typo_alias_capacity" store setting. Aliases pointing at a metric that has been
+    renamed are forgotten.
+
+    The alias file is only read when first needed.
+    """
+
+    def __init__(self, aliases_path: Path = TYPO_ALIASES_PATH):
+        self.aliases_path = aliases_path
+        self._aliases: dict[str, dict] = None
+
+    @property
+    def aliases(self) -> dict[str, dict]:
+        if self._aliases is None:
+            self._aliases = {}
+            try:
+                aliases_json = json.loads(self.aliases_path.read_text())
+                if aliases_json.get("version") == TYPO_ALIASES_VERSION:
+                    self._aliases = aliases_json["aliases"]
+            except FileNotFoundError:
+                pass
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.add("WARNING", f"Typo aliases unreadable, starting afresh: {e}")
+
+        return self._aliases
+
+    def get(self, typed_name: str) -> Optional[dict]:
+        """
+        Returns the alias for a misspelt name, with its "metric_name" and "count", or
+        None if it hasn't been resolved before.
+        """
+        return self.aliases.get(typed_name)
+
+    def record(self, typed_name: str, metric_name: str):
+        """
+        Record that a misspelt name was resolved to a metric. Resolving it to the
+        same metric again raises its count, while resolving it to a different metric
+        starts the count afresh.
+        """
+        alias = self.aliases.pop(typed_name, None)
+        if alias is None or alias["metric_name"] != metric_name:
+            alias = {"metric_name": metric_name, "count": 0}
+
+        alias["count"] += 1
+        alias["last_used"] = datetime.now().isoformat(timespec="seconds")
+
+        # Re-inserted, so the dict stays in least recently used order.
+        self.aliases[typed_name] = alias
+        while len(self.aliases) > get_store_setting("typo_alias_capacity"):
+            del self.aliases[next(iter(self.aliases))]
+
+        self.save()
+
+    def forget(self, typed_name: str):
+        if self.aliases.pop(typed_name, None) is not None:
+            self.save()
+
+    def forget_metric(self, metric_name: str) -> int:
+        """
+        Forget every alias resolving to a metric, e.g. when it is renamed.
+
+        Returns:
+            Number of aliases forgotten.
+        """
+        stale_names = [
+            typed_name
+            for typed_name, alias in self.aliases.items()
+            if alias["metric_name"] == metric_name
+        ]
+        for typed_name in stale_names:
+            del self.aliases[typed_name]
+
+        if stale_names:
+            self.save()
+        return len(stale_names)
+
+    def save(self):
+        aliases_json = {"version": TYPO_ALIASES_VERSION, "aliases": self.aliases}
+        try:
+            self.aliases_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(
+                self.aliases_path, json.dumps(aliases_json, indent=4).encode()
+            )
+        except IOError as e:
+            logger.add("ERROR", f"Failed to write typo aliases: {e}")
+
+
+typo_aliases = TypoAliasMemory()
@@ -14,17 +14,3 @@ def create_metric_dir():
 
     FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
     return True
-
-def is_inequality_value_str(input_str: str) -> bool:
-    """
-    Test whether input string is a candidate for representing an "InequalityValue".
-
-    Arguments:
-        input_str: The string, representing a value, to be tested.
-
-    Returns:
-        Bool indicating whether value looks like an inequality value, or not.
-    """
-    if "<" in str(input_str) or ">" in str(input_str):
-        return True
-    return False
@@ -1,51 +1,55 @@
 import json
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from classes import GroupManager, MetricGroup
 
-from file_tools.filepaths import FILE_DIR_NAME, get_filenames_without_extension
+from file_tools.filepaths import MEM_FILE_NAME
 from file_tools.metric_file_parsing import (
-    MEM_FILE_NAME,
-    load_metric_from_json,
-    read_metric_file_to_json,
+    get_metric_registry,
+    load_metric_between,
+    metric_exists,
 )
 from utils.logger import logger
-from utils.sequence_matcher import get_closest_match
-from utils.utils import attempt_ingest_from_name, flatten_list
 
 
-def source_metric(metric_input: list[str]) -> MetricGroup:
+def source_metric(
+    metric_input: list[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> MetricGroup:
     """
     Helper function, that will attempt to ingest a health metric from file and return as a HealthMetric object.
     If no name is provided, it will prompt the user, using the prompt_verb if provided.
     If unable to load, will return None.
+    Given a date range, metrics are loaded for just that range where the store
+    allows (see `load_metric_between`), so use `between()` on what's returned.
     """
     found_groups = []
 
     for target_name in metric_input:
-        # Build health metric object from requested file.
-        health_file = read_metric_file_to_json(metric_input)
+        # Build health metric object from requested file (or the metric cache).
+        ingested_metric = (
+            load_metric_between(target_name, since, until)
+            if metric_exists(target_name)
+            else None
+        )
 
         # Name not found as individual metric.
-        if not health_file:
+        if not ingested_metric:
             # Look for group.
+            group_manager = get_group_manager()
             if group_manager.check_if_registered(name=target_name, log_if_found=True):
                 metric_group = group_manager.get_group(target_name)
                 found_groups.append(metric_group)
                 continue
 
-        if not health_file:
             # No group was found ether, find closest match.
-            target_name = metric_input[0]
-            health_file = read_metric_file_to_json(
-                get_closest_match(
-                    target_name, get_filenames_without_extension(FILE_DIR_NAME)
-                )
-            )
+            if closest_names := get_metric_registry().closest_matches(target_name):
+                ingested_metric = load_metric_between(closest_names[0], since, until)
 
         # Build metric object and return.
-        if health_file:
-            ingested_metric = load_metric_from_json(health_file)
+        if ingested_metric:
             metric_group = MetricGroup(
                 unit=ingested_metric.unit,
                 initial_metrics=[ingested_metric],
@@ -54,7 +58,7 @@ def source_metric(metric_input: list[str]) -> MetricGroup:
             found_groups.append(metric_group)
         else:
             # Could not match closest. This shouldn't be possible.
-            logger.add("Error", f"All attempts at reading {health_file} failed.")
+            logger.add("Error", f"All attempts at reading {target_name} failed.")
 
     # Check that any groups were found.
     if len(found_groups) == 0:
@@ -70,6 +74,23 @@ def source_metric(metric_input: list[str]) -> MetricGroup:
     return main_group
 
 
+def resolve_metric_name(metric_name: str) -> str:
+    """
+    Returns the name of the stored metric closest to `metric_name`, without loading
+    it. Names of stored metrics are returned as they are.
+    """
+    if metric_exists(metric_name):
+        return metric_name
+
+    if closest_names := get_metric_registry().closest_matches(metric_name):
+        logger.add(
+            "INFO", f"{metric_name} could not be found, matched to {closest_names[0]}."
+        )
+        return closest_names[0]
+
+    return metric_name
+
+
 def read_group_manager_file_to_json(source_path: str) -> dict:
     """
     Returns JSON object representing the alias file
@@ -97,7 +118,9 @@ def load_group_manager_from_json(
 ) -> GroupManager:
     """
     Given a JSON dictionary representing a group manager save file, and a
-    metric sourcer function, return a GroupManager object.
+    metric sourcer function, return a GroupManager object. Groups only record the
+    names of their metrics here, and load them with the metric sourcer when they're
+    first used, so loading doesn't read any metric files.
 
     If the metric sourcer, or any other part of the loading process fails,
     this function returns an empty GroupManager.
@@ -115,15 +138,12 @@ def load_group_manager_from_json(
     if gm_json:
         for group_name, group in gm_json.get("group_record").items():
             # Generate MetricGroup from input.
-            new_group = MetricGroup(unit=group.get("unit", None), group_name=group_name)
-            new_group.add_metrics(
-                flatten_list(
-                    input_list=[
-                        metric_sourcer(metric_input=input_metric_name).as_list()
-                        for input_metric_name in group.get("metric_dict")
-                    ]
-                )
+            new_group = MetricGroup(
+                unit=group.get("unit", None),
+                group_name=group_name,
+                metric_sourcer=metric_sourcer,
             )
+            new_group.add_metric_names(group.get("metric_dict"))
 
             # Register this group with the GroupManager.
             new_manager.register_group(group_name, new_group)
@@ -151,15 +171,15 @@ def remember(arguments: list[str]):
     target_metrics, group_name = arguments[:separator_index], arguments[-1]
 
     # Initialise group.
-    new_group = MetricGroup()
+    new_group = MetricGroup(group_name=group_name, metric_sourcer=source_metric)
 
-    # Register metrics with new group.
-    new_group.add_metrics(
-        new_metrics=attempt_ingest_from_name(metric_input=target_metrics)
+    # Register metrics with new group by name, so they're only loaded once used.
+    new_group.add_metric_names(
+        [resolve_metric_name(metric_name) for metric_name in target_metrics]
     )
 
     # Register group with Group Manager.
-    group_manager.register_group(group_name=group_name, group=new_group)
+    get_group_manager().register_group(group_name=group_name, group=new_group)
     logger.add(
         "action",
         f"Registered group '{group_name}' containing '{new_group.count}' Metrics with GroupManager.",
@@ -176,6 +196,7 @@ def forget(arguments: list[str]):
         arguments: List of strings representing names to be forgotton.
 
     """
+    group_manager = get_group_manager()
     for name in arguments:
         # Name is recognised, deregister corresponding group.
         if name in group_manager.get_group_names():
@@ -186,18 +207,33 @@ def forget(arguments: list[str]):
             logger.add("warning", f"Group named '{name}' not found in memory.")
 
 
-# Initialise GroupManager from source file.
 group_manager_source = f"{MEM_FILE_NAME}/aliases.json"
-group_manager_json = read_group_manager_file_to_json(source_path=group_manager_source)
-group_manager = load_group_manager_from_json(
-    gm_json=group_manager_json,
-    metric_sourcer=source_metric,
-    group_manager=GroupManager(source_file=Path(group_manager_source)),
-)
-logger.add(
-    "info",
-    f"GroupManager initialised. Found '{group_manager.record_count}' aliases in '{str(group_manager.get_source_file())}'.",
-    cli_out=True,
-)
+_group_manager: Optional[GroupManager] = None
+
+
+def get_group_manager() -> GroupManager:
+    """
+    Returns the GroupManager, initialised from its source file on first use, so that
+    commands which don't use groups never read it.
+    """
+    global _group_manager
+
+    if _group_manager is None:
+        group_manager_json = read_group_manager_file_to_json(
+            source_path=group_manager_source
+        )
+        _group_manager = load_group_manager_from_json(
+            gm_json=group_manager_json,
+            metric_sourcer=source_metric,
+            group_manager=GroupManager(source_file=Path(group_manager_source)),
+        )
+        logger.add(
+            "info",
+            f"GroupManager initialised. Found '{_group_manager.record_count}' aliases in '{str(_group_manager.get_source_file())}'.",
+            cli_out=True,
+        )
+
+    return _group_manager
+
 
 global_function_register: dict[str, callable] = {"remember": remember, "forget": forget}
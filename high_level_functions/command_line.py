@@ -0,0 +1,357 @@
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from utils.utils import parse_since_date, parse_until_date
+
+"""
+Non-interactive command line, for scripts and scheduled jobs. Each command calls the
+same functions as the terminals, without prompting, e.g.
+
+    python main.py write --file panel.txt
+    python main.py read glucose --since 01012024 --json
+    python main.py analyse find_oor --json
+    python main.py graph glucose hdl --out glucose.html
+
+A command's result is written to stdout, as JSON with --json, while messages go to
+stderr, so stdout can be parsed. Commands exit with EXIT_OK or EXIT_FAILED, or 2 for
+bad arguments (from argparse). Modules are only imported by the commands that need
+them, and groups are only loaded if a name isn't a metric. Names are looked up
+exactly, so a misspelt name fails rather than reading the closest metric.
+"""
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+
+
+class CommandResult(NamedTuple):
+    exit_code: int
+    data: Optional[dict] = None  # Written as JSON with --json.
+    text: str = ""  # Written otherwise.
+
+
+def _json_default(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _measurement_json(measurement) -> dict:
+    from classes import InequalityMeasurement
+
+    return {
+        "date": measurement.date,
+        # Inequalities are kept as they're written, e.g. "<5.0".
+        "value": (
+            str(measurement)
+            if isinstance(measurement, InequalityMeasurement)
+            else measurement.value
+        ),
+        "unit": measurement.unit,
+    }
+
+
+def _unknown_names(names: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Look up metric and group names exactly, unlike the terminals, which match unknown
+    names to the closest metric. A name may end in "*" (as in data entry) to name a
+    metric verbatim.
+
+    Returns:
+        The names to source, and the names which are neither a metric nor a group.
+    """
+    from file_tools.metric_file_parsing import metric_exists
+    from global_functions import get_group_manager
+    from utils.utils import is_verbatim
+
+    found_names, unknown_names = [], []
+    for name in names:
+        if verbatim_name := is_verbatim(name):
+            name = verbatim_name
+        elif not metric_exists(name) and name in get_group_manager().get_group_names():
+            found_names.append(name)
+            continue
+
+        if metric_exists(name):
+            found_names.append(name)
+        else:
+            unknown_names.append(name)
+
+    return found_names, unknown_names
+
+
+def _source_exactly(
+    names: list[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """
+    Source the metrics of exactly these names, for the given date range, or return a
+    failed CommandResult naming those which are unknown.
+    """
+    from global_functions import source_metric
+
+    found_names, unknown_names = _unknown_names(names)
+    if unknown_names:
+        return CommandResult(
+            EXIT_FAILED,
+            {"error": "Unknown metric or group names.", "unknown": unknown_names},
+            f"Unknown metric or group names: {', '.join(unknown_names)}.",
+        )
+
+    return source_metric(found_names, since, until)
+
+
+def write_command(arguments: argparse.Namespace) -> CommandResult:
+    from data.bulk_import import import_measurements
+
+    file_path = Path(arguments.file)
+    if not file_path.is_file():
+        return CommandResult(
+            EXIT_FAILED,
+            {"error": f"No import file at '{file_path}'."},
+            f"No import file at '{file_path}'.",
+        )
+
+    stats = import_measurements(file_path, strict=arguments.strict)
+    exit_code = EXIT_FAILED if stats["rows"] and not stats["imported"] else EXIT_OK
+    return CommandResult(
+        exit_code,
+        {"file": str(file_path)} | stats,
+        f"Imported {stats['imported']} of {stats['rows']} rows into "
+        f"{stats['metrics']} metrics ({stats['created']} created, "
+        f"{stats['skipped']} skipped, {stats['unfolded']} left in journals).",
+    )
+
+
+def read_command(arguments: argparse.Namespace) -> CommandResult:
+    source_group = _source_exactly(
+        arguments.names, arguments.since, arguments.until
+    )
+    if isinstance(source_group, CommandResult):
+        return source_group
+
+    metrics = {
+        metric.metric_name: metric.between(arguments.since, arguments.until)
+        for metric in source_group.as_list()
+    }
+    lines = [
+        "\t".join(
+            [metric_name, measurement.date.isoformat(), str(measurement)]
+            + ([measurement.unit] if measurement.unit else [])
+        )
+        for metric_name, measurements in metrics.items()
+        for measurement in measurements
+    ]
+    return CommandResult(
+        EXIT_OK,
+        {
+            "metrics": [
+                {
+                    "metric_name": metric_name,
+                    "measurements": [_measurement_json(m) for m in measurements],
+                }
+                for metric_name, measurements in metrics.items()
+            ]
+        },
+        "\n".join(lines),
+    )
+
+
+def find_oor_command(arguments: argparse.Namespace) -> CommandResult:
+    from data.analysis_tools import collect_oor
+
+    oor_entries, oor_values, phase_times = collect_oor(show_values=arguments.values)
+    metrics = [
+        {
+            "metric_name": entry["metric_name"],
+            "oor_count": entry["oor_count"],
+            "latest_oor_date": entry["latest_oor_date"],
+            "metric_guide": entry["metric_guide"],
+        }
+        | (
+            {"oor_values": oor_values[entry["metric_name"]]}
+            if entry["metric_name"] in oor_values
+            else {}
+        )
+        for entry in oor_entries
+    ]
+    lines = [
+        f"{metric['metric_name']}\t{metric['oor_count']}\t{metric['latest_oor_date']}"
+        for metric in metrics
+    ]
+    return CommandResult(
+        EXIT_OK, {"metrics": metrics, "seconds": phase_times}, "\n".join(lines)
+    )
+
+
+def graph_command(arguments: argparse.Namespace) -> CommandResult:
+    from utils.plotting import plot_metrics
+
+    source_group = _source_exactly(
+        arguments.names, arguments.since, arguments.until
+    )
+    if isinstance(source_group, CommandResult):
+        return source_group
+
+    metrics = source_group.as_list()
+    figure = plot_metrics(
+        metrics, show_bounds=True, since=arguments.since, until=arguments.until
+    )
+    figure.write_html(arguments.out)
+    return CommandResult(
+        EXIT_OK,
+        {
+            "out": arguments.out,
+            "metrics": [metric.metric_name for metric in metrics],
+        },
+        arguments.out,
+    )
+
+
+def _add_date_range_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--since",
+        type=parse_since_date,
+        metavar="DATE",
+        help="Earliest date to include (DDMMYYYY or ISO).",
+    )
+    parser.add_argument(
+        "--until",
+        type=parse_until_date,
+        metavar="DATE",
+        help="Latest date to include (DDMMYYYY or ISO).",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Returns the parser for the command line. Without a command, the interactive
+    terminal is started.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Record and visualise health data. Run without a command for "
+        "the interactive terminal.",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Print the slowest imports of startup, then exit.",
+    )
+    # Shared by every command.
+    json_parser = argparse.ArgumentParser(add_help=False)
+    json_parser.add_argument(
+        "--json", action="store_true", help="Write the result to stdout as JSON."
+    )
+
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    write_parser = commands.add_parser(
+        "write", parents=[json_parser], help="Import measurements from a file."
+    )
+    write_parser.add_argument(
+        "--file",
+        required=True,
+        help="CSV, JSONL, or text file of data entry lines "
+        "('metric value DDMMYYYY [unit]').",
+    )
+    write_parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Skip rows for unrecognised metrics, rather than matching them to the "
+        "closest known metric.",
+    )
+    write_parser.set_defaults(handler=write_command)
+
+    read_parser = commands.add_parser(
+        "read", parents=[json_parser], help="Print the measurements of metrics."
+    )
+    read_parser.add_argument(
+        "names", nargs="+", help="Metric or group names, or 'name*' for a metric."
+    )
+    _add_date_range_arguments(read_parser)
+    read_parser.set_defaults(handler=read_command)
+
+    analyse_parser = commands.add_parser("analyse", help="Analyse the metric store.")
+    analyses = analyse_parser.add_subparsers(
+        dest="analysis", metavar="analysis", required=True
+    )
+    find_oor_parser = analyses.add_parser(
+        "find_oor", parents=[json_parser], help="List out of range metrics."
+    )
+    find_oor_parser.add_argument(
+        "--values", action="store_true", help="Also list the out of range values."
+    )
+    find_oor_parser.set_defaults(handler=find_oor_command)
+
+    graph_parser = commands.add_parser(
+        "graph", parents=[json_parser], help="Graph metrics to an HTML file."
+    )
+    graph_parser.add_argument(
+        "names", nargs="+", help="Metric or group names, or 'name*' for a metric."
+    )
+    graph_parser.add_argument("--out", required=True, help="HTML file to write.")
+    _add_date_range_arguments(graph_parser)
+    graph_parser.set_defaults(handler=graph_command)
+
+    return parser
+
+
+def run_command_line(argv: list[str]) -> Optional[int]:
+    """
+    Run a command given on the command line.
+
+    Arguments:
+        argv: The command line arguments, without the program name.
+
+    Returns:
+        The exit code, or None if no command was given, and the interactive
+        terminal should be started.
+    """
+    parser = build_parser()
+    arguments = parser.parse_args(argv)
+
+    if arguments.startup_profile:
+        from utils.startup_profile import print_startup_profile
+
+        print_startup_profile()
+        return EXIT_OK
+
+    if arguments.command is None:
+        return None
+
+    from file_tools.utils import create_metric_dir
+
+    create_metric_dir()
+
+    # Anything printed while running goes to stderr, leaving stdout for the result.
+    with redirect_stdout(sys.stderr):
+        try:
+            result = arguments.handler(arguments)
+        except Exception as e:
+            result = CommandResult(
+                EXIT_FAILED, {"error": str(e)}, f"{type(e).__name__}: {e}"
+            )
+
+        from file_tools.metric_catalog import metric_catalog
+        from utils.logger import logger
+
+        metric_catalog.save()
+        # Kept as the terminal keeps them on exit, as nothing else records them for
+        # scheduled runs.
+        logger.dump_to_file()
+
+    if arguments.json:
+        print(json.dumps(result.data, indent=4, default=_json_default))
+    elif result.exit_code == EXIT_OK:
+        if result.text:
+            print(result.text)
+    else:
+        print(result.text, file=sys.stderr)
+
+    return result.exit_code
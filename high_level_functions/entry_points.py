@@ -1,10 +1,12 @@
-from high_level_functions.manage import instantiate, rename, search, show, update_units
-from high_level_functions.graph import from_names
-from high_level_functions.read import read_by_name
-from high_level_functions.write import data_entry_mode
-from utils.utils import generic_hll_function
-from utils.utils import function_mapping_t
-from data.analysis_tools import find_oor
+from utils.utils import function_mapping_t, generic_hll_function, lazy_function
+
+"""
+The sub-terminals entered from the main terminal. Their functions are registered
+by module path, and only imported when first called, so that startup doesn't import
+(say) plotly, or the benchmarks, before they're needed.
+"""
+
+MANAGE_MODULE = "high_level_functions.manage"
 
 
 def memorise(_: list):
@@ -16,8 +18,10 @@ def memorise(_: list):
 
 
 def analyse(_: list):
-    function_mapping: dict[str, callable] = {
-        "find_oor": find_oor,
+    function_mapping: function_mapping_t = {
+        "find_oor": lazy_function("data.analysis_tools:find_oor"),
+        "rebuild_oor": lazy_function("data.analysis_tools:rebuild_oor"),
+        "benchmark": lazy_function("utils.benchmarks:run_benchmarks"),
     }
 
     generic_hll_function(
@@ -26,8 +30,8 @@ def analyse(_: list):
 
 
 def graph(_: list):
-    function_mapping: dict[str, callable] = {
-        "from_names": from_names,
+    function_mapping: function_mapping_t = {
+        "from_names": lazy_function("high_level_functions.graph:from_names"),
     }
 
     generic_hll_function(
@@ -36,28 +40,47 @@ def graph(_: list):
 
 
 def read(_: list):
-    function_mapping: function_mapping_t = {"read_metric": read_by_name}
+    function_mapping: function_mapping_t = {
+        "read_metric": lazy_function("high_level_functions.read:read_by_name"),
+        "export": lazy_function("data.bulk_export:bulk_export"),
+    }
 
     generic_hll_function(
-        sub_func_map=function_mapping, hll_name="read", proper_name="reading"
+        sub_func_map=function_mapping,
+        hll_name="read",
+        proper_name="reading",
+        path_functions=("export",),
     )
 
 
 def write(_: list):
-    function_mapping: function_mapping_t = {"data_entry": data_entry_mode}
+    function_mapping: function_mapping_t = {
+        "data_entry": lazy_function("high_level_functions.write:data_entry_mode"),
+        "import": lazy_function("data.bulk_import:bulk_import"),
+    }
 
     generic_hll_function(
-        sub_func_map=function_mapping, hll_name="write", proper_name="writing"
+        sub_func_map=function_mapping,
+        hll_name="write",
+        proper_name="writing",
+        path_functions=("import",),
     )
 
 
 def manage(_: list):
-    function_mapping: dict[str, callable] = {
-        "rename": rename,
-        "show": show,
-        "search": search,
-        "instantiate": instantiate,
-        "update_units": update_units,
+    function_mapping: function_mapping_t = {
+        "rename": lazy_function(f"{MANAGE_MODULE}:rename"),
+        "show": lazy_function(f"{MANAGE_MODULE}:show"),
+        "search": lazy_function(f"{MANAGE_MODULE}:search"),
+        "instantiate": lazy_function(f"{MANAGE_MODULE}:instantiate"),
+        "update_units": lazy_function(f"{MANAGE_MODULE}:update_units"),
+        "fold_journals": lazy_function(f"{MANAGE_MODULE}:fold_journals"),
+        "convert_store": lazy_function(f"{MANAGE_MODULE}:convert_store_format"),
+        "to_sqlite": lazy_function(f"{MANAGE_MODULE}:to_sqlite"),
+        "from_sqlite": lazy_function(f"{MANAGE_MODULE}:from_sqlite"),
+        "migrate": lazy_function(f"{MANAGE_MODULE}:migrate"),
+        "archive": lazy_function(f"{MANAGE_MODULE}:archive"),
+        "compact": lazy_function(f"{MANAGE_MODULE}:compact"),
     }
 
     generic_hll_function(
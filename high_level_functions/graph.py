@@ -1,15 +1,32 @@
 from global_functions import source_metric
-from utils.plotting import plot_metrics
+from utils.utils import parse_date_range_arguments
 
 
 def from_names(arguments: list):
+    """
+    Graph metrics by name.
+
+    Accepted arguments:
+        Any number of metric or group names.
+        "--since DATE" / "--until DATE": Only plot measurements within these dates.
+    """
+    try:
+        arguments, since, until = parse_date_range_arguments(arguments)
+    except ValueError as e:
+        print(e)
+        return
+
     # Read requested file.
-    health_metrics = source_metric(arguments).as_list()
+    health_metrics = source_metric(arguments, since, until).as_list()
 
     if health_metrics:
         if len(health_metrics) == 1:
-            current_plot = health_metrics[0].graph_metric()
+            current_plot = health_metrics[0].graph_metric(since=since, until=until)
         else:
-            current_plot = plot_metrics(health_metrics, show_bounds=True)
+            from utils.plotting import plot_metrics
+
+            current_plot = plot_metrics(
+                health_metrics, show_bounds=True, since=since, until=until
+            )
 
         current_plot.show()
@@ -1,6 +1,23 @@
-from pathlib import Path
 from utils.cli_displays import prompt_user
-from file_tools.metric_file_parsing import rename_health_file, update_measurement_units
+from file_tools.archive import ARCHIVE_CODECS
+from file_tools.store_settings import set_store_setting
+from file_tools.metric_file_parsing import (
+    ARCHIVE_REPORT_PATH,
+    COMPACTION_REPORT_PATH,
+    METRIC_FILE_EXTENSIONS,
+    MIGRATION_REPORT_PATH,
+    archive_store,
+    compact_store,
+    convert_store,
+    export_sqlite_to_store,
+    fold_all_journals,
+    get_metric_catalog,
+    import_store_to_sqlite,
+    migrate_store,
+    rename_health_file,
+    restore_archived_store,
+    update_measurement_units,
+)
 from utils.logger import logger
 from data.data_entry import generate_new_metric
 
@@ -25,9 +42,14 @@ def show(_: list):
     Show all files in the metric_files directory.
     """
     count = 0
+    catalog = get_metric_catalog()
 
-    for file in Path("metric_files/").iterdir():
-        print(file.stem)
+    for metric_name in catalog.names():
+        entry = catalog.get(metric_name)
+        print(
+            f"{metric_name} ({entry['metric_type']}, {entry['entry_count']} entries, "
+            f"last {entry['last_date']})"
+        )
         count += 1
 
     print(f"\nFound {count} files.")
@@ -42,9 +64,9 @@ def search(_: list):
     print("Input file to search for: ")
     to_search = prompt_user(["manage", "search"])
     print("\nresults:")
-    for file in Path("metric_files/").iterdir():
-        if to_search in file.stem:
-            print("    ", file.stem)
+    for metric_name in get_metric_catalog().names():
+        if to_search in metric_name:
+            print("    ", metric_name)
             found += 1
         count += 1
 
@@ -107,3 +129,161 @@ def instantiate(_: list):
         f"Exiting instantiate, created '{created_count}' new metrics.",
         cli_out=True,
     )
+
+
+def fold_journals(_: list):
+    """
+    Fold all journalled measurements back into their metric files.
+    """
+    folded_count = fold_all_journals()
+    logger.add(
+        "action",
+        f"Folded {folded_count} journalled measurements into metric files.",
+        cli_out=True,
+    )
+
+
+def convert_store_format(arguments: list):
+    """
+    Convert every metric file to a given store format, which is then used for any
+    new metric files.
+
+    Accepted arguments:
+        Position 1: Name of the format to convert to.
+    """
+    supported_formats = list(METRIC_FILE_EXTENSIONS.keys())
+
+    if arguments:
+        store_format = arguments[0]
+    else:
+        print(f"Convert store to which format? {supported_formats}")
+        store_format = prompt_user(["manage", "convert_store"]).strip().lower()
+
+    if store_format not in supported_formats:
+        logger.add(
+            "warning",
+            f"'{store_format}' is not a supported store format {supported_formats}.",
+            cli_out=True,
+        )
+        return
+
+    converted_count = convert_store(store_format)
+    print(f"\nConverted {converted_count} files to '{store_format}'.\n")
+
+
+def to_sqlite(_: list):
+    """
+    Import every metric file into the SQLite store, and switch the store to use it.
+    """
+    imported_count = import_store_to_sqlite()
+    print(f"\nImported {imported_count} metrics into SQLite.\n")
+
+
+def from_sqlite(_: list):
+    """
+    Export every metric in the SQLite store back to metric files, and switch the store
+    to use them.
+    """
+    exported_count = export_sqlite_to_store()
+    print(f"\nExported {exported_count} metrics to metric files.\n")
+
+
+def migrate(arguments: list):
+    """
+    Upgrade every outdated metric file to the current file version, and write a
+    migration report.
+
+    Accepted arguments:
+        "dry_run": Report what would be migrated, without writing anything.
+    """
+    dry_run = "dry_run" in arguments
+    report = migrate_store(dry_run=dry_run)
+
+    print(f"\nMigration{' (dry run)' if dry_run else ''} took {report['seconds']:.2f}s:")
+    for status, count in report["counts"].items():
+        print(f" - {status}: {count}")
+    for result in report["metrics"]:
+        steps = " -> ".join(str(version) for version in result["steps"])
+        print(f"   {result['metric_name']} ({result['status']}) {steps} {result.get('error', '')}")
+    print(f"(report written to '{MIGRATION_REPORT_PATH}')\n")
+
+
+def archive(arguments: list):
+    """
+    Compress cold metric data (see the "archive_after_days" and "archive_over_bytes"
+    store settings), which is decompressed transparently whenever it's read.
+
+    Accepted arguments:
+        "dry_run": Report what archiving would save, without writing anything.
+        "zlib" / "lzma": Codec to compress with, otherwise the store's default.
+        "restore": Decompress everything that has been archived.
+    """
+    if "restore" in arguments:
+        restored_count = restore_archived_store()
+        print(f"\nRestored {restored_count} archived metric files and segments.\n")
+        return
+
+    dry_run = "dry_run" in arguments
+    codec = next((argument for argument in arguments if argument in ARCHIVE_CODECS), None)
+    report = archive_store(dry_run=dry_run, codec=codec)
+    if not report:
+        return
+
+    print(f"\nArchive{' (dry run)' if dry_run else ''} with {report['codec']}:")
+    for result in report["metrics"]:
+        read_cost = (
+            f", read {result['read_seconds_before'] * 1000:.2f}ms -> "
+            f"{result['read_seconds_after'] * 1000:.2f}ms"
+            if result["read_seconds_after"] is not None
+            else ""
+        )
+        print(
+            f" - {result['metric_name']}: {result['bytes_before']} -> "
+            f"{result['bytes_after']} bytes{read_cost}"
+        )
+
+    if report["ratio"]:
+        print(
+            f"Total {report['bytes_before']} -> {report['bytes_after']} bytes "
+            f"({report['ratio']:.1f}x smaller)."
+        )
+    else:
+        print("No cold metric data to archive.")
+    print(f"(report written to '{ARCHIVE_REPORT_PATH}')\n")
+
+
+def compact(arguments: list):
+    """
+    Sort, deduplicate and normalise every metric's measurements, folding in any
+    journals, and rewrite the metric files that changed.
+
+    Accepted arguments:
+        "dry_run": Report what would be compacted, without writing anything.
+        "minify": Write JSON metric files without indentation, from now on.
+    """
+    dry_run = "dry_run" in arguments
+    minify = "minify" in arguments and not dry_run
+    if minify:
+        set_store_setting("json_indent", None)
+
+    report = compact_store(dry_run=dry_run, rewrite=minify)
+
+    print(f"\nCompaction{' (dry run)' if dry_run else ''} took {report['seconds']:.2f}s:")
+    for status, count in report["counts"].items():
+        print(f" - {status}: {count}")
+    for result in report["metrics"]:
+        bytes_saved = (
+            f", {result['bytes_saved']} bytes saved" if "bytes_saved" in result else ""
+        )
+        print(
+            f"   {result['metric_name']} ({result['status']}): "
+            f"{result.get('duplicates_removed', 0)} duplicates removed, "
+            f"{result.get('units_dropped', 0)} units dropped"
+            f"{', reordered' if result.get('reordered') else ''}{bytes_saved} "
+            f"{result.get('error', '')}"
+        )
+    print(
+        f"Total {report['duplicates_removed']} duplicates removed, "
+        f"{report['bytes_saved']} bytes saved."
+    )
+    print(f"(report written to '{COMPACTION_REPORT_PATH}')\n")
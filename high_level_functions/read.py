@@ -1,5 +1,6 @@
 from classes import HealthMetric
 from global_functions import source_metric
+from utils.utils import parse_date_range_arguments
 
 
 def read_by_name(arguments: list):
@@ -8,19 +9,32 @@ def read_by_name(arguments: list):
 
     Accepted arguments:
         Position 1: Name of file to read.
+        "--since DATE" / "--until DATE": Only show measurements within these dates.
 
     """
-    source_group = source_metric(arguments)
+    try:
+        arguments, since, until = parse_date_range_arguments(arguments)
+    except ValueError as e:
+        print(e)
+        return
+
+    source_group = source_metric(arguments, since, until)
 
     # Check nonzero entries:
     if source_group and len(source_group.as_list()) > 0:
         metrics: list[HealthMetric] = source_group.as_list()
 
-        # For each metric, display associated entries.
+        # For each metric, display associated entries, oldest first.
         for metrid in metrics:
             print(f"\nMetric: {metrid.metric_name}")
-            entries = metrid.entries
-            print(f"(Found {len(entries)} entries)")
+            entries = metrid.between(since, until)
+            if since or until:
+                print(
+                    f"(Found {len(entries)} entries between "
+                    f"{since or 'the start'} and {until or 'now'})"
+                )
+            else:
+                print(f"(Found {len(entries)} entries)")
             for measurement in entries:
                 print(
                     " - ",
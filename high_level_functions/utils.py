@@ -1,8 +1,10 @@
 import json
 from classes import GroupManager
-from file_tools.metric_file_parsing import MEM_FILE_PATH
+from file_tools.filepaths import MEM_FILE_PATH
+from file_tools.metric_cache import metric_cache
+from file_tools.metric_catalog import metric_catalog
 from utils.logger import logger
-from global_functions import group_manager
+from global_functions import get_group_manager
 
 
 def generate_group_manager_file(group_manager: GroupManager, gm_file_name: str) -> str:
@@ -25,9 +27,7 @@ def generate_group_manager_file(group_manager: GroupManager, gm_file_name: str)
             "enforce_units": group.enforce_units,
             "unit": group.unit,
             "count": group.count,
-            "metric_dict": [
-                metric.metric_name for metric in group.metric_dict.values()
-            ],
+            "metric_dict": group.member_names(),
         }
         for group_name, group in group_manager.group_record.items()
     }
@@ -57,7 +57,9 @@ def exit(_: list) -> None:
     group manager, and logs the end of program.
     """
     generate_group_manager_file(
-        group_manager=group_manager, gm_file_name="aliases.json"
+        group_manager=get_group_manager(), gm_file_name="aliases.json"
     )
+    metric_catalog.save()
+    metric_cache.log_stats()
     logger.add("action", "Exiting high level loop now.")
     logger.dump_to_file()
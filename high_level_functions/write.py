@@ -4,14 +4,18 @@ from data.data_entry import (
     ManualEntryHandler,
     SpeedyEntryHandler,
 )
+from data.write_session import WriteSession
 from file_tools.filepaths import FILE_DIR_NAME
+from file_tools.metric_file_parsing import fold_all_journals
 from utils.logger import logger
 from utils.cli_displays import prompt_user
 
 
 def data_entry_mode(_: str):
     """
-    Loop to ingest input for writing new measurements and metrics.
+    Loop to ingest input for writing new measurements and metrics. Measurements are
+    buffered in a write session, and written on 'commit', on changing handler, on
+    exit, or once the session's thresholds are reached.
     """
     c_level = "write"
     set_handler = True
@@ -24,39 +28,62 @@ def data_entry_mode(_: str):
 
     # Run writing loop using this handler.
     logger.add("info", "Entering input loop.")
+    write_session = WriteSession()
 
-    while True:
-        if set_handler:
-            # Get required entry handler, default to manual mode,
-            print("\nSelect handler mode (1, 2, or 3): ")
-            req_handler = prompt_user(["main", c_level, "handler_select"])
-            if req_handler == "exit":
-                return
-            req_handler = int(req_handler)
-            handler_callable: InputHandler = handler_mapping.get(
-                req_handler, ManualEntryHandler
-            )
-            handler_description = handler_descriptions.get(req_handler, "MANUAL")
-            logger.add("info", f"Handler set to mode `{req_handler}`")
-
-            # Instantiate the required handler.
-            handler: InputHandler = handler_callable(metric_file_path=FILE_DIR_NAME)
-            set_handler = False
-
-            print("\nStarting input loop, format is 'metric measurement DDMMYYYY'")
-            print("    (type 'exit' to quit, 'handler' to change handler mode)\n")
-
-        # Loop requests.
-        new_input = prompt_user(["main", c_level, handler_description])
-
-        # Catch exit request.
-        if new_input == "exit":
-            logger.add("info", "Exiting input loop.")
-            break
-        # Backing out to handler select.
-        elif new_input == "handler":
-            set_handler = True
-            continue
-
-        # Pass raw input to handler object.
-        handler.handle_input(new_input)
+    try:
+        while True:
+            if set_handler:
+                # Get required entry handler, default to manual mode,
+                print("\nSelect handler mode (1, 2, or 3): ")
+                req_handler = prompt_user(["main", c_level, "handler_select"])
+                if req_handler == "exit":
+                    break
+                req_handler = int(req_handler)
+                handler_callable: InputHandler = handler_mapping.get(
+                    req_handler, ManualEntryHandler
+                )
+                handler_description = handler_descriptions.get(req_handler, "MANUAL")
+                logger.add("info", f"Handler set to mode `{req_handler}`")
+
+                # Instantiate the required handler.
+                handler: InputHandler = handler_callable(
+                    metric_file_path=FILE_DIR_NAME, write_session=write_session
+                )
+                set_handler = False
+
+                print("\nStarting input loop, format is 'metric measurement DDMMYYYY'")
+                print(
+                    "    (type 'exit' to quit, 'handler' to change handler mode, "
+                    "'commit' to write pending measurements)\n"
+                )
+
+            # Loop requests, showing how many measurements are waiting to be written.
+            prompt_levels = ["main", c_level, handler_description]
+            if write_session.pending_count:
+                prompt_levels.append(f"{write_session.pending_count} pending")
+            new_input = prompt_user(prompt_levels)
+
+            # Catch exit request.
+            if new_input == "exit":
+                logger.add("info", "Exiting input loop.")
+                break
+            # Backing out to handler select.
+            elif new_input == "handler":
+                write_session.flush()
+                set_handler = True
+                continue
+            # Write pending measurements now.
+            elif new_input == "commit":
+                written_count = write_session.flush()
+                print(f"Committed {written_count} measurements.")
+                continue
+
+            # Pass raw input to handler object.
+            handler.handle_input(new_input)
+    finally:
+        # Write anything still buffered, even if the loop was interrupted.
+        write_session.flush()
+        write_session.close()
+
+    # Fold this session's journalled measurements back into their metric files.
+    fold_all_journals()
@@ -1,24 +1,19 @@
 import sys
-from file_tools.utils import create_metric_dir
-from high_level_functions.entry_points import (
-    analyse,
-    graph,
-    manage,
-    memorise,
-    read,
-    write,
-)
-from high_level_functions.utils import exit
-from utils.cli_displays import welcome
-from utils.logger import logger
-
-from utils.utils import function_mapping_t, generic_hll_function
-
-
-from global_functions import global_function_register
 
 
 def high_level_loop():
+    from global_functions import global_function_register
+    from high_level_functions.entry_points import (
+        analyse,
+        graph,
+        manage,
+        memorise,
+        read,
+        write,
+    )
+    from high_level_functions.utils import exit
+    from utils.utils import function_mapping_t, generic_hll_function
+
     # Defines mapping of commands to their respective functions.
     function_mapping: function_mapping_t = {
         "write": write,
@@ -35,9 +30,24 @@ def high_level_loop():
 
 
 if __name__ == "__main__":
+    # Commands given on the command line run without the interactive terminal, so
+    # the terminal's modules are only imported once it's known to be needed.
+    if len(sys.argv) > 1:
+        from high_level_functions.command_line import run_command_line
+
+        if (exit_code := run_command_line(sys.argv[1:])) is not None:
+            sys.exit(exit_code)
+
+    from file_tools.utils import create_metric_dir
+    from global_functions import get_group_manager
+    from high_level_functions.utils import exit
+    from utils.cli_displays import welcome
+    from utils.logger import logger
+
     welcome()
     # If no directory exists, generate one.
     create_metric_dir()
+    get_group_manager()
 
     # Start high level loop
     try:
@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from file_tools.archive import ARCHIVE_CODECS, decode_archive, encode_archive
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_file_parsing import (
+    archive_store,
+    get_metric_file_path,
+    read_metric_file_to_json,
+    restore_archived_store,
+)
+from file_tools.segmented import (
+    append_segmented,
+    archive_segments,
+    read_segmented_to_json,
+    restore_segments,
+    segment_dir,
+    write_segmented,
+)
+from file_tools.store_settings import load_store_settings
+
+
+def _health_data(data: list[dict]) -> dict:
+    return {
+        "metric_name": "glucose",
+        "metric_type": "metric",
+        "metric_guide": None,
+        "unit": "mmol/L",
+        "file_version": 9,
+        "data": data,
+    }
+
+
+class ArchiveCodecTests(unittest.TestCase):
+    def test_every_codec_round_trips(self):
+        health_data = _health_data([{"value": 5.5, "date": "2025-01-01T00:00:00"}])
+
+        for codec in ARCHIVE_CODECS:
+            with self.subTest(codec=codec):
+                self.assertEqual(
+                    decode_archive(encode_archive(health_data, codec)), health_data
+                )
+
+    def test_other_bytes_are_rejected(self):
+        with self.assertRaises(ValueError):
+            decode_archive(b"VCOL\x01rest")
+        with self.assertRaises(ValueError):
+            decode_archive(b"VARC\x09rest")
+
+
+class ArchiveStoreTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        self.data = [
+            {"value": 5.0, "date": "2023-06-01T00:00:00"},
+            {"value": 5.5, "date": "2024-01-01T00:00:00"},
+            {"value": 6.0, "date": "2025-03-01T00:00:00"},
+        ]
+        # Everything counts as cold.
+        self.settings = mock.patch.dict(
+            load_store_settings(), {"archive_after_days": None, "archive_over_bytes": 0}
+        )
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def test_metric_files_are_archived_and_restored(self):
+        (FILE_DIR_PATH / "glucose.json").write_text(
+            json.dumps(_health_data(self.data))
+        )
+
+        report = archive_store(codec="zlib")
+
+        self.assertEqual(len(report["metrics"]), 1)
+        self.assertEqual(get_metric_file_path("glucose").suffix, ".varc")
+        self.assertEqual(read_metric_file_to_json("glucose"), _health_data(self.data))
+
+        self.assertEqual(restore_archived_store(), 1)
+        self.assertEqual(get_metric_file_path("glucose").suffix, ".json")
+        self.assertEqual(read_metric_file_to_json("glucose"), _health_data(self.data))
+
+    def test_cold_segments_are_archived_and_restored(self):
+        manifest_path = Path("glucose.segments")
+        write_segmented(manifest_path, _health_data(self.data))
+
+        archived = archive_segments(manifest_path, "lzma", None, over_bytes=0)
+
+        # The active (latest) segment is never archived.
+        self.assertEqual([segment["key"] for segment in archived], ["2023", "2024"])
+        self.assertEqual(
+            sorted(path.name for path in segment_dir(manifest_path).iterdir()),
+            ["2023.varc", "2024.varc", "2025.json"],
+        )
+        self.assertEqual(read_segmented_to_json(manifest_path), _health_data(self.data))
+
+        # Appending to an archived segment writes it back uncompressed.
+        new_entry = {"value": 6.5, "date": "2023-07-01T00:00:00"}
+        append_segmented(manifest_path, [new_entry])
+        self.assertTrue((segment_dir(manifest_path) / "2023.json").exists())
+        self.assertFalse((segment_dir(manifest_path) / "2023.varc").exists())
+
+        self.assertEqual(restore_segments(manifest_path), 1)
+        self.assertEqual(
+            sorted(path.name for path in segment_dir(manifest_path).iterdir()),
+            ["2023.json", "2024.json", "2025.json"],
+        )
+        values = [
+            entry["value"] for entry in read_segmented_to_json(manifest_path)["data"]
+        ]
+        self.assertEqual(values, [5.0, 6.5, 5.5, 6.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from classes import HealthMetric
+from data.bulk_import import import_measurements
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_file_parsing import generate_metric_file, read_metric_file_to_json
+from utils.utils import is_verbatim
+
+
+class BulkImportTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        metric = HealthMetric("glucose")
+        metric.unit = "mmol/L"
+        generate_metric_file(metric)
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def test_blank_metric_name_is_skipped(self):
+        import_path = Path("panel.csv")
+        import_path.write_text(
+            "metric,value,date,unit\n"
+            "glucose,5.5,01012025,mmol/L\n"
+            "  ,6.0,02012025,mmol/L\n"
+            "glucose,6.1,03012025,mmol/L\n"
+        )
+
+        stats = import_measurements(import_path)
+
+        self.assertEqual(stats["rows"], 3)
+        self.assertEqual(stats["imported"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        # The rows around the blank one were written, and the journal folded.
+        values = [entry["value"] for entry in read_metric_file_to_json("glucose")["data"]]
+        self.assertEqual(sorted(values), [5.5, 6.1])
+
+    def test_unit_column_is_stripped(self):
+        import_path = Path("panel.csv")
+        import_path.write_text(
+            "glucose,5.5,01012025, mmol/L \n"
+            # A blank unit takes the metric's unit.
+            "glucose,6.1,02012025, \n"
+        )
+
+        import_measurements(import_path)
+
+        data = read_metric_file_to_json("glucose")["data"]
+        self.assertEqual([entry.get("unit") for entry in data], ["mmol/L", "mmol/L"])
+
+    def test_rows_are_only_imported_once_folded(self):
+        import_path = Path("panel.csv")
+        import_path.write_text("glucose,5.5,01012025,mmol/L\n")
+
+        with mock.patch("data.bulk_import.fold_journal", return_value=0):
+            stats = import_measurements(import_path)
+
+        self.assertEqual((stats["imported"], stats["unfolded"]), (0, 1))
+        self.assertEqual(stats["metrics"], 0)
+
+    def test_empty_name_is_not_verbatim(self):
+        self.assertIsNone(is_verbatim(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from file_tools.columnar import ColumnarSeries, read_columnar_to_json, write_columnar
+
+
+def _health_data(data: list[dict]) -> dict:
+    return {
+        "metric_name": "glucose",
+        "metric_type": "metric",
+        "metric_guide": None,
+        "unit": "mmol/L",
+        "file_version": 1,
+        "data": data,
+    }
+
+
+class ColumnarRoundTripTests(unittest.TestCase):
+    def setUp(self):
+        self.store_directory = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.store_directory.name) / "glucose.vcol"
+
+    def tearDown(self):
+        self.store_directory.cleanup()
+
+    def _round_trip(self, health_data: dict) -> dict:
+        write_columnar(self.file_path, health_data)
+        return read_columnar_to_json(self.file_path)
+
+    def test_plain_entries_round_trip(self):
+        health_data = _health_data(
+            [
+                {"date": "2025-01-01T08:00:00", "value": 5.5, "unit": "mmol/L"},
+                {"date": "2025-01-02T08:00:00", "value": 6, "unit": "mg/dL"},
+                {"date": "2025-01-03T08:00:00", "value": True},
+                {"date": "2025-01-04T08:00:00", "value": "<2.5"},
+                {"date": "2025-01-05T08:00:00", "value": "positive"},
+                {"date": None, "value": 5.0},
+            ]
+        )
+
+        self.assertEqual(self._round_trip(health_data), health_data)
+
+    def test_timezones_fractions_and_inequalities_round_trip(self):
+        health_data = _health_data(
+            [
+                {"date": "2025-01-01T08:00:00+01:00", "value": "<2"},
+                {"date": "2025-01-01T08:00:00.250000", "value": ">10"},
+                {"date": "2025-01-01", "value": 5.5, "note": "fasting"},
+                {"date": "2025-01-02T08:00:00", "value": "<abc"},
+            ]
+        )
+
+        self.assertEqual(self._round_trip(health_data), health_data)
+
+    def test_columns_hold_values_as_loaded(self):
+        write_columnar(
+            self.file_path,
+            _health_data([{"date": "2025-01-01T00:00:00.750000", "value": "<2"}]),
+        )
+
+        with ColumnarSeries(self.file_path) as series:
+            self.assertEqual(series.dates[0], 1735689600)
+            self.assertEqual(series.values[0], 2.0)
+            self.assertEqual(series.value_for(0), "<2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from file_tools.filepaths import FILE_DIR_PATH
+from high_level_functions.command_line import EXIT_FAILED, EXIT_OK, run_command_line
+
+
+class CommandLineTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        Path("panel.txt").write_text(
+            "# Yearly panel\n"
+            "glucose* 5.5 01012024 mmol/L\n"
+            "glucose 12.0 01022024 mmol/L\n"
+            "glucose <3.0 01032024 mmol/L\n"
+        )
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def _run(self, *argv: str) -> tuple[int, str, str]:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            exit_code = run_command_line(list(argv))
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_written_measurements_are_read_back_as_json(self):
+        exit_code, stdout, _ = self._run("write", "--file", "panel.txt", "--json")
+        self.assertEqual(exit_code, EXIT_OK)
+        stats = json.loads(stdout)
+        self.assertEqual(
+            (stats["rows"], stats["imported"], stats["created"]), (3, 3, 1)
+        )
+
+        exit_code, stdout, _ = self._run(
+            "read", "glucose", "--since", "15012024", "--json"
+        )
+        self.assertEqual(exit_code, EXIT_OK)
+        (metric,) = json.loads(stdout)["metrics"]
+        self.assertEqual(metric["metric_name"], "glucose")
+        # Inequalities are written as they were entered.
+        self.assertEqual(
+            [measurement["value"] for measurement in metric["measurements"]],
+            [12.0, "<3.0"],
+        )
+
+    def test_stdout_only_holds_the_result(self):
+        self._run("write", "--file", "panel.txt")
+
+        exit_code, stdout, _ = self._run("read", "glucose")
+
+        self.assertEqual(exit_code, EXIT_OK)
+        lines = stdout.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(line.startswith("glucose\t") for line in lines))
+
+    def test_failures_exit_with_an_error(self):
+        self._run("write", "--file", "panel.txt")
+
+        # Names are looked up exactly, rather than matched to the closest metric.
+        exit_code, stdout, _ = self._run("read", "glucsoe", "--json")
+        self.assertEqual(exit_code, EXIT_FAILED)
+        self.assertEqual(json.loads(stdout)["unknown"], ["glucsoe"])
+
+        exit_code, stdout, stderr = self._run("write", "--file", "missing.txt")
+        self.assertEqual(exit_code, EXIT_FAILED)
+        self.assertEqual(stdout, "")
+        self.assertIn("missing.txt", stderr)
+
+    def test_messages_are_logged_to_file(self):
+        self._run("write", "--file", "panel.txt")
+
+        (log_path,) = Path("logs").iterdir()
+        self.assertIn("glucose", log_path.read_text())
+
+    def test_bad_arguments_exit_with_2(self):
+        for argv in (["read"], ["analyse"], ["read", "glucose", "--since", "31022024"]):
+            with self.subTest(argv=argv):
+                with self.assertRaises(SystemExit) as raised:
+                    self._run(*argv)
+                self.assertEqual(raised.exception.code, 2)
+
+    def test_no_command_starts_the_terminal(self):
+        self.assertIsNone(run_command_line([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
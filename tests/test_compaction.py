@@ -0,0 +1,57 @@
+import unittest
+
+from file_tools.compaction import compact_entries
+
+
+class CompactEntriesTests(unittest.TestCase):
+    def test_dates_are_normalised_and_sorted(self):
+        entries = [
+            {"value": 6.1, "date": "03012025"},
+            {"value": 5.5, "date": "2025-01-01"},
+        ]
+
+        compacted, stats = compact_entries(entries)
+
+        self.assertEqual(
+            [entry["date"] for entry in compacted],
+            ["2025-01-01T00:00:00", "2025-01-03T00:00:00"],
+        )
+        self.assertEqual(stats["reordered"], 1)
+
+    def test_timezones_and_fractional_seconds_are_kept(self):
+        entries = [
+            {"value": 5.5, "date": "2025-01-01T08:00:00.750000"},
+            {"value": 5.5, "date": "2025-01-01T08:00:00.250000"},
+            {"value": 5.5, "date": "2025-01-01T08:00:00+01:00"},
+            {"value": 5.5, "date": "2025-01-01T08:00:00"},
+        ]
+
+        compacted, stats = compact_entries(entries)
+
+        # None of these are duplicates, once their dates are compared in full.
+        self.assertEqual(stats["duplicates_removed"], 0)
+        self.assertEqual(
+            [entry["date"] for entry in compacted],
+            [
+                "2025-01-01T08:00:00+01:00",
+                "2025-01-01T08:00:00",
+                "2025-01-01T08:00:00.250000",
+                "2025-01-01T08:00:00.750000",
+            ],
+        )
+
+    def test_exact_duplicates_and_file_units_are_dropped(self):
+        entries = [
+            {"value": 5.5, "date": "2025-01-01T00:00:00", "unit": "mmol/L"},
+            {"value": 5.5, "date": "01012025"},
+        ]
+
+        compacted, stats = compact_entries(entries, file_unit="mmol/L")
+
+        self.assertEqual(compacted, [{"value": 5.5, "date": "2025-01-01T00:00:00"}])
+        self.assertEqual(stats["duplicates_removed"], 1)
+        self.assertEqual(stats["units_dropped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
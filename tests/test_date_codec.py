@@ -0,0 +1,54 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from file_tools.date_codec import (
+    date_to_epoch,
+    encode_date,
+    epoch_to_date,
+    parse_date,
+    parse_date_epoch,
+)
+
+
+class DateCodecTests(unittest.TestCase):
+    def test_data_entry_and_iso_dates_agree(self):
+        self.assertEqual(
+            parse_date_epoch("31121999"), parse_date_epoch("1999-12-31T00:00:00")
+        )
+        self.assertEqual(parse_date_epoch("29022024"), 1709164800)
+        self.assertEqual(encode_date(epoch_to_date(1709164800)), "2024-02-29T00:00:00")
+
+    def test_invalid_data_entry_dates_are_rejected(self):
+        # Not read as the compact ISO date 1999-12-31, or as 2023-03-01.
+        for date_str in ("19991231", "29022023", "00012025"):
+            with self.subTest(date_str=date_str):
+                with self.assertRaises(ValueError):
+                    parse_date_epoch(date_str)
+                with self.assertRaises(ValueError):
+                    parse_date(date_str)
+
+    def test_timezones_are_converted_to_utc(self):
+        utc_date = datetime(2025, 1, 1, 7, 0)
+        aware_date = datetime(2025, 1, 1, 8, 0, tzinfo=timezone(timedelta(hours=1)))
+
+        self.assertEqual(date_to_epoch(aware_date), date_to_epoch(utc_date))
+        self.assertEqual(
+            parse_date_epoch("2025-01-01T08:00:00+01:00"),
+            parse_date_epoch("2025-01-01T07:00:00"),
+        )
+        self.assertEqual(
+            parse_date_epoch("2025-01-01T00:30:00-05:30"),
+            parse_date_epoch("2025-01-01T06:00:00"),
+        )
+
+    def test_fractional_seconds_are_kept_only_by_parse_date(self):
+        date_str = "2025-01-01T08:00:00.750000"
+
+        self.assertEqual(parse_date(date_str).microsecond, 750000)
+        self.assertEqual(
+            parse_date_epoch(date_str), parse_date_epoch("01012025") + 8 * 3600
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
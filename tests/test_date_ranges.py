@@ -0,0 +1,103 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from classes import HealthMetric, Measurement, MeasurementSeries
+from file_tools.date_codec import date_to_epoch
+from utils.utils import parse_date_range_arguments
+
+START_DATE = datetime(2025, 1, 1)
+
+
+def _day(day: int) -> datetime:
+    return START_DATE + timedelta(days=day)
+
+
+class DateRangeTests(unittest.TestCase):
+    def setUp(self):
+        # Out of date order, with two entries on day 2 and one without a date.
+        self.metric = HealthMetric("glucose")
+        for value, date in [
+            (1.0, _day(2)),
+            (2.0, _day(0)),
+            (3.0, None),
+            (4.0, _day(5)),
+            (5.0, _day(2)),
+        ]:
+            self.metric.add_entry(Measurement(value, date))
+
+    def _between_values(self, since, until) -> list[float]:
+        return [measurement.value for measurement in self.metric.between(since, until)]
+
+    def test_bounds_are_inclusive(self):
+        self.assertEqual(self._between_values(_day(0), _day(2)), [2.0, 1.0, 5.0])
+        self.assertEqual(self._between_values(_day(2), _day(2)), [1.0, 5.0])
+        self.assertEqual(self._between_values(_day(5), None), [4.0])
+
+    def test_open_and_empty_ranges(self):
+        # Entries without a date are never in a range, even an unbounded one.
+        self.assertEqual(self._between_values(None, None), [2.0, 1.0, 5.0, 4.0])
+        self.assertEqual(self._between_values(_day(3), _day(4)), [])
+        self.assertEqual(self._between_values(_day(6), None), [])
+        self.assertEqual(self._between_values(None, _day(-1)), [])
+        self.assertEqual(self._between_values(_day(5), _day(0)), [])
+
+    def test_as_of(self):
+        self.assertEqual(self.metric.latest().value, 4.0)
+        # The later of two entries on the same date.
+        self.assertEqual(self.metric.as_of(_day(2)).value, 5.0)
+        self.assertEqual(self.metric.as_of(_day(4)).value, 5.0)
+        self.assertIsNone(self.metric.as_of(_day(-1)))
+        self.assertIsNone(HealthMetric("empty").latest())
+
+        undated_metric = HealthMetric("undated")
+        undated_metric.add_entry(Measurement(1.0, None))
+        self.assertIsNone(undated_metric.latest())
+
+    def test_index_matches_a_scan(self):
+        generator = random.Random(0)
+        series = MeasurementSeries()
+        series.extend_from_json(
+            [
+                {"value": 1.0, "date": _day(generator.randrange(60)).isoformat()}
+                for _ in range(200)
+            ]
+        )
+        # Single appends after a bulk load, which dropped the index.
+        for _ in range(50):
+            series.append(Measurement(1.0, _day(generator.randrange(60))))
+
+        for _ in range(100):
+            since, until = sorted(generator.randrange(-5, 65) for _ in range(2))
+            since_epoch = date_to_epoch(_day(since))
+            until_epoch = date_to_epoch(_day(until))
+
+            # Sorting is stable, so equal dates stay in the order they were added.
+            scanned = sorted(
+                [
+                    index
+                    for index, date in enumerate(series.dates)
+                    if since_epoch <= date <= until_epoch
+                ],
+                key=series.dates.__getitem__,
+            )
+            self.assertEqual(
+                list(series.indices_between(since_epoch, until_epoch)), scanned
+            )
+
+    def test_range_arguments(self):
+        remaining, since, until = parse_date_range_arguments(
+            ["glucose", "--since", "01012025", "--UNTIL", "2025-01-31"]
+        )
+
+        self.assertEqual(remaining, ["glucose"])
+        self.assertEqual(since, datetime(2025, 1, 1))
+        # A date without a time includes the whole of that day.
+        self.assertEqual(until, datetime(2025, 1, 31, 23, 59, 59))
+
+        with self.assertRaises(ValueError):
+            parse_date_range_arguments(["glucose", "--since"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from datetime import datetime
+
+from classes import (
+    InequalityMeasurement,
+    InequalityType,
+    Measurement,
+    MeasurementSeries,
+)
+
+
+def _fields(measurement: Measurement) -> tuple:
+    return (
+        type(measurement),
+        measurement.value,
+        measurement.date,
+        measurement.unit,
+        getattr(measurement, "inequality", None),
+    )
+
+
+class MeasurementSeriesTests(unittest.TestCase):
+    def setUp(self):
+        self.measurements = [
+            Measurement(5.5, datetime(2025, 1, 1), unit="mmol/L"),
+            Measurement(6, datetime(2025, 1, 2)),
+            Measurement(True, datetime(2025, 1, 3)),
+            Measurement("positive", datetime(2025, 1, 4)),
+            InequalityMeasurement(
+                2.0, InequalityType.LessThan, datetime(2025, 1, 5), unit="mmol/L"
+            ),
+            Measurement(7.0, None),
+        ]
+        self.series = MeasurementSeries(self.measurements)
+
+    def test_entries_read_back_as_added(self):
+        self.assertEqual(len(self.series), len(self.measurements))
+        self.assertEqual(
+            [_fields(measurement) for measurement in self.series],
+            [_fields(measurement) for measurement in self.measurements],
+        )
+        self.assertIsInstance(self.series[1].value, int)
+        self.assertIsInstance(self.series[2].value, bool)
+        self.assertEqual(str(self.series[4]), "<2.0")
+        self.assertEqual(self.series.units, ["mmol/L"])
+
+    def test_negative_and_out_of_range_indices(self):
+        self.assertEqual(_fields(self.series[-1]), _fields(self.measurements[-1]))
+        with self.assertRaises(IndexError):
+            self.series[len(self.measurements)]
+        with self.assertRaises(IndexError):
+            self.series[-len(self.measurements) - 1]
+
+    def test_slices_match_list_slices(self):
+        for index in (slice(1, 3), slice(None, None, -2), slice(4, None), slice(9, 12)):
+            with self.subTest(index=index):
+                self.assertEqual(
+                    [_fields(measurement) for measurement in self.series[index]],
+                    [_fields(measurement) for measurement in self.measurements[index]],
+                )
+
+    def test_indexing_returns_copies(self):
+        measurement = self.series[0]
+        measurement.value = 9.9
+        measurement.unit = "mg/dL"
+
+        # Changes go through the series' own methods, not the measurements it builds.
+        self.assertIsNot(self.series[0], measurement)
+        self.assertEqual(self.series[0].value, 5.5)
+        self.assertEqual(self.series.unit_at(0), "mmol/L")
+
+    def test_append_keeps_date_queries_in_order(self):
+        self.series.append(Measurement(4.0, datetime(2024, 12, 31)))
+
+        self.assertEqual(self.series[-1].value, 4.0)
+        # The earliest entry, though the last added, and still not the latest.
+        self.assertEqual(self.series.indices_between()[0], 6)
+        self.assertEqual(self.series.index_as_of(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
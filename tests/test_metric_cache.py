@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+
+from classes import HealthMetric
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_cache import MetricCache
+from file_tools.metric_file_parsing import (
+    generate_health_metric_from_file,
+    generate_metric_file,
+    get_metric_file_path,
+    read_metric_file_to_json,
+)
+
+
+def _signature(mtime_ns: int, size: int) -> list:
+    return [".json", mtime_ns, size, 0]
+
+
+class MetricCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = MetricCache(budget_bytes=1000)
+
+    def test_entries_are_only_returned_for_their_signature(self):
+        health_data = {"data": []}
+        self.cache.put("glucose", _signature(1, 100), health_data)
+
+        entry = self.cache.get("glucose", _signature(1, 100))
+        self.assertIs(entry["health_data"], health_data)
+        self.assertIsNone(self.cache.get("glucose", _signature(2, 100)))
+        self.assertIsNone(self.cache.get("glucose", None))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_append_extends_an_up_to_date_entry(self):
+        self.cache.put("glucose", _signature(1, 100), {"data": []}, metric=object())
+
+        self.cache.record_append(
+            "glucose", _signature(1, 100), _signature(2, 150), {"value": 5.5}
+        )
+
+        entry = self.cache.get("glucose", _signature(2, 150))
+        self.assertEqual(entry["health_data"]["data"], [{"value": 5.5}])
+        # The HealthMetric is rebuilt from the extended JSON dict when next needed.
+        self.assertIsNone(entry["metric"])
+        self.assertEqual(self.cache.used_bytes, 150)
+
+    def test_append_drops_a_stale_entry(self):
+        self.cache.put("glucose", _signature(1, 100), {"data": []})
+
+        # Another process changed the metric before this append.
+        self.cache.record_append(
+            "glucose", _signature(3, 120), _signature(4, 170), {"value": 5.5}
+        )
+
+        self.assertIsNone(self.cache.get("glucose", _signature(4, 170)))
+        self.assertEqual(self.cache.used_bytes, 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.put("glucose", _signature(1, 400), {"data": []})
+        self.cache.put("ldl", _signature(1, 400), {"data": []})
+        self.cache.get("glucose", _signature(1, 400))
+
+        self.cache.put("hdl", _signature(1, 400), {"data": []})
+
+        self.assertIsNone(self.cache.get("ldl", _signature(1, 400)))
+        self.assertIsNotNone(self.cache.get("glucose", _signature(1, 400)))
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.cache.used_bytes, 800)
+
+
+class MetricCacheInvalidationTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        metric = HealthMetric("glucose")
+        metric.unit = "mmol/L"
+        generate_metric_file(metric)
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def test_metric_changed_by_another_process_is_reread(self):
+        self.assertIs(
+            generate_health_metric_from_file("glucose"),
+            generate_health_metric_from_file("glucose"),
+        )
+
+        # As written by another process, without going through this one's cache.
+        file_path = get_metric_file_path("glucose")
+        health_data = json.loads(file_path.read_text())
+        health_data["data"].append({"value": 5.5, "date": "2025-01-01T00:00:00"})
+        file_path.write_text(json.dumps(health_data))
+
+        self.assertEqual(len(read_metric_file_to_json("glucose")["data"]), 1)
+        self.assertEqual(len(generate_health_metric_from_file("glucose").entries), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
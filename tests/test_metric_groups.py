@@ -0,0 +1,88 @@
+import unittest
+
+from classes import HealthMetric, MetricGroup
+from global_functions import load_group_manager_from_json
+
+
+class CountingSourcer:
+    """
+    Stands in for `source_metric`, building metrics with the given units and
+    recording which names were loaded.
+    """
+
+    def __init__(self, units: dict[str, str]):
+        self.units = units
+        self.loaded_names: list[str] = []
+
+    def __call__(self, metric_input: list[str]) -> MetricGroup:
+        group = MetricGroup()
+        for metric_name in metric_input:
+            self.loaded_names.append(metric_name)
+            if metric_name in self.units:
+                metric = HealthMetric(metric_name)
+                metric.unit = self.units[metric_name]
+                group.add_metric(metric)
+        return group
+
+
+class LazyMetricGroupTests(unittest.TestCase):
+    def setUp(self):
+        self.sourcer = CountingSourcer(
+            {"glucose": "mmol/L", "ldl": "mmol/L", "weight": "kg"}
+        )
+
+    def test_named_members_load_on_first_use_only(self):
+        group = MetricGroup(unit="mmol/L", metric_sourcer=self.sourcer)
+        group.add_metric_names(["glucose", "ldl", "glucose"])
+
+        self.assertEqual(group.count, 2)
+        self.assertEqual(group.member_names(), ["glucose", "ldl"])
+        self.assertEqual(self.sourcer.loaded_names, [])
+
+        self.assertEqual(
+            [metric.metric_name for metric in group.as_list()], ["glucose", "ldl"]
+        )
+        group.as_list()
+        self.assertEqual(self.sourcer.loaded_names, ["glucose", "ldl"])
+
+    def test_units_are_checked_when_loaded(self):
+        group = MetricGroup(unit="mmol/L", metric_sourcer=self.sourcer)
+        group.add_metric_names(["glucose", "weight", "missing"])
+
+        self.assertEqual(list(group.metric_dict), ["glucose"])
+        self.assertEqual(group.member_names(), ["glucose"])
+
+    def test_loaded_members_are_not_registered_twice(self):
+        group = MetricGroup(metric_sourcer=self.sourcer)
+        glucose = HealthMetric("glucose")
+        group.add_metric(glucose)
+        group.add_metric_names(["glucose", "ldl"])
+
+        self.assertEqual(group.member_names(), ["glucose", "ldl"])
+        self.assertIs(group.metric_dict["glucose"], glucose)
+        self.assertEqual(self.sourcer.loaded_names, ["ldl"])
+
+    def test_names_need_a_sourcer(self):
+        with self.assertRaises(ValueError):
+            MetricGroup().add_metric_names(["glucose"])
+
+    def test_group_manager_loads_without_reading_metrics(self):
+        gm_json = {
+            "group_record": {
+                "lipids": {"unit": "mmol/L", "metric_dict": ["ldl"]},
+                "body": {"unit": "kg", "metric_dict": ["weight"]},
+            }
+        }
+
+        group_manager = load_group_manager_from_json(gm_json, self.sourcer)
+
+        self.assertEqual(self.sourcer.loaded_names, [])
+        self.assertEqual(group_manager.group_sizes, {"lipids": 1, "body": 1})
+        self.assertEqual(
+            group_manager.get_group("body").as_list()[0].metric_name, "weight"
+        )
+        self.assertEqual(self.sourcer.loaded_names, ["weight"])
+
+
+if __name__ == "__main__":
+    unittest.main()
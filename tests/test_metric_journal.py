@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from classes import HealthMetric, Measurement
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_file_parsing import (
+    add_measurement_to_metric_file,
+    fold_journal,
+    generate_health_metric_from_file,
+    generate_metric_file,
+    read_metric_file_to_json,
+)
+from file_tools.metric_journal import journal_path, read_journal
+
+
+class MetricJournalTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        metric = HealthMetric("glucose")
+        metric.unit = "mmol/L"
+        generate_metric_file(metric)
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def _add(self, value: float, day: int):
+        self.assertTrue(
+            add_measurement_to_metric_file(
+                "glucose", Measurement(value, datetime(2025, 1, day))
+            )
+        )
+
+    def _stored_values(self) -> list:
+        return [entry["value"] for entry in read_metric_file_to_json("glucose")["data"]]
+
+    def test_appends_go_to_the_journal(self):
+        self._add(5.5, 1)
+        self._add(6.1, 2)
+
+        stored_data = read_metric_file_to_json("glucose", include_journal=False)["data"]
+        self.assertEqual(stored_data, [])
+        journal_values = [entry["value"] for entry in read_journal("glucose")]
+        self.assertEqual(journal_values, [5.5, 6.1])
+
+        # Reads see every write, whether or not it has been folded.
+        self.assertEqual(self._stored_values(), [5.5, 6.1])
+        self.assertEqual(len(generate_health_metric_from_file("glucose").entries), 2)
+
+    def test_fold_moves_the_journal_into_the_metric_file(self):
+        self._add(5.5, 1)
+        self._add(6.1, 2)
+
+        self.assertEqual(fold_journal("glucose"), 2)
+
+        self.assertFalse(journal_path("glucose").exists())
+        self.assertEqual(
+            read_metric_file_to_json("glucose", include_journal=False)["data"],
+            [
+                {"value": 5.5, "date": "2025-01-01T00:00:00", "unit": "mmol/L"},
+                {"value": 6.1, "date": "2025-01-02T00:00:00", "unit": "mmol/L"},
+            ],
+        )
+        # Nothing is left to fold a second time.
+        self.assertEqual(fold_journal("glucose"), 0)
+
+    def test_partial_final_line_is_skipped_on_replay(self):
+        self._add(5.5, 1)
+        # As left by a crash part way through an append.
+        with open(journal_path("glucose"), "a") as journal_file:
+            journal_file.write('{"value": 6.1, "da')
+
+        self.assertEqual(self._stored_values(), [5.5])
+        self.assertEqual(fold_journal("glucose"), 1)
+        self.assertEqual(len(generate_health_metric_from_file("glucose").entries), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from file_tools.file_locks import atomic_write_bytes
+from file_tools.metric_registry import MetricNameRegistry, modification_time
+
+
+class MetricRegistrySyncTests(unittest.TestCase):
+    def setUp(self):
+        self.store_directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self.store_directory.name)
+        (self.directory / "glucose.json").write_text("{}")
+
+        self.registry = MetricNameRegistry()
+        self.list_count = 0
+
+    def tearDown(self):
+        self.store_directory.cleanup()
+
+    def _list_names(self) -> list[str]:
+        self.list_count += 1
+        return [path.stem for path in self.directory.iterdir()]
+
+    def _sync(self):
+        self.registry.sync(
+            self.directory, modification_time(self.directory), self._list_names
+        )
+
+    def _touch_directory(self):
+        # Coarse modification times may not notice a change made straight away.
+        stat = self.directory.stat()
+        os.utime(self.directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_own_writes_do_not_relist(self):
+        self._sync()
+
+        with self.registry.own_write(self.directory):
+            atomic_write_bytes(self.directory / "glucose.json", b"{}")
+            self._touch_directory()
+        self._sync()
+
+        self.assertEqual(self.list_count, 1)
+        self.assertEqual(self.registry.names(), ["glucose"])
+
+    def test_other_changes_relist(self):
+        self._sync()
+
+        (self.directory / "ldl.json").write_text("{}")
+        self._touch_directory()
+        self._sync()
+
+        self.assertEqual(self.list_count, 2)
+        self.assertEqual(self.registry.names(), ["glucose", "ldl"])
+
+    def test_own_write_out_of_sync_still_relists(self):
+        self._sync()
+        (self.directory / "ldl.json").write_text("{}")
+        self._touch_directory()
+
+        # The registry was already stale, so the write mustn't hide the new metric.
+        with self.registry.own_write(self.directory):
+            atomic_write_bytes(self.directory / "glucose.json", b"{}")
+        self._sync()
+
+        self.assertIn("ldl", self.registry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import unittest
+
+from file_tools.filepaths import FILE_DIR_PATH, FILE_VERS
+from file_tools.metric_file_parsing import (
+    MIGRATION_REPORT_PATH,
+    migrate_store,
+    read_metric_file_to_json,
+)
+from file_tools.migrations import MIGRATION_STEPS, migrate_health_data
+
+
+def _version_5_metric() -> dict:
+    return {
+        "metric_name": "glucose",
+        "metric_type": "ranged",
+        "metric_guide": "(4.0, 7.0)",
+        "file_version": 5,
+        "data": [{"value": 5.5, "metric_date": "2025-01-01T00:00:00"}],
+    }
+
+
+class MigrationStepTests(unittest.TestCase):
+    def test_every_supported_version_has_a_step(self):
+        self.assertEqual(sorted(MIGRATION_STEPS), list(range(4, FILE_VERS)))
+
+    def test_steps_upgrade_to_the_current_layout(self):
+        health_data = _version_5_metric()
+
+        self.assertEqual(migrate_health_data(health_data), list(range(5, FILE_VERS)))
+        self.assertEqual(
+            health_data,
+            {
+                "metric_name": "glucose",
+                "metric_type": "ranged",
+                "metric_guide": [4.0, 7.0],
+                "file_version": FILE_VERS,
+                "data": [{"value": 5.5, "date": "2025-01-01T00:00:00"}],
+                "unit": None,
+            },
+        )
+
+    def test_current_files_are_left_alone(self):
+        health_data = _version_5_metric()
+        migrate_health_data(health_data)
+        migrated_data = json.loads(json.dumps(health_data))
+
+        self.assertEqual(migrate_health_data(health_data), [])
+        self.assertEqual(health_data, migrated_data)
+
+    def test_unsupported_versions_are_rejected(self):
+        for file_version in (3, FILE_VERS + 1, "9"):
+            with self.subTest(file_version=file_version):
+                with self.assertRaises(ValueError):
+                    migrate_health_data({"file_version": file_version, "data": []})
+
+    def test_non_literal_guides_are_kept(self):
+        health_data = {"metric_guide": "Generic Metric", "file_version": 5, "data": []}
+        migrate_health_data(health_data)
+        self.assertEqual(health_data["metric_guide"], "Generic Metric")
+
+
+class MigrateStoreTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        (FILE_DIR_PATH / "glucose.json").write_text(json.dumps(_version_5_metric()))
+        (FILE_DIR_PATH / "broken.json").write_text(
+            json.dumps({"metric_name": "broken", "file_version": 2, "data": []})
+        )
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def test_dry_run_reports_without_writing(self):
+        report = migrate_store(dry_run=True, workers=2)
+
+        self.assertEqual(report["counts"], {"would_migrate": 1, "failed": 1})
+        stored_data = json.loads((FILE_DIR_PATH / "glucose.json").read_text())
+        self.assertEqual(stored_data["file_version"], 5)
+
+    def test_outdated_files_are_rewritten(self):
+        report = migrate_store(workers=2)
+
+        self.assertEqual(report["counts"], {"migrated": 1, "failed": 1})
+        self.assertEqual(
+            json.loads(MIGRATION_REPORT_PATH.read_text())["counts"], report["counts"]
+        )
+        stored_data = read_metric_file_to_json("glucose")
+        self.assertEqual(stored_data["file_version"], FILE_VERS)
+        self.assertEqual(stored_data["data"][0]["date"], "2025-01-01T00:00:00")
+
+        # Nothing is left to migrate.
+        report = migrate_store(workers=2)
+        self.assertEqual(report["counts"], {"current": 1, "failed": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from classes import (
+    BooleanMetric,
+    GreaterThanMetric,
+    InequalityMeasurement,
+    InequalityType,
+    LessThanMetric,
+    Measurement,
+    RangedMetric,
+)
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_catalog import metric_catalog
+from file_tools.metric_file_parsing import (
+    add_measurement_to_metric_file,
+    generate_metric_file,
+    get_metric_catalog,
+    refresh_catalog_entry,
+)
+
+
+def _random_measurements(seed: int, count: int = 300) -> list[Measurement]:
+    """
+    Returns measurements of every kind, with values landing on and around the guides
+    of the metrics below, in no particular date order.
+    """
+    generator = random.Random(seed)
+    measurements = []
+
+    for _ in range(count):
+        date = datetime(2025, 1, 1) + timedelta(days=generator.randrange(365))
+        value = generator.choice([3, 4, 5, 7, 8, 4.0, 7.0, 5.5, 2.5, 9.5])
+        kind = generator.randrange(5)
+
+        if kind == 0:
+            inequality = generator.choice(list(InequalityType))
+            measurements.append(InequalityMeasurement(float(value), inequality, date))
+        elif kind == 1:
+            measurements.append(Measurement(generator.random() < 0.5, date))
+        elif kind == 2:
+            measurements.append(Measurement("positive", date))
+        else:
+            measurements.append(Measurement(value, date))
+
+    return measurements
+
+
+def _metrics() -> list:
+    return [
+        RangedMetric("ranged", 4, 7),
+        GreaterThanMetric("greater", 4),
+        LessThanMetric("less", 7),
+        BooleanMetric("boolean", False),
+    ]
+
+
+class OoREngineTests(unittest.TestCase):
+    def test_incremental_counters_match_a_full_recount(self):
+        for seed in range(5):
+            measurements = _random_measurements(seed)
+
+            for incremental_metric, recounted_metric in zip(_metrics(), _metrics()):
+                with self.subTest(seed=seed, metric=incremental_metric.metric_name):
+                    for measurement in measurements:
+                        incremental_metric.add_entry(measurement)
+
+                    for measurement in measurements:
+                        recounted_metric.entries.append(measurement)
+                    recounted_metric.recount_oor()
+
+                    self.assertEqual(
+                        incremental_metric.oor_count, recounted_metric.oor_count
+                    )
+                    self.assertEqual(
+                        incremental_metric.latest_oor_date,
+                        recounted_metric.latest_oor_date,
+                    )
+
+    def test_engine_matches_checking_each_measurement(self):
+        measurements = _random_measurements(seed=0)
+
+        for metric in _metrics():
+            with self.subTest(metric=metric.metric_name):
+                expected_values = []
+                for measurement in measurements:
+                    metric.entries.append(measurement)
+                    try:
+                        if metric.value_is_out_of_range(measurement):
+                            expected_values.append(str(measurement))
+                    except TypeError:
+                        pass
+
+                self.assertEqual(
+                    [str(measurement) for measurement in metric.get_all_OoR_values()],
+                    expected_values,
+                )
+
+
+class CatalogOoRCounterTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        generate_metric_file(RangedMetric("glucose", 4, 7))
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def test_appended_counters_match_a_rebuild(self):
+        get_metric_catalog()
+        for measurement in _random_measurements(seed=1, count=40):
+            add_measurement_to_metric_file("glucose", measurement)
+
+        appended_entry = dict(metric_catalog.get("glucose"))
+        rebuilt_entry = refresh_catalog_entry("glucose")
+
+        self.assertGreater(rebuilt_entry["oor_count"], 0)
+        for key in ("oor_count", "latest_oor_date", "entry_count", "first_date"):
+            self.assertEqual(appended_entry[key], rebuilt_entry[key], key)
+
+
+if __name__ == "__main__":
+    unittest.main()
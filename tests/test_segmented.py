@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from file_tools.segmented import (
+    append_segmented,
+    read_segmented_to_json,
+    segment_dir,
+    write_segmented,
+)
+
+
+def _health_data(data: list[dict]) -> dict:
+    return {
+        "metric_name": "glucose",
+        "metric_type": "metric",
+        "metric_guide": None,
+        "unit": "mmol/L",
+        "file_version": 9,
+        "data": data,
+    }
+
+
+class SegmentedLayoutTests(unittest.TestCase):
+    def setUp(self):
+        # Segments are kept in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+
+        self.manifest_path = Path("glucose.segments")
+        self.data = [
+            {"value": 5.0, "date": "2023-06-01T00:00:00"},
+            {"value": 5.5, "date": "2024-01-01T00:00:00"},
+            {"value": 6.0, "date": "2024-12-31T23:59:59"},
+            {"value": 6.5, "date": "2025-03-01T00:00:00"},
+            {"value": 7.0, "date": None},
+        ]
+        segment_count = write_segmented(self.manifest_path, _health_data(self.data))
+        self.assertEqual(segment_count, 4)
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def _values(self, since=None, until=None) -> list[float]:
+        health_data = read_segmented_to_json(self.manifest_path, since, until)
+        return [entry["value"] for entry in health_data["data"]]
+
+    def test_segments_read_back_as_written(self):
+        self.assertEqual(
+            read_segmented_to_json(self.manifest_path), _health_data(self.data)
+        )
+        self.assertEqual(
+            sorted(path.name for path in segment_dir(self.manifest_path).iterdir()),
+            ["2023.json", "2024.json", "2025.json", "undated.json"],
+        )
+
+    def test_range_reads_only_open_overlapping_segments(self):
+        self.assertEqual(self._values(since=datetime(2025, 1, 1)), [6.5])
+        # Whole segments are read, so the caller filters to the exact range.
+        self.assertEqual(self._values(until=datetime(2024, 6, 1)), [5.0, 5.5, 6.0])
+        self.assertEqual(
+            self._values(datetime(2024, 12, 31, 23, 59, 59), datetime(2025, 1, 1)),
+            [5.5, 6.0],
+        )
+
+    def test_rewrites_and_appends_only_touch_changed_segments(self):
+        self.data[3]["value"] = 8.0
+        segment_count = write_segmented(self.manifest_path, _health_data(self.data))
+        self.assertEqual(segment_count, 1)
+
+        new_entry = {"value": 9.0, "date": "2025-04-01T00:00:00"}
+        self.assertEqual(append_segmented(self.manifest_path, [new_entry]), 1)
+        self.assertEqual(self._values(), [5.0, 5.5, 6.0, 8.0, 9.0, 7.0])
+
+        # A segment left with no entries is removed.
+        self.assertEqual(
+            write_segmented(self.manifest_path, _health_data(self.data[1:])), 1
+        )
+        self.assertFalse((segment_dir(self.manifest_path) / "2023.json").exists())
+        self.assertEqual(self._values(), [5.5, 6.0, 8.0, 7.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import random
+import string
+import unittest
+from difflib import SequenceMatcher
+
+from utils.sequence_matcher import NameMatcher, get_closest_matches
+
+
+def _scan_closest_matches(
+    candidate_string: str, possible_strings: list[str], number_of_results: int
+) -> list[str]:
+    # Every string scored, best first, with ties in the order given.
+    scored = [
+        (-SequenceMatcher(None, candidate_string, possible).ratio(), position)
+        for position, possible in enumerate(possible_strings)
+    ]
+    return [possible_strings[position] for _, position in sorted(scored)][
+        :number_of_results
+    ]
+
+
+def _random_names(generator: random.Random, count: int) -> list[str]:
+    alphabet = string.ascii_lowercase[:8] + "_"
+    return sorted(
+        {
+            "".join(generator.choice(alphabet) for _ in range(generator.randint(1, 12)))
+            for _ in range(count)
+        }
+    )
+
+
+def _misspell(generator: random.Random, name: str) -> str:
+    characters = list(name)
+    for _ in range(generator.randint(0, 3)):
+        position = generator.randrange(len(characters) + 1)
+        edit = generator.randrange(3)
+        if edit == 0 or not characters:
+            characters.insert(position, generator.choice("abcxyz_"))
+        elif edit == 1:
+            characters.pop(min(position, len(characters) - 1))
+        else:
+            characters[min(position, len(characters) - 1)] = generator.choice("abxyz")
+    return "".join(characters)
+
+
+class NameMatcherTests(unittest.TestCase):
+    def test_matches_agree_with_a_full_scan(self):
+        generator = random.Random(0)
+        names = _random_names(generator, 150)
+        matcher = NameMatcher(names)
+
+        queries = [_misspell(generator, generator.choice(names)) for _ in range(80)]
+        queries += ["", "zzz", names[0], "x" * 30]
+
+        for query in queries:
+            for number_of_results in (1, 3, 10):
+                with self.subTest(query=query, number_of_results=number_of_results):
+                    expected = _scan_closest_matches(query, names, number_of_results)
+                    self.assertEqual(
+                        get_closest_matches(query, names, number_of_results), expected
+                    )
+                    self.assertEqual(
+                        matcher.closest_matches(query, number_of_results), expected
+                    )
+
+    def test_ties_are_ranked_by_name(self):
+        names = ["ab", "bc", "cd"]
+        self.assertEqual(NameMatcher(reversed(names)).closest_matches("b", 3), names)
+        self.assertEqual(get_closest_matches("b", names, 3), names)
+
+    def test_added_and_removed_names(self):
+        matcher = NameMatcher(["glucose", "ldl"])
+        matcher.add("hdl")
+        matcher.add("hdl")
+        matcher.remove("ldl")
+        matcher.remove("missing")
+
+        self.assertEqual(len(matcher), 2)
+        self.assertEqual(matcher.closest_matches("ldl", 5), ["hdl", "glucose"])
+        self.assertEqual(matcher.closest_matches("ldl", 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
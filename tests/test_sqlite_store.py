@@ -0,0 +1,95 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from file_tools.sqlite_store import SQLiteMetricStore
+
+
+def _health_data(metric_name: str, values: list[float]) -> dict:
+    return {
+        "metric_name": metric_name,
+        "metric_type": "metric",
+        "metric_guide": None,
+        "unit": "mmol/L",
+        "file_version": 1,
+        "data": [
+            {"value": value, "date": f"2025-01-0{day}T00:00:00"}
+            for day, value in enumerate(values, start=1)
+        ],
+    }
+
+
+class SQLiteSignatureTests(unittest.TestCase):
+    def setUp(self):
+        self.store_directory = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.store_directory.name) / "metric_store.sqlite3"
+        self.store = SQLiteMetricStore(self.db_path)
+        self.store.write_json("glucose", _health_data("glucose", [5.5, 6.1]))
+        self.store.write_json("ldl", _health_data("ldl", [2.0]))
+
+    def tearDown(self):
+        self.store.connection.close()
+        self.store_directory.cleanup()
+
+    def test_signature_changes_only_with_its_metric(self):
+        glucose_signature = self.store.signature("glucose")
+        ldl_signature = self.store.signature("ldl")
+
+        self.store.append("glucose", {"value": 7.0, "date": "2025-01-05T00:00:00"})
+
+        self.assertNotEqual(self.store.signature("glucose"), glucose_signature)
+        self.assertEqual(self.store.signature("ldl"), ldl_signature)
+        self.assertIsNone(self.store.signature("hdl"))
+
+    def test_signature_seen_by_other_connections(self):
+        other_store = SQLiteMetricStore(self.db_path)
+        signature = other_store.signature("glucose")
+
+        self.store.append("glucose", {"value": 7.0, "date": "2025-01-05T00:00:00"})
+
+        self.assertNotEqual(other_store.signature("glucose"), signature)
+        other_store.connection.close()
+
+    def test_append_returns_signatures_around_its_own_write(self):
+        other_store = SQLiteMetricStore(self.db_path)
+        other_store.append("glucose", {"value": 6.5, "date": "2025-01-04T00:00:00"})
+        signature = self.store.signature("glucose")
+
+        previous_signature, new_signature = self.store.append(
+            "glucose", {"value": 7.0, "date": "2025-01-05T00:00:00"}
+        )
+
+        self.assertEqual(previous_signature, signature)
+        self.assertEqual(new_signature, self.store.signature("glucose"))
+        self.assertFalse(self.store.connection.in_transaction)
+        other_store.connection.close()
+
+    def test_entries_between(self):
+        entries = self.store.read_entries_between(
+            "glucose", since=datetime(2025, 1, 2), until=datetime(2025, 1, 31)
+        )
+        self.assertEqual([entry["value"] for entry in entries], [6.1])
+
+    def test_signature_columns_added_to_older_database(self):
+        self.store.connection.close()
+        older_path = Path(self.store_directory.name) / "older.sqlite3"
+        with sqlite3.connect(older_path) as connection:
+            connection.executescript(
+                "CREATE TABLE metrics "
+                "(metric_name TEXT PRIMARY KEY, header TEXT NOT NULL);"
+                "CREATE TABLE measurements (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "metric_name TEXT NOT NULL, date TEXT, entry TEXT NOT NULL);"
+                "INSERT INTO metrics VALUES ('glucose', '{}');"
+                "INSERT INTO measurements (metric_name, date, entry) "
+                "VALUES ('glucose', '2025-01-01T00:00:00', '{\"value\": 5.5}');"
+            )
+        connection.close()
+
+        self.store = SQLiteMetricStore(older_path)
+        self.assertEqual(self.store.signature("glucose"), [".sqlite3", 0, 14, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from unittest import mock
+
+from utils.utils import generic_hll_function
+
+
+class TerminalArgumentTests(unittest.TestCase):
+    def _run_terminal(self, lines: list[str]) -> list[tuple[str, list[str]]]:
+        calls = []
+        sub_func_map = {
+            name: (lambda arguments, name=name: calls.append((name, arguments)))
+            for name in ("import", "read_metric")
+        }
+        with mock.patch("utils.utils.prompt_user", side_effect=lines + ["exit"]):
+            generic_hll_function(
+                sub_func_map=sub_func_map,
+                hll_name="test",
+                path_functions=("import",),
+            )
+        return calls
+
+    def test_arguments_are_lowercased_once_except_paths(self):
+        calls = self._run_terminal(
+            ["IMPORT Panels/Glucose.CSV STRICT", "Read_Metric GLUCOSE Hdl"]
+        )
+
+        self.assertEqual(
+            calls,
+            [
+                ("import", ["Panels/Glucose.CSV", "strict"]),
+                ("read_metric", ["glucose", "hdl"]),
+            ],
+        )
+
+    def test_misspelt_functions_keep_their_paths(self):
+        calls = self._run_terminal(["imprt Glucose.CSV", "imprt"])
+
+        self.assertEqual(calls, [("import", ["Glucose.CSV"]), ("import", [])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from file_tools.store_settings import load_store_settings
+from file_tools.typo_aliases import TypoAliasMemory
+
+
+class TypoAliasMemoryTests(unittest.TestCase):
+    def setUp(self):
+        self.store_directory = tempfile.TemporaryDirectory()
+        self.aliases_path = Path(self.store_directory.name) / "typo_aliases.json"
+        self.aliases = TypoAliasMemory(self.aliases_path)
+
+    def tearDown(self):
+        self.store_directory.cleanup()
+
+    def test_counts_rise_until_resolved_elsewhere(self):
+        self.aliases.record("glucsoe", "glucose")
+        self.aliases.record("glucsoe", "glucose")
+        self.assertEqual(self.aliases.get("glucsoe")["count"], 2)
+
+        self.aliases.record("glucsoe", "glucose_fasting")
+        self.assertEqual(self.aliases.get("glucsoe")["metric_name"], "glucose_fasting")
+        self.assertEqual(self.aliases.get("glucsoe")["count"], 1)
+        self.assertIsNone(self.aliases.get("ldl"))
+
+    def test_aliases_are_persisted(self):
+        self.aliases.record("glucsoe", "glucose")
+        self.aliases.record("hld", "hdl")
+        self.aliases.forget("hld")
+
+        reloaded_aliases = TypoAliasMemory(self.aliases_path)
+        self.assertEqual(reloaded_aliases.get("glucsoe")["metric_name"], "glucose")
+        self.assertIsNone(reloaded_aliases.get("hld"))
+
+    def test_least_recently_used_are_evicted(self):
+        with mock.patch.dict(load_store_settings(), {"typo_alias_capacity": 2}):
+            self.aliases.record("glucsoe", "glucose")
+            self.aliases.record("hld", "hdl")
+            # Used again, so no longer the least recently used.
+            self.aliases.record("glucsoe", "glucose")
+            self.aliases.record("lld", "ldl")
+
+        self.assertEqual(list(self.aliases.aliases), ["glucsoe", "lld"])
+
+    def test_renamed_metrics_are_forgotten(self):
+        self.aliases.record("glucsoe", "glucose")
+        self.aliases.record("glcose", "glucose")
+        self.aliases.record("hld", "hdl")
+
+        self.assertEqual(self.aliases.forget_metric("glucose"), 2)
+        self.assertEqual(list(TypoAliasMemory(self.aliases_path).aliases), ["hld"])
+
+    def test_unreadable_or_other_version_files_start_afresh(self):
+        for content in ("{not json", json.dumps({"version": 99, "aliases": {"a": {}}})):
+            with self.subTest(content=content):
+                self.aliases_path.write_text(content)
+                self.assertEqual(TypoAliasMemory(self.aliases_path).aliases, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from classes import HealthMetric, Measurement
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_file_parsing import (
+    add_measurement_to_metric_file,
+    add_measurements_to_metric_file,
+    fold_journal,
+    generate_metric_file,
+    read_metric_file_to_json,
+)
+
+METRIC_NAME = "contention"
+WRITER_COUNT = 4
+APPEND_COUNT = 100
+
+
+def _create_metric(directory: str):
+    os.chdir(directory)
+    FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+    metric = HealthMetric(METRIC_NAME)
+    metric.unit = "kg"
+    generate_metric_file(metric)
+
+
+def _append(directory: str, writer: int):
+    """
+    Append measurements one at a time, in batches, and with folds in between, so
+    every write path contends with the other writers.
+    """
+    os.chdir(directory)
+    start_date = datetime(2000, 1, 1) + timedelta(days=writer * APPEND_COUNT)
+    for index in range(APPEND_COUNT):
+        measurement = Measurement(
+            writer * APPEND_COUNT + index, start_date + timedelta(days=index)
+        )
+        if index % 20 == 0:
+            add_measurements_to_metric_file(METRIC_NAME, [measurement])
+        else:
+            add_measurement_to_metric_file(METRIC_NAME, measurement)
+        if index % 10 == 5:
+            fold_journal(METRIC_NAME)
+
+
+def _stored_values(directory: str) -> list:
+    os.chdir(directory)
+    return [entry["value"] for entry in read_metric_file_to_json(METRIC_NAME)["data"]]
+
+
+class WriteContentionTests(unittest.TestCase):
+    def test_concurrent_writers_lose_no_appends(self):
+        # Writers are started fresh, so they don't share this process's caches.
+        pool_context = multiprocessing.get_context("spawn")
+        with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(
+            max_workers=WRITER_COUNT, mp_context=pool_context
+        ) as pool:
+            pool.submit(_create_metric, directory).result()
+            writes = [
+                pool.submit(_append, directory, writer)
+                for writer in range(WRITER_COUNT)
+            ]
+            for write in writes:
+                write.result()
+            values = pool.submit(_stored_values, directory).result()
+
+        self.assertEqual(sorted(values), list(range(WRITER_COUNT * APPEND_COUNT)))
+
+
+if __name__ == "__main__":
+    unittest.main()
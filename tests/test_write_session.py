@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from classes import HealthMetric, Measurement
+from data.write_session import WRITE_SESSION_RECOVERY_DIR, WriteSession
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_file_parsing import generate_metric_file, read_metric_file_to_json
+
+
+def _crash_with_pending_measurements(directory: str):
+    os.chdir(directory)
+    write_session = WriteSession()
+    write_session.add("glucose", Measurement(5.5, datetime(2025, 1, 1)))
+    write_session.add("glucose", Measurement(6.1, datetime(2025, 1, 2)))
+    # Ends without flushing, as a crash would.
+    os._exit(1)
+
+
+class WriteSessionTests(unittest.TestCase):
+    def setUp(self):
+        # The metric store lives in the working directory.
+        self.original_directory = os.getcwd()
+        self.store_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.store_directory.name)
+        FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+        metric = HealthMetric("glucose")
+        metric.unit = "mmol/L"
+        generate_metric_file(metric)
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        self.store_directory.cleanup()
+
+    def _stored_values(self) -> list:
+        return [entry["value"] for entry in read_metric_file_to_json("glucose")["data"]]
+
+    def test_crashed_session_is_recovered_once(self):
+        crashing_process = multiprocessing.get_context("spawn").Process(
+            target=_crash_with_pending_measurements, args=(self.store_directory.name,)
+        )
+        crashing_process.start()
+        crashing_process.join()
+        self.assertEqual(self._stored_values(), [])
+
+        write_session = WriteSession()
+        self.assertEqual(self._stored_values(), [5.5, 6.1])
+        write_session.close()
+
+        # The recovered measurements were cleared, so aren't written again.
+        WriteSession().close()
+        self.assertEqual(self._stored_values(), [5.5, 6.1])
+        self.assertEqual(list(WRITE_SESSION_RECOVERY_DIR.iterdir()), [])
+
+    def test_concurrent_sessions_keep_their_own_measurements(self):
+        first_session = WriteSession()
+        first_session.add("glucose", Measurement(5.5, datetime(2025, 1, 1)))
+
+        # Starting a session doesn't replay a running session's measurements, and
+        # flushing one doesn't clear the other's recovery file.
+        second_session = WriteSession()
+        second_session.add("glucose", Measurement(6.1, datetime(2025, 1, 2)))
+        second_session.flush()
+        second_session.close()
+        self.assertEqual(self._stored_values(), [6.1])
+        self.assertEqual(
+            list(WRITE_SESSION_RECOVERY_DIR.iterdir()), [first_session.recovery_path]
+        )
+
+        first_session.flush()
+        first_session.close()
+        self.assertEqual(sorted(self._stored_values()), [5.5, 6.1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,433 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+
+from classes import (
+    HealthMetric,
+    InequalityValue,
+    Measurement,
+    MeasurementSeries,
+    RangedMetric,
+)
+from data.oor_engine import oor_count
+from file_tools.date_codec import date_to_epoch, decode_date_epoch
+from file_tools.filepaths import FILE_DIR_PATH
+from file_tools.metric_file_parsing import (
+    add_measurement_to_metric_file,
+    add_measurements_to_metric_file,
+    fold_journal,
+    generate_metric_file,
+    read_metric_file_to_json,
+)
+from utils.value_kinds import is_inequality_value_str
+from utils.sequence_matcher import NameMatcher, get_closest_matches
+from utils.startup_profile import STARTUP_IMPORT, profile_imports, total_import_us
+
+"""
+Micro-benchmarks for the data structures behind the metric store. These are run from
+the analyse terminal with `benchmark`, optionally followed by the names of the
+benchmarks to run, and use synthetic data so the metric store isn't touched.
+"""
+
+BENCHMARK_MEASUREMENT_COUNT = 100_000
+BENCHMARK_NAME_COUNT = 10_000
+
+
+class _ObjectMeasurement:
+    """
+    A measurement stored as a plain object, as each point was before MeasurementSeries.
+    """
+
+    def __init__(self, value, date, unit=None, inequality=None):
+        self.value = value
+        self.date = date
+        self.unit = unit
+        self.inequality = inequality
+
+
+def _synthetic_points(count: int) -> list[dict]:
+    """
+    Returns `count` metric file entries, as they would be read from a metric file.
+    """
+    start_date = datetime(2000, 1, 1)
+    return [
+        {
+            "date": (start_date + timedelta(days=index)).isoformat(),
+            "value": f"<{index % 50}" if index % 25 == 0 else 4.0 + (index % 50) / 10,
+            "unit": "mmol/L",
+        }
+        for index in range(count)
+    ]
+
+
+def _measure(build: callable) -> tuple[float, int, object]:
+    """
+    Returns the time taken by `build()`, the memory it allocated, and its result.
+    Timing and memory are measured on separate runs, as tracing slows allocation.
+    """
+    start_time = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    result = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, allocated, result
+
+
+def benchmark_measurement_series(count: int = BENCHMARK_MEASUREMENT_COUNT):
+    """
+    Compare loading `count` metric file entries into a MeasurementSeries against
+    loading them as a list of measurement objects, as the metric loader used to.
+    """
+    points = _synthetic_points(count)
+
+    def build_objects():
+        measurements = []
+        for data_point in points:
+            value = data_point["value"]
+            if is_inequality_value_str(value):
+                parsed_value = InequalityValue(value)
+                measurements.append(
+                    _ObjectMeasurement(
+                        parsed_value.value,
+                        data_point["date"],
+                        data_point.get("unit"),
+                        parsed_value.inequality_type,
+                    )
+                )
+            else:
+                measurements.append(
+                    _ObjectMeasurement(value, data_point["date"], data_point.get("unit"))
+                )
+        return measurements
+
+    def build_series():
+        series = MeasurementSeries()
+        series.extend_from_json(points)
+        return series
+
+    object_time, object_bytes, _ = _measure(build_objects)
+    series_time, series_bytes, series = _measure(build_series)
+
+    start_time = time.perf_counter()
+    sum(1 for _ in series)
+    iteration_time = time.perf_counter() - start_time
+
+    print(f"\nMeasurementSeries ({count} measurements):")
+    print(
+        f" - objects: {object_time:.3f}s to build, {object_bytes / count:.1f} bytes/measurement"
+    )
+    print(
+        f" - series:  {series_time:.3f}s to build, {series_bytes / count:.1f} bytes/measurement"
+    )
+    print(f" - series iteration (building views): {iteration_time:.3f}s")
+
+
+def benchmark_oor_engine(count: int = BENCHMARK_MEASUREMENT_COUNT):
+    """
+    Compare counting a metric's Out of Range measurements with the OoR engine against
+    calling `value_is_out_of_range()` for each measurement.
+    """
+    metric = RangedMetric("benchmark", range_minimum=5.0, range_maximum=8.0)
+    metric.entries.extend_from_json(_synthetic_points(count))
+
+    start_time = time.perf_counter()
+    dispatch_count = sum(
+        1 for measurement in metric.entries if metric.value_is_out_of_range(measurement)
+    )
+    dispatch_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    engine_count = oor_count(metric)
+    engine_time = time.perf_counter() - start_time
+
+    print(f"\nOoR evaluation ({count} measurements):")
+    print(f" - per measurement: {dispatch_time:.4f}s ({dispatch_count} OoR)")
+    print(f" - OoR engine:      {engine_time:.4f}s ({engine_count} OoR)")
+
+
+def benchmark_date_codec(count: int = BENCHMARK_MEASUREMENT_COUNT):
+    """
+    Compare decoding `count` ISO and DDMMYYYY date strings to epoch seconds with the
+    date codec, against `datetime.fromisoformat` and `datetime.strptime`. The codec
+    is timed both cold (an empty cache) and warm (every string seen before).
+    """
+    start_date = datetime(2000, 1, 1)
+    dates = [start_date + timedelta(days=index % 7300) for index in range(count)]
+    formats = {
+        "ISO": ([date.isoformat() for date in dates], datetime.fromisoformat),
+        "DDMMYYYY": (
+            [date.strftime("%d%m%Y") for date in dates],
+            lambda date_str: datetime.strptime(date_str, "%d%m%Y"),
+        ),
+    }
+
+    def time_decoding(decode: callable, date_strs: list[str]) -> float:
+        start_time = time.perf_counter()
+        for date_str in date_strs:
+            decode(date_str)
+        return time.perf_counter() - start_time
+
+    print(f"\nDate decoding ({count} strings, {len(set(dates))} distinct):")
+    for format_name, (date_strs, standard_parse) in formats.items():
+        standard_time = time_decoding(
+            lambda date_str: date_to_epoch(standard_parse(date_str)), date_strs
+        )
+        decode_date_epoch.cache_clear()
+        cold_time = time_decoding(decode_date_epoch, date_strs)
+        warm_time = time_decoding(decode_date_epoch, date_strs)
+
+        print(f" - {format_name}:")
+        print(f"    - standard library: {standard_time:.3f}s")
+        print(f"    - codec (cold):     {cold_time:.3f}s")
+        print(f"    - codec (warm):     {warm_time:.3f}s")
+
+
+def benchmark_date_range(count: int = BENCHMARK_MEASUREMENT_COUNT):
+    """
+    Compare finding a metric's measurements within a month by scanning every
+    measurement, against `HealthMetric.between()` and its date index.
+    """
+    metric = HealthMetric("benchmark")
+    metric.entries.extend_from_json(_synthetic_points(count))
+    since, until = datetime(2010, 1, 1), datetime(2010, 1, 31)
+    query_count = 10
+
+    start_time = time.perf_counter()
+    for _ in range(query_count):
+        scan_result = [
+            measurement
+            for measurement in metric.entries
+            if since <= measurement.date <= until
+        ]
+    scan_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    metric.entries.date_order()
+    index_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(query_count):
+        indexed_result = metric.between(since, until)
+    query_time = time.perf_counter() - start_time
+
+    print(f"\nDate range queries ({query_count} queries over {count} measurements):")
+    print(f" - scan:    {scan_time:.3f}s ({len(scan_result)} measurements each)")
+    print(f" - indexed: {query_time:.4f}s ({len(indexed_result)} measurements each)")
+    print(f"   (building the date index once: {index_time:.3f}s)")
+
+
+def _synthetic_names(count: int) -> list[str]:
+    """
+    Returns `count` distinct metric names, built from words found in lab reports.
+    """
+    words = (
+        "blood serum plasma urine total free hdl ldl glucose fasting cholesterol "
+        "ferritin iron sodium potassium calcium vitamin b12 folate tsh t4 alt ast "
+        "creatinine urea albumin protein weight systolic diastolic heart rate"
+    ).split()
+    generator = random.Random(0)
+    names = set()
+    while len(names) < count:
+        names.add("_".join(generator.sample(words, generator.randint(1, 3))))
+
+    return sorted(names)
+
+
+def _misspell(name: str, generator: random.Random) -> str:
+    characters = list(name)
+    for _ in range(2):
+        characters[generator.randrange(len(characters))] = generator.choice("aeiouxz_")
+    return "".join(characters)
+
+
+def benchmark_name_matching(count: int = BENCHMARK_NAME_COUNT):
+    """
+    Compare finding the 3 closest of `count` metric names to misspelt names with a
+    SequenceMatcher scan over every name (as matching used to), against
+    `get_closest_matches()` and a NameMatcher index.
+    """
+    names = _synthetic_names(count)
+    generator = random.Random(1)
+    queries = [_misspell(generator.choice(names), generator) for _ in range(20)]
+
+    def scan_closest_matches(candidate_string: str) -> list[str]:
+        ranks = {
+            SequenceMatcher(None, candidate_string, possible).ratio(): possible
+            for possible in names
+        }
+        return [value for _, value in sorted(ranks.items(), reverse=True)][:3]
+
+    start_time = time.perf_counter()
+    scan_results = [scan_closest_matches(query) for query in queries]
+    scan_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    pruned_results = [get_closest_matches(query, names, 3) for query in queries]
+    pruned_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    matcher = NameMatcher(names)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    indexed_results = [matcher.closest_matches(query, 3) for query in queries]
+    indexed_time = time.perf_counter() - start_time
+
+    # The scan keeps only one name per ratio, so may differ where names tie.
+    differing_count = sum(
+        scan_result[0] != indexed_result[0]
+        for scan_result, indexed_result in zip(scan_results, indexed_results)
+    )
+
+    print(f"\nName matching ({len(queries)} misspelt names against {count} names):")
+    print(f" - scan:    {scan_time / len(queries) * 1000:.2f}ms per name")
+    print(f" - pruned:  {pruned_time / len(queries) * 1000:.2f}ms per name")
+    print(f" - indexed: {indexed_time / len(queries) * 1000:.2f}ms per name")
+    print(f"   (building the index once: {build_time:.3f}s)")
+    print(
+        f" - pruned and indexed results agree: {pruned_results == indexed_results}, "
+        f"best match differs from the scan (ties) for {differing_count} names"
+    )
+
+
+def _contention_setup(directory: str, metric_name: str):
+    """
+    Create an empty metric in a scratch store, in a worker process.
+    """
+    os.chdir(directory)
+    FILE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+    metric = HealthMetric(metric_name)
+    metric.unit = "kg"
+    generate_metric_file(metric)
+
+
+def _contention_writer(directory: str, metric_name: str, writer: int, count: int):
+    """
+    Append `count` measurements to a scratch store's metric, in a worker process.
+    Measurements go through the journal one at a time, in batches rewriting the
+    metric file, and the journal is folded regularly, so every write path contends.
+    """
+    os.chdir(directory)
+    start_date = datetime(2000, 1, 1) + timedelta(days=writer * count)
+    measurements = [
+        Measurement(writer * count + index, start_date + timedelta(days=index))
+        for index in range(count)
+    ]
+
+    for index in range(0, count, 10):
+        batch = measurements[index : index + 10]
+        if index % 50 == 0:
+            add_measurements_to_metric_file(metric_name, batch)
+            continue
+        for measurement in batch:
+            add_measurement_to_metric_file(metric_name, measurement)
+        if index % 30 == 0:
+            fold_journal(metric_name)
+
+
+def _contention_count(directory: str, metric_name: str) -> tuple[int, int]:
+    """
+    Returns the number of measurements, and distinct measurements, in a scratch
+    store's metric, in a worker process.
+    """
+    os.chdir(directory)
+    values = [entry["value"] for entry in read_metric_file_to_json(metric_name)["data"]]
+    return len(values), len(set(values))
+
+
+def benchmark_write_contention(writer_count: int = 4, count: int = 200):
+    """
+    Have `writer_count` processes append `count` measurements each to the same metric
+    at once, in a scratch store, and check none of the appends were lost.
+    """
+    metric_name = "contention"
+
+    # Workers are started fresh, so the scratch store is kept apart from any store
+    # already loaded by this process.
+    pool_context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(
+        max_workers=writer_count, mp_context=pool_context
+    ) as pool:
+        pool.submit(_contention_setup, directory, metric_name).result()
+
+        start_time = time.perf_counter()
+        writes = [
+            pool.submit(_contention_writer, directory, metric_name, writer, count)
+            for writer in range(writer_count)
+        ]
+        for write in writes:
+            write.result()
+        elapsed = time.perf_counter() - start_time
+
+        count_result = pool.submit(_contention_count, directory, metric_name)
+        total, distinct = count_result.result()
+
+    expected = writer_count * count
+    print(f"\nWrite contention ({writer_count} processes, {count} appends each):")
+    print(f" - {elapsed:.3f}s, {total} of {expected} measurements stored")
+    print(f" - lost appends: {expected - distinct}, duplicated: {total - distinct}")
+
+
+# What startup imported before plotting and the terminals' functions were imported
+# lazily, and the multiprocessing pool when it's used.
+EAGER_STARTUP_IMPORT = (
+    f"{STARTUP_IMPORT}; "
+    "import high_level_functions.manage, high_level_functions.graph, "
+    "high_level_functions.read, high_level_functions.write, data.bulk_export, "
+    "data.bulk_import, data.analysis_tools, utils.benchmarks, "
+    "concurrent.futures.process, utils.plotting; "
+    "utils.plotting.default_template()"
+)
+
+
+def benchmark_startup(runs: int = 5):
+    """
+    Compare the time taken to import the program at startup against importing every
+    terminal's modules and plotly eagerly, as startup used to. Each is imported
+    `runs` times in a fresh interpreter, and the fastest run kept.
+    """
+    lazy_us = min(total_import_us(profile_imports()) for _ in range(runs))
+    eager_us = min(
+        total_import_us(profile_imports(EAGER_STARTUP_IMPORT)) for _ in range(runs)
+    )
+
+    print(f"\nStartup imports (fastest of {runs} runs):")
+    print(f" - eager: {eager_us / 1000:.1f}ms")
+    print(f" - lazy:  {lazy_us / 1000:.1f}ms")
+
+
+BENCHMARKS: dict[str, callable] = {
+    "series": benchmark_measurement_series,
+    "oor": benchmark_oor_engine,
+    "dates": benchmark_date_codec,
+    "range": benchmark_date_range,
+    "contention": benchmark_write_contention,
+    "matching": benchmark_name_matching,
+    "startup": benchmark_startup,
+}
+
+
+def run_benchmarks(arguments: list):
+    """
+    Run benchmarks by name, or all benchmarks if none are named.
+
+    Accepted arguments:
+        Any number of benchmark names.
+    """
+    requested = [name for name in arguments if name in BENCHMARKS] or list(BENCHMARKS)
+
+    for unknown_name in set(arguments) - set(BENCHMARKS):
+        print(f"Unknown benchmark '{unknown_name}', expected one of {list(BENCHMARKS)}.")
+
+    for name in requested:
+        BENCHMARKS[name]()
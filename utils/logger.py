@@ -1,3 +1,4 @@
+import os
 from enum import Enum
 from datetime import datetime
 
@@ -98,6 +99,7 @@ class LogCollector:
             Filepath to the generated file.
         """
         filepath = f"logs/{self.collection_name}.txt"
+        os.makedirs("logs", exist_ok=True)
         with open(filepath, "w") as log_file:
             log_file.write(f"Health Log - {self.collection_id}\n")
             log_file.write(f"File init at {self.init_time}\n\n")
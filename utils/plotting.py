@@ -1,16 +1,27 @@
-from typing import Union
+from datetime import datetime
+from functools import cache
+from typing import Optional, Union
 import plotly.graph_objects as go
 import plotly.io as pio
 
-default_template = pio.templates["plotly_dark"]
+"""
+Plotting of metrics with plotly. Importing plotly is slow, so this module is only
+imported when a graph is built, never at startup.
+"""
 
 BOUND_LINE_COLOUR = "rgba(255,0,0,0.6)"
 BOUND_DASH_SETTING = "dash"
 
 
+@cache
+def default_template() -> go.layout.Template:
+    # Plotly loads its templates from disk when first looked up.
+    return pio.templates["plotly_dark"]
+
+
 def empty_figure():
     figure = go.Figure()
-    figure.layout.template = default_template
+    figure.layout.template = default_template()
     return figure
 
 
@@ -39,6 +50,8 @@ def plot_metrics(
     metric_objects: Union[list, object],
     starting_figure: go.Figure = None,
     show_bounds: bool = True,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
 ):
     """
     Adds lines and shading for multiple metric objects. Objects with the same .unit attribute
@@ -52,6 +65,8 @@ def plot_metrics(
         metric_objects: List of HealthMetric objects to be plotted, or a single HealthMetric to plot.
         starting_figure: The Plotly figure to update, if required.
         show_bounds: A bool indicating whether ideal bounds should be plotted. Default True.
+        since: Earliest date to plot, or None for no lower bound.
+        until: Latest date to plot, or None for no upper bound.
     """
     unit_to_axis = {}
     axis_index = 1
@@ -114,9 +129,10 @@ def plot_metrics(
         current_axis_index = unit_to_axis[metric.unit]
         yaxis_ref = "y" if current_axis_index == 1 else f"y{current_axis_index}"
 
-        # Extract x and y data.
-        x_vals = [measurement.date for measurement in metric.entries]
-        y_vals = [measurement.value for measurement in metric.entries]
+        # Extract x and y data, in date order and within the requested dates.
+        measurements = metric.between(since, until)
+        x_vals = [measurement.date for measurement in measurements]
+        y_vals = [measurement.value for measurement in measurements]
 
         # Main line trace.
         fig.add_trace(
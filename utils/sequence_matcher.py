@@ -1,5 +1,72 @@
+import heapq
+from collections import Counter
 from difflib import SequenceMatcher
-from typing import Optional
+from typing import Iterable, Optional
+
+"""
+Fuzzy matching of strings (e.g. misspelt metric names) by their similarity ratio,
+as given by `difflib.SequenceMatcher.ratio()`.
+
+Rather than scoring every possible string, candidates are first checked against
+cheap upper bounds on their ratio (from their lengths, then `quick_ratio()`), and
+only scored if they could still make the top results. Strings with equal ratios
+are ranked in the order they were given (or by name, for a NameMatcher).
+"""
+
+
+def _length_bound(candidate_length: int, possible_length: int) -> float:
+    """
+    Upper bound on the ratio of two strings of these lengths, as given by
+    `real_quick_ratio()`.
+    """
+    total_length = candidate_length + possible_length
+    if not total_length:
+        return 1.0
+    return 2.0 * min(candidate_length, possible_length) / total_length
+
+
+class _TopMatches:
+    """
+    Collects the `number_of_results` best scoring matches, skipping those whose
+    upper bounds show they can't make it.
+    """
+
+    def __init__(self, number_of_results: int):
+        self.number_of_results = number_of_results
+        self._best_scores: list[float] = []  # Min-heap of the best scores so far.
+        self._matches: list[tuple[float, object, str]] = []
+
+    @property
+    def threshold(self) -> float:
+        """
+        The score a match needs to reach to make the results so far. Matches that
+        tie it are kept, so no tied match is dropped.
+        """
+        if len(self._best_scores) < self.number_of_results:
+            return 0.0
+        return self._best_scores[0]
+
+    def offer(self, order, possible: str, matcher: SequenceMatcher):
+        if matcher.quick_ratio() < self.threshold:
+            return
+
+        score = matcher.ratio()
+        if score < self.threshold:
+            return
+
+        self._matches.append((score, order, possible))
+        if len(self._best_scores) < self.number_of_results:
+            heapq.heappush(self._best_scores, score)
+        else:
+            heapq.heappushpop(self._best_scores, score)
+
+    def ranked(self) -> list[str]:
+        best_matches = heapq.nsmallest(
+            self.number_of_results,
+            self._matches,
+            key=lambda match: (-match[0], match[1]),
+        )
+        return [possible for _, _, possible in best_matches]
 
 
 def get_closest_matches(
@@ -18,16 +85,20 @@ def get_closest_matches(
         A list of the `number_of_results` closest strings in `possible_strings` to
         `candidate_string`.
     """
-    ranks = {
-        SequenceMatcher(None, candidate_string, possible).ratio(): possible
-        for possible in possible_strings
-    }
-    sorted_ranks = [
-        value
-        for _, value in sorted(ranks.items(), key=lambda item: item[0], reverse=True)
-    ]
+    if number_of_results < 1:
+        return []
+
+    top_matches = _TopMatches(number_of_results)
+    matcher = SequenceMatcher(None, candidate_string)
+
+    for position, possible in enumerate(possible_strings):
+        length_bound = _length_bound(len(candidate_string), len(possible))
+        if length_bound < top_matches.threshold:
+            continue
+        matcher.set_seq2(possible)
+        top_matches.offer(position, possible, matcher)
 
-    return sorted_ranks[:number_of_results]
+    return top_matches.ranked()
 
 
 def get_closest_match(
@@ -48,3 +119,81 @@ def get_closest_match(
         possible_strings=possible_strings,
         number_of_results=1,
     )[0]
+
+
+def _trigrams(string: str) -> set[str]:
+    padded = f"  {string} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+class NameMatcher:
+    """
+    An index over a set of names, for repeatedly finding the closest names to a
+    candidate string. Gives the same results as `get_closest_matches()` over the
+    names in sorted order, but faster:
+
+     - Each name keeps its own SequenceMatcher, so the tables SequenceMatcher builds
+       for the name are reused by every query.
+     - A trigram inverted index finds the names sharing the most trigrams with the
+       candidate, which are scored first. They're the likeliest close matches, so
+       they raise the bar early, and most other names are then skipped by their
+       upper bounds without being scored.
+
+    Names can be added and removed as metrics are created and renamed.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._matchers: dict[str, SequenceMatcher] = {}
+        self._trigram_index: dict[str, set[str]] = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str):
+        if name in self._matchers:
+            return
+
+        self._matchers[name] = SequenceMatcher(None, "", name)
+        for trigram in _trigrams(name):
+            self._trigram_index.setdefault(trigram, set()).add(name)
+
+    def remove(self, name: str):
+        if self._matchers.pop(name, None) is None:
+            return
+
+        for trigram in _trigrams(name):
+            names = self._trigram_index[trigram]
+            names.discard(name)
+            if not names:
+                del self._trigram_index[trigram]
+
+    def __len__(self) -> int:
+        return len(self._matchers)
+
+    def closest_matches(
+        self, candidate_string: str, number_of_results: int = 1
+    ) -> list[str]:
+        """
+        Returns the `number_of_results` names closest to `candidate_string`, best
+        first.
+        """
+        if number_of_results < 1:
+            return []
+
+        shared_trigrams = Counter()
+        for trigram in _trigrams(candidate_string):
+            shared_trigrams.update(self._trigram_index.get(trigram, ()))
+
+        top_matches = _TopMatches(number_of_results)
+        for names in (
+            [name for name, _ in shared_trigrams.most_common()],
+            [name for name in self._matchers if name not in shared_trigrams],
+        ):
+            for name in names:
+                length_bound = _length_bound(len(candidate_string), len(name))
+                if length_bound < top_matches.threshold:
+                    continue
+                matcher = self._matchers[name]
+                matcher.set_seq1(candidate_string)
+                top_matches.offer(name, name, matcher)
+
+        return top_matches.ranked()
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+"""
+Profiling of the program's startup, by importing it in a fresh interpreter run with
+`-X importtime`, which reports the time taken to import every module. Run with
+`python main.py --startup-profile`.
+"""
+
+PROGRAM_DIR = Path(__file__).resolve().parent.parent
+# main.py only imports the terminal's modules once no command was given, so they're
+# imported here as the terminal imports them.
+STARTUP_IMPORT = (
+    "import main, file_tools.utils, global_functions, high_level_functions.utils, "
+    "high_level_functions.entry_points, utils.cli_displays, utils.utils"
+)
+
+
+class ImportTime(NamedTuple):
+    module_name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(import_code: str = STARTUP_IMPORT) -> list[ImportTime]:
+    """
+    Run `import_code` in a fresh interpreter, with `-X importtime`.
+
+    Arguments:
+        import_code: Python code importing the modules to profile.
+
+    Returns:
+        The time taken by each module imported, in the order their imports finished.
+    """
+    environment = os.environ | {"PYTHONPATH": str(PROGRAM_DIR)}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", import_code],
+        capture_output=True,
+        text=True,
+        env=environment,
+        check=True,
+    )
+
+    import_times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module_name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The column headings.
+        import_times.append(
+            ImportTime(
+                module_name=module_name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(module_name) - len(module_name.lstrip()) - 1) // 2,
+            )
+        )
+
+    return import_times
+
+
+def total_import_us(import_times: list[ImportTime]) -> int:
+    """
+    Returns the total time taken by the imports, in microseconds.
+    """
+    top_level_imports = [
+        import_time for import_time in import_times if import_time.depth == 0
+    ]
+    return sum(import_time.cumulative_us for import_time in top_level_imports)
+
+
+def print_startup_profile(count: int = 25):
+    """
+    Print the `count` slowest imports of startup, by cumulative time, in the format
+    of `-X importtime`.
+    """
+    import_times = profile_imports()
+    slowest = sorted(import_times, key=lambda import_time: -import_time.cumulative_us)
+
+    print(f"Startup imports: {total_import_us(import_times) / 1000:.1f}ms")
+    print(f"{'self [us]':>10} | {'cumulative':>10} | imported package")
+    for import_time in slowest[:count]:
+        indent = "  " * import_time.depth
+        print(
+            f"{import_time.self_us:>10} | {import_time.cumulative_us:>10} | "
+            f"{indent}{import_time.module_name}"
+        )
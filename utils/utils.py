@@ -1,17 +1,43 @@
+from datetime import datetime
+from importlib import import_module
 from typing import Optional, Union
-from file_tools.metric_file_parsing import load_metric_from_json
-from utils.logger import LogEntry, logger
+from utils.logger import logger
 from classes import HealthMetric
 from utils.cli_displays import prompt_user
+from file_tools.date_codec import decode_date
 from file_tools.metric_file_parsing import (
-    read_metric_file_to_json,
+    generate_health_metric_from_file,
+    get_metric_registry,
+    metric_exists,
 )
-from file_tools.filepaths import FILE_DIR_NAME, get_filenames_without_extension
 from utils.sequence_matcher import get_closest_match
 
 function_mapping_t = dict[str, callable]
 
 
+def lazy_function(function_path: str) -> callable:
+    """
+    Refer to a function by its module path, without importing its module until the
+    function is first called. Used to register terminal functions, so that starting
+    the program doesn't import every terminal's dependencies.
+
+    Arguments:
+        function_path: The function as "package.module:function_name".
+
+    Returns:
+        A callable that imports the function, then calls it with its arguments.
+    """
+    module_name, function_name = function_path.split(":")
+
+    def call_function(*args, **kwargs):
+        function = getattr(import_module(module_name), function_name)
+        return function(*args, **kwargs)
+
+    call_function.__name__ = function_name
+    call_function.__qualname__ = function_path
+    return call_function
+
+
 def flatten_list(input_list: Union[list, any]) -> list:
     """
     Accepts input of a list, of lists. These may contain more lists, and so on. This function
@@ -40,7 +66,10 @@ def flatten_list(input_list: Union[list, any]) -> list:
 
 
 def generic_hll_function(
-    sub_func_map: function_mapping_t, hll_name: str, proper_name: str = None
+    sub_func_map: function_mapping_t,
+    hll_name: str,
+    proper_name: str = None,
+    path_functions: tuple[str, ...] = (),
 ):
     """
     Provides a generic HLL function interface. Some HLL functions have complex requirements,
@@ -53,6 +82,8 @@ def generic_hll_function(
         sub_fun_map: A mapping of subfunction names to function callables.
         hll_name: The name of the function implementing this function.
         proper_name: The name of the terminal.
+        path_functions: Names of subfunctions whose first argument is a file path,
+            which keeps its case.
 
     """
     terminal_name = proper_name or hll_name
@@ -61,7 +92,7 @@ def generic_hll_function(
 
     while True:
         # Parse new user input.
-        requested_function = prompt_user(hll_name).lower()
+        requested_function = prompt_user(hll_name)
 
         # Split function from arguments.
         if len(func_arg_pair := requested_function.split(" ")) > 1:
@@ -69,6 +100,7 @@ def generic_hll_function(
             arguments = func_arg_pair[1:]
         else:
             arguments = []
+        requested_function = requested_function.lower()
 
         # Catch exit call, assuming exit() handled everything.
         if requested_function == "exit":
@@ -91,6 +123,12 @@ def generic_hll_function(
             )
             requested_function = closest_match
 
+        # Arguments are lowercased, except file paths.
+        keep_case = 1 if requested_function in path_functions else 0
+        arguments = arguments[:keep_case] + [
+            argument.lower() for argument in arguments[keep_case:]
+        ]
+
         sub_func_map[requested_function](arguments)
 
 
@@ -109,6 +147,9 @@ def is_verbatim(input_text: str) -> Optional[str]:
         None if not verbatim request, otherwise verbatim text.
     """
 
+    if not input_text:
+        return None
+
     # First check - wrapped in quotes.
     if input_text[0] == '"' and input_text[-1] == '"':
         return input_text[1:-1]
@@ -123,6 +164,56 @@ def is_verbatim(input_text: str) -> Optional[str]:
     return None
 
 
+def parse_since_date(date_str: str) -> datetime:
+    """
+    Parse the start of a date range, in DDMMYYYY or ISO format.
+    """
+    return decode_date(date_str)
+
+
+def parse_until_date(date_str: str) -> datetime:
+    """
+    Parse the end of a date range, in DDMMYYYY or ISO format. A date without a time
+    includes the whole of that day.
+    """
+    until = decode_date(date_str)
+    if until.time() == datetime.min.time():
+        until = until.replace(hour=23, minute=59, second=59)
+    return until
+
+
+def parse_date_range_arguments(
+    arguments: list[str],
+) -> tuple[list[str], Optional[datetime], Optional[datetime]]:
+    """
+    Pull "--since DATE" and "--until DATE" out of a command's arguments. Dates may be
+    DDMMYYYY or ISO format.
+
+    Arguments:
+        arguments: The command arguments.
+
+    Returns:
+        The remaining arguments, and the since and until dates (None if not given).
+    """
+    remaining, since, until = [], None, None
+    arguments_iter = iter(arguments)
+
+    for argument in arguments_iter:
+        if argument.lower() in ("--since", "--until"):
+            date_str = next(arguments_iter, None)
+            if date_str is None:
+                raise ValueError(f"'{argument}' needs a date.")
+
+            if argument.lower() == "--since":
+                since = parse_since_date(date_str)
+            else:
+                until = parse_until_date(date_str)
+        else:
+            remaining.append(argument)
+
+    return remaining, since, until
+
+
 def attempt_ingest_from_name(
     metric_input: Optional[Union[str, list]] = None,
     prompt_verb: str = "load",
@@ -146,22 +237,23 @@ def attempt_ingest_from_name(
         metric_names = [metric_input]
 
     for metric_name in metric_names:
-        # Build health metric object from requested file.
-        health_file = read_metric_file_to_json(metric_name) or (
-            read_metric_file_to_json(
-                get_closest_match(
-                    metric_name, get_filenames_without_extension(FILE_DIR_NAME)
-                )
-            )
-            and logger.add(
+        # Build health metric object from requested file (or the metric cache).
+        ingested_metric = (
+            generate_health_metric_from_file(metric_name)
+            if metric_exists(metric_name)
+            else None
+        )
+
+        if not ingested_metric:
+            logger.add(
                 "INFO", f"{metric_name} could not be found, matching with closest."
             )
-        )
+            if closest_names := get_metric_registry().closest_matches(metric_name):
+                ingested_metric = generate_health_metric_from_file(closest_names[0])
 
         # Build metric object and return.
-        if health_file and not isinstance(health_file, LogEntry):
-            ingested_metric = load_metric_from_json(health_file)
-            if verbose and ingested_metric:
+        if ingested_metric:
+            if verbose:
                 print(f"Ingested and built '{ingested_metric.metric_name}'.")
             metric_objects.append(ingested_metric)
 
@@ -0,0 +1,33 @@
+"""
+Kinds of measurement value, and the sentinels used for missing fields, shared by the
+in-memory MeasurementSeries columns, the OoR engine and the columnar file format.
+Kept apart from all three, so the core types don't depend on the storage layer.
+"""
+
+# Value kinds, recording how each stored value should be read back.
+VALUE_FLOAT = 0
+VALUE_INT = 1
+VALUE_BOOL = 2
+VALUE_STRING = 3
+VALUE_LESS_THAN = 4
+VALUE_GREATER_THAN = 5
+
+# Entries without a date are kept, but marked with this sentinel.
+MISSING_DATE = -(2**63)
+# Unit id 0 means the entry has no unit, otherwise index + 1 into the unit table.
+NO_UNIT = 0
+
+
+def is_inequality_value_str(input_str: str) -> bool:
+    """
+    Test whether input string is a candidate for representing an "InequalityValue".
+
+    Arguments:
+        input_str: The string, representing a value, to be tested.
+
+    Returns:
+        Bool indicating whether value looks like an inequality value, or not.
+    """
+    if "<" in str(input_str) or ">" in str(input_str):
+        return True
+    return False